@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+#
+# Benchmarks for python-syncope, running against the in-process FakeSyncopeServer.
+#
+# Every benchmark calls one Syncope action a number of times and reports the latency per call, the amount of calls
+# per second and the memory used. The results are written as JSON, so the results of two versions can be compared:
+#
+#   python benchmarks/bench_syncope.py --output before.json
+#   python benchmarks/bench_syncope.py --output after.json --compare before.json
+#
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import syncope
+from syncope.fake_server import FakeSyncopeServer, sample_data
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+    import resource
+
+ACTIVE_USERS = '{"type":"LEAF","attributableCond":{"type":"EQ","schema":"status","expression":"active"}}'
+USER_MOD = '{"id": 5, "attributesToBeUpdated": [{"schema": "fullname", "valuesToBeAdded": ["Giacomo Puccini %d"], "valuesToBeRemoved": []}]}'
+
+
+def create_user_json(counter):
+    return json.dumps({"username": "bench" + str(next(counter)), "password": "password1234",
+                       "attributes": [{"schema": "firstname", "values": ["Bench"], "readonly": False}]})
+
+
+def benchmarks(syn):
+    """Will return the benchmarks as (name, function) tuples. Every function does one call."""
+    counter = itertools.count()
+    return [
+        ('get_users', lambda: syn.get_users()),
+        ('get_users_count', lambda: syn.get_users_count()),
+        ('get_user_by_id', lambda: syn.get_user_by_id(5)),
+        ('get_user_by_name', lambda: syn.get_user_by_name("puccini")),
+        ('get_users_by_query', lambda: syn.get_users_by_query(ACTIVE_USERS)),
+        ('get_paged_users_by_query', lambda: syn.get_paged_users_by_query(ACTIVE_USERS, 1, 50)),
+        ('iter_users_by_query', lambda: sum(1 for user in syn.iter_users_by_query(ACTIVE_USERS, page_size=50))),
+        ('iter_users_by_query_prefetch', lambda: sum(1 for user in syn.iter_users_by_query(ACTIVE_USERS, page_size=50,
+                                                                                          prefetch=4))),
+        ('create_user', lambda: syn.create_user(create_user_json(counter))),
+        ('update_user', lambda: syn.update_user(USER_MOD % next(counter))),
+        ('suspend_user_by_id', lambda: syn.suspend_user_by_id(4)),
+        ('reactivate_user_by_id', lambda: syn.reactivate_user_by_id(4)),
+        ('get_roles', lambda: syn.get_roles()),
+        ('get_role_by_id', lambda: syn.get_role_by_id(2)),
+        ('get_children_role_by_id', lambda: syn.get_children_role_by_id(1)),
+        ('get_configurations', lambda: syn.get_configurations()),
+        ('get_configuration_by_key', lambda: syn.get_configuration_by_key("token.length")),
+    ]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def measure(function, iterations):
+    """Will call the function 'iterations' times and return the timings and memory usage.
+
+    The memory is measured during an extra call with tracemalloc (python 3), so the tracing doesn't slow down the
+    timed calls. Without tracemalloc the growth of the maximum resident memory during the timed calls is used.
+    """
+    function()
+    gc.collect()
+    if tracemalloc is None:
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    latencies = []
+    started = time.time()
+    for _ in range(iterations):
+        call_started = time.time()
+        function()
+        latencies.append(time.time() - call_started)
+    elapsed = time.time() - started
+
+    if tracemalloc is not None:
+        tracemalloc.start()
+        function()
+        memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    else:
+        # ru_maxrss is in kilobytes on linux, and only shows growth of the peak.
+        memory = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) * 1024
+
+    return {
+        'iterations': iterations,
+        'calls_per_second': iterations / elapsed,
+        'latency_mean_ms': 1000 * sum(latencies) / len(latencies),
+        'latency_p50_ms': 1000 * percentile(latencies, 0.50),
+        'latency_p95_ms': 1000 * percentile(latencies, 0.95),
+        'latency_p99_ms': 1000 * percentile(latencies, 0.99),
+        'latency_max_ms': 1000 * max(latencies),
+        'memory_peak_bytes': memory,
+    }
+
+
+def compare(results, baseline):
+    """Will print the change of the calls per second and the memory compared to an earlier run."""
+    print('')
+    print('{0:<32} {1:>14} {2:>14}'.format('benchmark', 'calls/s', 'memory'))
+    for name, result in sorted(results['results'].items()):
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        speed = 100.0 * (result['calls_per_second'] / before['calls_per_second'] - 1)
+        memory = result['memory_peak_bytes'] - before['memory_peak_bytes']
+        print('{0:<32} {1:>+13.1f}% {2:>+13d}B'.format(name, speed, memory))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks for python-syncope against an fake Syncope server.')
+    parser.add_argument('--iterations', type=int, default=200, help='calls per benchmark')
+    parser.add_argument('--users', type=int, default=500, help='amount of generated users on the fake server')
+    parser.add_argument('--latency', type=float, default=0.0, help='latency in seconds added by the fake server')
+    parser.add_argument('--only', action='append', help='only run this benchmark, can be given multiple times')
+    parser.add_argument('--output', help='write the results as JSON to this file instead of stdout')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare with')
+    options = parser.parse_args()
+
+    results = {
+        'version': syncope.__version__,
+        'python': platform.python_version(),
+        'iterations': options.iterations,
+        'users': options.users,
+        'latency': options.latency,
+        'results': {},
+    }
+    with FakeSyncopeServer(data=sample_data(extra_users=options.users), latency=options.latency) as server:
+        with syncope.Syncope(syncope_url=server.url, username="admin", password="password") as syn:
+            for name, function in benchmarks(syn):
+                if options.only and name not in options.only:
+                    continue
+                results['results'][name] = measure(function, options.iterations)
+                sys.stderr.write('{0:<32} {1:>10.1f} calls/s\n'.format(name, results['results'][name]['calls_per_second']))
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if options.output:
+        with open(options.output, 'w') as output_file:
+            output_file.write(output + '\n')
+    else:
+        print(output)
+
+    if options.compare:
+        with open(options.compare) as baseline_file:
+            compare(results, json.load(baseline_file))
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,7 @@
 from __future__ import print_function
 from setuptools import setup, find_packages
 from setuptools.command.test import test as TestCommand
+from setuptools.command.build_py import build_py
 import codecs
 import os
 import sys
@@ -53,6 +54,15 @@ class PyTest(TestCommand):
         sys.exit(errno)
 
 
+class BuildPy(build_py):
+    """Will leave out the asyncio version (syncope._aio) on python 2, as python 2 can't compile it."""
+    def find_package_modules(self, package, package_dir):
+        modules = build_py.find_package_modules(self, package, package_dir)
+        if sys.version_info < (3, 5):
+            modules = [module for module in modules if module[1] != '_aio']
+        return modules
+
+
 setup(name='python-syncope',
       version=info.get('__version__', '0.0.0'),
       description='Managing Syncope via rest API',
@@ -67,16 +77,18 @@ setup(name='python-syncope',
             'requests',
       ],
       tests_require=['pytest'],
-      cmdclass={'test': PyTest},
+      cmdclass={'test': PyTest, 'build_py': BuildPy},
       platforms='any',
       test_suite='syncope.tests.test_syncope',
       extras_require={
         'testing': ['pytest'],
+        'aio': ['aiohttp; python_version >= "3.5"'],
       },
       zip_safe=False,
       classifiers=[
         'Development Status :: 3 - Alpha',
         'Operating System :: Unix',
         'Programming Language :: Python :: 2.7',
+        'Programming Language :: Python :: 3',
       ],
       )
@@ -6,22 +6,409 @@ __version__ = '0.0.6'
 __license__ = "Apache License 2.0"
 __email__ = "ikben@werner-dijkerman.nl"
 
+import codecs
+import collections
+import copy
+import functools
+import hashlib
+import inspect
 import requests
 import json
+import logging
+import os
+import random
+import threading
+import time
+import xml.etree.ElementTree as ET
+from multiprocessing.pool import ThreadPool
+from requests.packages.urllib3.exceptions import NewConnectionError
+from syncope.diff import user_mod
+from syncope.disk_cache import DiskCache
+from syncope.metrics import Metrics
+from syncope.models import User
+from syncope.roles import RoleTree
+from syncope.search import Condition, attributable, or_
+
+try:
+    _text = basestring
+except NameError:
+    _text = str
+
+
+def _iter_json_array(chunks, encoding='utf-8'):
+    """Will parse an JSON array from an iterable of byte chunks and yield every element as soon as it is complete,
+    so only the current element and one chunk are kept in memory.
+
+    :param chunks: The bytes of the JSON array, for example from response.iter_content.
+    :param encoding: The encoding of the bytes.
+    :return: An generator with every decoded element of the array.
+    :raises ValueError: When the data is not an valid JSON array.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder(encoding)()
+    chunks = iter(chunks)
+    buffer = ''
+    position = 0
+    started = False
+    finished = False
+    while True:
+        while position < len(buffer) and buffer[position].isspace():
+            position += 1
+
+        if position < len(buffer):
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError('Expected an JSON array, got: {0!r}'.format(buffer[position:position + 20]))
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+            if buffer[position] == ',':
+                position += 1
+                continue
+
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                if finished:
+                    raise
+            else:
+                following = end
+                while following < len(buffer) and buffer[following].isspace():
+                    following += 1
+                # An number can be cut by the end of an chunk (like 12. of 12.5), so an element is only accepted
+                # when the , or ] after it is seen, or when there is no more data.
+                if following < len(buffer) and buffer[following] in ',]' or finished and following == len(buffer):
+                    position = following
+                    yield element
+                    continue
+                if finished or following < len(buffer) and following > end:
+                    raise ValueError('Expected , or ] in the JSON array, got: {0!r}'.format(
+                        buffer[following:following + 20]))
+        elif finished:
+            raise ValueError('Unexpected end of the JSON array.')
+
+        chunk = next(chunks, None)
+        buffer = buffer[position:]
+        position = 0
+        if chunk is None:
+            buffer += text_decoder.decode(b'', True)
+            finished = True
+        else:
+            buffer += text_decoder.decode(chunk)
+
+
+def _bounded_map(func, iterable, concurrency):
+    """Will call func for every item with at most 'concurrency' calls running at the same time. The results are
+    yielded in the same order as the items, and the items are only consumed when there is room for them.
+
+    :param func: The function to call with every item.
+    :param iterable: The items.
+    :param concurrency: The maximum amount of calls running at the same time.
+    :return: An generator with the result of every call.
+    """
+    # The worker threads do their requests for the action which started them.
+    action = getattr(_context, 'action', None)
+    pool = ThreadPool(concurrency)
+    pending = collections.deque()
+    try:
+        for item in iterable:
+            pending.append(pool.apply_async(_call_as, (action, func, item)))
+            if len(pending) >= concurrency:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+HOOK_EVENTS = ('pre_request', 'post_response')
+
+_log = logging.getLogger(__name__)
+
+_context = threading.local()
+
+
+def _call_as(action, func, item):
+    """Will call func for an item of _bounded_map in an worker thread, as part of 'action'."""
+    _context.action = action
+    try:
+        return func(item)
+    finally:
+        _context.action = None
+
+
+def _iterate_as(action, iterator):
+    """Will yield the items of an iterator, doing the requests of every step as part of 'action'. When an other action
+    is running, the requests belong to that one.
+
+    :param action: The name of the action, like iter_users.
+    :param iterator: The generator of the action.
+    :return: An generator with the items of the iterator.
+    """
+    try:
+        while True:
+            outer = getattr(_context, 'action', None)
+            if outer is None:
+                _context.action = action
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                _context.action = outer
+            yield item
+    finally:
+        iterator.close()
+
+
+def _action(func):
+    """Will mark an method as an Syncope action: the requests done while it runs are recorded in the metrics and
+    given to the hooks with its name. When an action calls an other action, the requests belong to the first one.
+
+    :param func: The method of the action.
+    :return: The wrapped method.
+    """
+    name = func.__name__
+
+    if inspect.isgeneratorfunction(func):
+        @functools.wraps(func)
+        def generator(self, *args, **kwargs):
+            return _iterate_as(name, func(self, *args, **kwargs))
+        return generator
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        outer = getattr(_context, 'action', None)
+        if outer is not None:
+            return func(self, *args, **kwargs)
+        _context.action = name
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            _context.action = None
+    return wrapper
+
+
+def _cached_response(url, body, content_type, encoding):
+    """Will create an response object from an response of the DiskCache.
+
+    :return: An requests.Response with status code 200.
+    """
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = body
+    if content_type:
+        response.headers['Content-Type'] = content_type
+    response.encoding = encoding
+    return response
+
+
+def _without_password(response):
+    """Will remove the (hashed) password of the users in an response, before it is written to the DiskCache.
+
+    :param response: The response object with an user or an list of users.
+    :return: The body without passwords as bytes.
+    """
+    data = response.json()
+    for user in data if isinstance(data, list) else [data]:
+        user.pop('password', None)
+    return json.dumps(data).encode(response.encoding or 'utf-8')
+
+
+def _connect_failed(error):
+    """Will check if an request failed before anything was send to the server, so it is safe to retry it.
+
+    :param error: The exception raised by requests.
+    :return: True when the connection could not be made.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def _body_size(body):
+    """Will return the size in bytes of an request body, text is send as UTF-8 like requests does.
+
+    :param body: The body of the request, like the data argument or the body of the prepared request.
+    :return: The amount of bytes, or 0 for no body or an body of unknown size (like an file).
+    """
+    if isinstance(body, bytes):
+        return len(body)
+    if isinstance(body, _text):
+        return len(body.encode('utf-8'))
+    return 0
+
+
+class _RateLimiter(object):
+
+    """Will spread calls from multiple threads, so at most 'rate' calls per second are made."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.next_call = 0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.time()
+            call_at = max(now, self.next_call)
+            self.next_call = call_at + self.interval
+        if call_at > now:
+            time.sleep(call_at - now)
+
+
+class _UserCache(object):
+
+    """Will keep recently requested users in memory, reachable by id and by username. Users are removed after 'ttl'
+    seconds, or when more then 'max_size' users are cached (least recently used first).
+
+    Every invalidate increases the generation. An user requested before an write finished is only cached when no
+    invalidate happened since the request started, so an lookup running next to an update can't cache the old user.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.users = collections.OrderedDict()
+        self.ids = {}
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def get(self, id=None, username=None):
+        with self.lock:
+            if id is None:
+                id = self.ids.get(username)
+            entry = self.users.get(str(id))
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                self._remove(str(id))
+                return None
+            del self.users[str(id)]
+            self.users[str(id)] = entry
+            return copy.deepcopy(entry[1])
+
+    def put(self, user, generation=None):
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._remove(str(user['id']))
+            self.users[str(user['id'])] = (time.time() + self.ttl, copy.deepcopy(user))
+            self.ids[user['username']] = str(user['id'])
+            while len(self.users) > self.max_size:
+                self._remove(next(iter(self.users)))
+
+    def invalidate(self, id=None, username=None):
+        with self.lock:
+            self.generation += 1
+            if id is None:
+                id = self.ids.get(username)
+            if id is not None:
+                self._remove(str(id))
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.users.clear()
+            self.ids.clear()
+
+    def _remove(self, id):
+        entry = self.users.pop(id, None)
+        if entry is not None and self.ids.get(entry[1]['username']) == id:
+            del self.ids[entry[1]['username']]
+
+
+class _SingleFlight(object):
+
+    """Will let concurrent calls with the same key share the result of one call. The first caller does the call, the
+    others wait for it and get the same result or exception."""
+
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def do(self, key, func):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = {'done': threading.Event(), 'result': None, 'error': None}
+
+        if not leader:
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+
+        try:
+            call['result'] = func()
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call['done'].set()
+        return call['result']
 
 
 class Syncope(object):
 
     """Syncope Rest Interface."""
 
-    def __init__(self, syncope_url='', username=None, password=None, timeout=10):
+    def __init__(self, syncope_url='', username=None, password=None, timeout=10, pool_connections=10, pool_maxsize=10,
+                 pool_block=False, keep_alive=60, user_cache_size=0, user_cache_ttl=300, retries=2, backoff_factor=0.5,
+                 backoff_max=30, retry_statuses=(502, 503, 504), retry_post=False, metrics=False,
+                 coalesce_gets=False, conditional_gets=False,
+                 disk_cache=None):
         """
         Will initialize the syncope module.
 
+        All requests are send via one pooled HTTP session, so connections to the Syncope server are reused. Use
+        close() (or use the object as an context manager) to release the connections when you are done.
+
         :param syncope_url: the URL to the Syncope server.
         :param username: The username to login.
         :param password: The password for the user configured in username.
-        :param timeout: HTTP requests timeout in seconds.
+        :param timeout: HTTP requests timeout in seconds, or an (connect timeout, read timeout) tuple.
+        :param pool_connections: The amount of hosts for which an connection pool is kept.
+        :param pool_maxsize: The maximum amount of connections kept open per host.
+        :param pool_block: When True, no more then pool_maxsize connections are made to an host at the same time.
+        :param keep_alive: Idle time in seconds after which pooled connections are dropped, None to keep them forever.
+        :param user_cache_size: The amount of users kept in memory by get_user_by_id and get_user_by_name, 0 disables
+            the cache. Cached users are removed when they are updated, deleted or their status is changed via this
+            object, but not when this is done by someone else.
+        :param user_cache_ttl: The time in seconds an user is kept in the cache.
+        :param retries: The amount of times an failed request is retried. GET, PUT, DELETE and searches are retried
+            on an connection error, an timeout or an status code in retry_statuses. Other POST requests are only
+            retried when the connection could not be made, unless retry_post is True.
+        :param backoff_factor: The n-th retry waits an random time between 0 and backoff_factor * 2 ** (n - 1)
+            seconds, so retries of multiple clients are spread.
+        :param backoff_max: The maximum time in seconds to wait before an retry.
+        :param retry_statuses: The HTTP status codes which are retried.
+        :param retry_post: When True, all POST requests are retried like GET requests.
+        :param metrics: When True, the requests are counted per action in an new Metrics object, which is available
+            as the 'metrics' attribute. An existing Metrics object can also be given, to share it between objects.
+        :param coalesce_gets: When True, threads doing the same GET request at the same time share one request and
+            get the same response object.
+        :param conditional_gets: When True, the responses of slowly changing lists (like get_roles, get_configurations
+            and the policies) are kept with their ETag or Last-Modified header. Next requests ask the server if they
+            are changed, and the kept response is used when the server answers with 304 Not Modified.
+        :param disk_cache: An syncope.disk_cache.DiskCache object, or the path of an SQLite file, to cache the
+            responses of get_roles, get_configurations, get_entitlements, get_account_policies and get_user_by_id
+            on disk, shared with other processes. Cached responses are only used by clients with the same URL and
+            credentials, and cached users have no password.
+        :Example:
+
+        >>> import syncope
+        >>> with syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password", pool_maxsize=20) as syn:
+        ...     print syn.get_users_count()
+        5
         """
         if not syncope_url:
             raise ValueError('This interface needs an Syncope URL to work!')
@@ -36,7 +423,32 @@ class Syncope(object):
         self.headers = {'Content-Type': 'application/json'}
         self.username = username
         self.password = password
-        self.timeout = int(timeout)
+        self.timeout = tuple(timeout) if isinstance(timeout, (tuple, list)) else int(timeout)
+        self.retries = int(retries)
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_post = retry_post
+        if metrics is True:
+            metrics = Metrics()
+        self.metrics = metrics or None
+        self.hooks = dict((event, []) for event in HOOK_EVENTS)
+        self._single_flight = _SingleFlight() if coalesce_gets else None
+        self._validated = {} if conditional_gets else None
+        if disk_cache is not None and not isinstance(disk_cache, DiskCache):
+            disk_cache = DiskCache(disk_cache)
+        self.disk_cache = disk_cache
+        self._credentials_digest = hashlib.sha256(
+            json.dumps([syncope_url, username, password]).encode('utf-8')).hexdigest()
+        self.keep_alive = keep_alive
+        self._last_request = None
+        self.session = requests.Session()
+        self.session.auth = (self.username, self.password)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=int(pool_connections), pool_maxsize=int(pool_maxsize),
+                                                pool_block=pool_block)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.user_cache = _UserCache(int(user_cache_size), user_cache_ttl) if user_cache_size else None
         self.rest_configurations = 'syncope/cxf/configurations'
         self.cxf_account_policies = 'syncope/cxf/policies/account'
         self.cxf_sync_policies = 'syncope/cxf/policies/sync'
@@ -54,11 +466,178 @@ class Syncope(object):
         self.rest_roles = 'syncope/cxf/roles'
         self.rest_users = 'syncope/cxf/users'
 
-    def _get(self, rest_path, arguments=None):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_hook(self, event, hook):
+        """Will add an function which is called for every request, for example for tracing or logging slow requests.
+
+        The hook is called with an dict describing the request, the same dict is given to the 'pre_request' and the
+        'post_response' hooks of one request, so an hook can store its own information in it. Retried requests will
+        call the hooks again, with an higher 'attempt'.
+
+        'pre_request' hooks get the keys 'action' (name of the called Syncope action, like get_user_by_name), 'method',
+        'url', 'attempt', 'started' (time.time() of the start) and 'bytes_out' (size of the request body in bytes).
+
+        'post_response' hooks get the keys above, and 'elapsed' (duration in seconds), 'status_code', 'bytes_in'
+        (size of the response body), 'response' (the response object) and 'error' (the exception of an failed
+        connection). 'status_code' and 'response' are None when no response was received.
+
+        An exception raised by an hook is logged to the 'syncope' logger and does not fail the request.
+
+        :param event: 'pre_request' or 'post_response'.
+        :type event: str
+        :param hook: An function which gets the dict as only argument.
+        :return: None
+        :Example:
+
+        >>> import syncope
+        >>> def log_slow(call):
+        ...     if call['elapsed'] > 1:
+        ...         print "{0} {1} took {2:.2f} seconds".format(call['action'], call['url'], call['elapsed'])
+        >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password")
+        >>> syn.add_hook('post_response', log_slow)
+        """
+        if event not in self.hooks:
+            raise ValueError("Unknown hook event: {0}, should be one of: {1}".format(event, ", ".join(HOOK_EVENTS)))
+        self.hooks[event].append(hook)
+
+    def remove_hook(self, event, hook):
+        """Will remove an function added with add_hook.
+
+        :param event: 'pre_request' or 'post_response'.
+        :type event: str
+        :param hook: The function given to add_hook.
+        :return: True when the hook is removed, False when it wasn't added.
+        """
+        if event not in self.hooks:
+            raise ValueError("Unknown hook event: {0}, should be one of: {1}".format(event, ", ".join(HOOK_EVENTS)))
+        try:
+            self.hooks[event].remove(hook)
+        except ValueError:
+            return False
+        return True
+
+    def close(self):
+        """Will close all pooled connections to the Syncope server.
+
+        :return: None
+        """
+        self.session.close()
+
+    def _request(self, method, syncope_path, idempotent=None, **kwargs):
+        """Will send the request via the pooled session and will retry it when it failed. All HTTP helpers below are
+        using this function.
+
+        :param method: The HTTP method, like GET or POST.
+        :param syncope_path: The complete url of the request.
+        :param idempotent: When True, the request can safely be send again. Defaults to False for POST requests.
+        :param kwargs: Optional arguments for requests, like headers and data.
+        :return: Returns the response object.
+        """
+        now = time.time()
+        if self.keep_alive is not None and self._last_request is not None and now - self._last_request > self.keep_alive:
+            # The server has probably dropped the idle connections already, so start with new ones.
+            self.session.close()
+        self._last_request = now
+
+        if idempotent is None:
+            idempotent = method != 'POST' or self.retry_post
+        kwargs.setdefault('timeout', self.timeout)
+        observed = self.metrics is not None or self.hooks['pre_request'] or self.hooks['post_response']
+        action = (getattr(_context, 'action', None) or 'unknown') if observed else None
+
+        attempt = 0
+        while True:
+            call = None
+            if observed:
+                call = {'action': action, 'method': method, 'url': syncope_path, 'attempt': attempt,
+                        'started': time.time(), 'bytes_out': _body_size(kwargs.get('data'))}
+                self._call_hooks('pre_request', call)
+            try:
+                response = self.session.request(method, syncope_path, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if call is not None:
+                    self._record(call, kwargs, error=e)
+                # An request which never reached the server can always be retried.
+                if attempt >= self.retries or not (idempotent or _connect_failed(e)):
+                    raise
+                retry_after = None
+            else:
+                if call is not None:
+                    self._record(call, kwargs, response)
+                if attempt >= self.retries or not idempotent or response.status_code not in self.retry_statuses:
+                    return response
+                retry_after = response.headers.get('Retry-After')
+                response.close()
+
+            attempt += 1
+            self._backoff(attempt, retry_after)
+
+    def _record(self, call, kwargs, response=None, error=None):
+        """Will record an finished request in the metrics and will call the 'post_response' hooks.
+
+        :param call: The dict describing the request, see add_hook.
+        :param kwargs: The arguments of the request.
+        :param response: The response object, or None when the request failed.
+        :param error: The exception when the request failed.
+        """
+        call['elapsed'] = time.time() - call['started']
+        call['response'] = response
+        call['error'] = error
+        if response is None:
+            call['status_code'] = None
+            call['bytes_in'] = 0
+        else:
+            call['status_code'] = response.status_code
+            # The prepared request has the encoded body, also for data which is not text.
+            call['bytes_out'] = _body_size(response.request.body)
+            if kwargs.get('stream'):
+                # Reading the content would consume the stream, so use the header instead.
+                call['bytes_in'] = int(response.headers.get('Content-Length') or 0)
+            else:
+                call['bytes_in'] = len(response.content)
+
+        if self.metrics is not None:
+            self.metrics.record(call['action'], call['method'], call['status_code'], call['elapsed'],
+                                call['bytes_out'], call['bytes_in'])
+        self._call_hooks('post_response', call)
+
+    def _call_hooks(self, event, call):
+        """Will call the hooks of an event. An hook raising an exception is logged and will not fail the request, as
+        the server can already have done the request.
+
+        :param event: 'pre_request' or 'post_response'.
+        :param call: The dict describing the request, see add_hook.
+        """
+        for hook in self.hooks[event]:
+            try:
+                hook(call)
+            except Exception:
+                _log.exception("The %s hook %r failed for %s %s", event, hook, call['method'], call['url'])
+
+    def _backoff(self, attempt, retry_after=None):
+        """Will wait before an request is retried.
+
+        :param attempt: The number of the retry.
+        :param retry_after: Optional value of the Retry-After header, the time in seconds the server asked to wait.
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_factor * 2 ** (attempt - 1)))
+        if retry_after is not None and retry_after.isdigit():
+            delay = max(delay, min(self.backoff_max, int(retry_after)))
+        time.sleep(delay)
+
+    def _get(self, rest_path, arguments=None, stream=False, revalidate=False, cache=None):
         """Will GET the information from the syncope server. This function will be called from the actual actions.
 
         :param rest_path: uri of the rest action.
         :param arguments: Optional arguments.
+        :param stream: When True, the body is not downloaded until it is read from the response.
+        :param revalidate: When True and conditional_gets is enabled, an conditional request is done.
+        :param cache: The endpoint name in the disk cache, when the response can be cached.
         :return: Returns the data in json from the GET request.
         """
         if arguments is not None:
@@ -66,13 +645,72 @@ class Syncope(object):
         else:
             syncope_path = "{0}/{1}.json".format(self.syncope_url, rest_path)
 
-        return requests.get(syncope_path, auth=(self.username, self.password), headers=self.headers, timeout=self.timeout)
-
-    def _get_xml(self, rest_path, arguments=None):
+        if stream:
+            return self._request('GET', syncope_path, headers=self.headers, stream=True)
+        if revalidate and self._validated is not None:
+            get = lambda: self._get_conditional(syncope_path)
+        else:
+            get = lambda: self._request('GET', syncope_path, headers=self.headers)
+        cache_key = None
+        if cache is not None and self.disk_cache is not None:
+            # Only an client with the same credentials may use an cached response.
+            cache_key = "{0} {1}".format(self._credentials_digest, syncope_path)
+            cached = self.disk_cache.get(cache, cache_key)
+            if cached is not None:
+                return _cached_response(syncope_path, *cached)
+
+        if self._single_flight is not None:
+            response = self._single_flight.do(syncope_path, get)
+        else:
+            response = get()
+
+        if cache_key is not None and response.status_code == 200:
+            body = response.content
+            if cache == 'users':
+                body = _without_password(response)
+            self.disk_cache.put(cache, cache_key, body, response.headers.get('Content-Type'), response.encoding)
+        return response
+
+    def _invalidate(self, *endpoints):
+        """Will remove the responses of the endpoints from the disk cache, after an write action.
+
+        :param endpoints: The endpoint names in the disk cache.
+        """
+        if self.disk_cache is not None:
+            for endpoint in endpoints:
+                self.disk_cache.invalidate(endpoint)
+
+    def _get_conditional(self, syncope_path):
+        """Will GET the information with the validators of the previous response, and will return the previous
+        response when the server tells it is not modified.
+
+        :param syncope_path: The complete url of the request.
+        :return: Returns the response object.
+        """
+        previous = self._validated.get(syncope_path)
+        headers = self.headers
+        if previous is not None:
+            headers = dict(self.headers)
+            if previous.headers.get('ETag'):
+                headers['If-None-Match'] = previous.headers['ETag']
+            if previous.headers.get('Last-Modified'):
+                headers['If-Modified-Since'] = previous.headers['Last-Modified']
+
+        response = self._request('GET', syncope_path, headers=headers)
+        if response.status_code == 304 and previous is not None:
+            return previous
+        if response.status_code == 200 and (response.headers.get('ETag') or response.headers.get('Last-Modified')):
+            self._validated[syncope_path] = response
+        else:
+            self._validated.pop(syncope_path, None)
+        return response
+
+    def _get_xml(self, rest_path, arguments=None, stream=False):
         """Will GET the information from the syncope server with XML. This function will be called from the actual actions.
 
         :param rest_path: uri of the rest action.
         :param arguments: Optional arguments.
+        :param stream: When True, the body is not downloaded until it is read from the response.
         :return: Returns the data in XML from the GET request.
         """
         headers = {'Content-Type': 'application/xml'}
@@ -81,7 +719,9 @@ class Syncope(object):
         else:
             syncope_path = "{0}/{1}".format(self.syncope_url, rest_path)
 
-        return requests.get(syncope_path, auth=(self.username, self.password), headers=headers, timeout=self.timeout)
+        if stream:
+            return self._request('GET', syncope_path, headers=headers, stream=True)
+        return self._request('GET', syncope_path, headers=headers)
 
     def _delete(self, rest_path, arguments=None):
         """Will DELETE the information from the syncope server. This function will be called from the actual actions.
@@ -92,29 +732,27 @@ class Syncope(object):
         """
         syncope_path = "{0}/{1}.json".format(self.syncope_url, rest_path)
 
-        return requests.delete(syncope_path, auth=(self.username, self.password), headers=self.headers, data=arguments, timeout=self.timeout)
+        return self._request('DELETE', syncope_path, headers=self.headers, data=arguments)
 
-    def _post(self, rest_path, arguments=None, params=None):
+    def _post(self, rest_path, arguments=None, params=None, idempotent=None):
         """Will do an POST action for creating or to update the information from the syncope server. This function will be called from the actual actions.
 
         :param rest_path: uri of the rest action.
         :param arguments: Optional arguments in JSON format.
         :param params: Optional parameters to the uri, like: ?username=something.
+        :param idempotent: True for POST requests which don't change anything (like searches), so they can be retried.
         :return: Returns the data in json (if any)from the POST request.
         """
         if arguments is None:
             raise ValueError('No arguments are given to POST.')
+        if isinstance(arguments, Condition):
+            arguments = arguments.to_json()
         if params is not None:
             syncope_path = "{0}/{1}.json{2}".format(self.syncope_url, rest_path, params)
         else:
             syncope_path = "{0}/{1}.json".format(self.syncope_url, rest_path)
 
-        try:
-            data = requests.post(syncope_path, auth=(self.username, self.password), headers=self.headers, data=arguments, timeout=self.timeout)
-        except requests.exceptions.RequestException as e:
-            print e
-
-        return data
+        return self._request('POST', syncope_path, idempotent=idempotent, headers=self.headers, data=arguments)
 
     def _put(self, rest_path, arguments=None, params=None):
         """Will do an PUT action for creating or to update the information from the syncope server. This function will be called from the actual actions.
@@ -131,8 +769,9 @@ class Syncope(object):
         else:
             syncope_path = "{0}/{1}.json".format(self.syncope_url, rest_path)
 
-        return requests.put(syncope_path, auth=(self.username, self.password), headers=self.headers, data=arguments, timeout=self.timeout)
+        return self._request('PUT', syncope_path, headers=self.headers, data=arguments)
 
+    @_action
     def create_user(self, arguments):
         """Will create an user.
 
@@ -144,7 +783,7 @@ class Syncope(object):
         >>> import syncope
         >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password")
         >>> create_user = '{"attributes": [{"schema": "aLong","values": [],"readonly": false},{"schema": "activationDate","values": [""],"readonly": false},{"schema": "cool","values": ["false"],"readonly": false},{"schema": "email","values": ["werner@dj-wasabi.nl"],"readonly": false},{"schema": "firstname","values": ["Werner"],"readonly": false},{"schema": "fullname","values": ["Werner Dijkerman"],"readonly": false},{"schema": "gender","values": ["M"],"readonly": false},{"schema": "loginDate","values": [""],"readonly": false},{"schema": "makeItDouble","values": [],"readonly": false},{"schema": "surname","values": ["Dijkerman"],"readonly": false},{"schema": "type","values": ["account"],"readonly": false},{"schema": "uselessReadonly","values": [""],"readonly": true},{"schema": "userId","values": ["werner@dj-wasabi.nl"],"readonly": false}],"id": 0,"derivedAttributes": [{"schema": "cn","values": [],"readonly": false}],"virtualAttributes": [],"password": "password1234","status": null,"token": null,"tokenExpireTime": null,"username": "wedijkerman","lastLoginDate": null,"creationDate": null,"changePwdDate": null,"failedLogins": null}'
-        >>> print syn.create_users(create_user)
+        >>> print syn.create_user(create_user)
         {u'status': u'active', u'username': u'wedijkerman', u'creationDate': 1444152747171, <cut>}
         """
 
@@ -155,6 +794,60 @@ class Syncope(object):
         else:
             return False
 
+    def _create_user_result(self, arguments):
+        """Will create one user for create_users and will return the result of it, instead of raising an error.
+
+        :param arguments: An JSON structure or python dict for creating the user.
+        :return: Returns an dict with the created 'user', the 'status_code' and the 'error' of the request.
+        """
+        if isinstance(arguments, dict):
+            arguments = json.dumps(arguments)
+
+        try:
+            data = self._post(self.rest_users, arguments)
+        except requests.exceptions.RequestException as e:
+            return {'user': None, 'status_code': None, 'error': str(e)}
+
+        if data.status_code != 201:
+            return {'user': None, 'status_code': data.status_code, 'error': data.text}
+        try:
+            return {'user': data.json(), 'status_code': data.status_code, 'error': None}
+        except ValueError as e:
+            # The user is created, but the response can't be read.
+            return {'user': None, 'status_code': data.status_code, 'error': str(e)}
+
+    @_action
+    def create_users(self, users, concurrency=4):
+        """Will create multiple users, with at most 'concurrency' users created at the same time.
+
+        The users are read from 'users' when there is room for them, so it can also be an generator. All users are
+        created before this function returns, like the other bulk actions. An failed user will not stop the other users
+        from being created.
+
+        :param users: An iterable with an JSON structure or python dict per user. See create_user for an example.
+        :type users: iterable
+        :param concurrency: The maximum amount of users created at the same time.
+        :type concurrency: int
+        :return: An list with an dict per user, in the same order as 'users'. The dict contains the created 'user' (or
+            None), the HTTP 'status_code' (or None when the server could not be reached) and the 'error' (the response
+            body or the connection error, None when the user is created).
+        :Example:
+
+        >>> import syncope
+        >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password")
+        >>> for result in syn.create_users([create_user_1, create_user_2], concurrency=8):
+        ...     print result['status_code'], result['error']
+        201 None
+        409 {"status":409,"type":"DataIntegrityViolation",<cut>}
+        """
+        if concurrency < 1:
+            raise ValueError('This action needs an concurrency of at least 1 to work!')
+        if isinstance(users, (_text, bytes, dict)):
+            raise ValueError('This action needs an list of users to work, use create_user for one user!')
+
+        return list(_bounded_map(self._create_user_result, users, concurrency))
+
+    @_action
     def update_user(self, arguments):
         """Will update an user.
 
@@ -170,17 +863,60 @@ class Syncope(object):
         {u'status': u'active', u'username': u'wdijkerman', u'creationDate': 1444676322330, <cut>}
         """
         data = self._post("/syncope/rest/user/update", arguments)
+        self._invalidate('users')
+        if self.user_cache is not None:
+            self.user_cache.invalidate(json.loads(arguments).get('id'))
 
         if data.status_code == 200:
             return data.json()
         else:
             return False
 
-    def get_users(self):
+    @_action
+    def update_user_if_changed(self, current=None, desired=None, update_password=False):
+        """Will update an user with only the changes between the current and the desired user, and will not update
+        the user at all when nothing has changed. See syncope.diff.user_mod for how the users are compared.
+
+        :param current: The current user, as returned by get_user_by_id (an dict or syncope.models.User).
+        :param desired: The desired user, an dict with the keys to compare or an syncope.models.User.
+        :param update_password: When True, the password of the desired user is set. Passwords can't be compared, as
+            Syncope only returns the hashed password, so by default the desired password is ignored.
+        :type update_password: bool
+        :return: False when something went wrong, the current user when nothing has changed, or json data with all
+            information from the just updated user.
+        :Example:
+
+        >>> import syncope
+        >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password")
+        >>> current = syn.get_user_by_name("puccini")
+        >>> print syn.update_user_if_changed(current, {'resources': ['ws-target-resource-1']})
+        {u'status': u'active', u'username': u'puccini', <cut>}
+        """
+        if current is None:
+            raise ValueError('This update needs an current user to work!')
+        if desired is None:
+            raise ValueError('This update needs an desired user to work!')
+
+        mod = user_mod(current, desired, update_password)
+        if mod is None:
+            return current
+        return self.update_user(json.dumps(mod))
+
+    @_action
+    def get_users(self, as_model=False):
         """Get information from all users in JSON.
 
+        :param as_model: When True, syncope.models.User objects are returned instead of dicts. They are created while
+            the response is parsed, so the dicts of all users are never in memory at once.
+        :type as_model: bool
         :return: False when something went wrong, or json data with all information from all users.
         """
+        if as_model:
+            try:
+                return [User(user) for user in self.iter_users()]
+            except requests.exceptions.HTTPError:
+                return False
+
         data = self._get(self.rest_users)
 
         if data.status_code == 200:
@@ -188,11 +924,45 @@ class Syncope(object):
         else:
             return False
 
-    def get_user_by_id(self, id=None):
+    @_action
+    def iter_users(self, chunk_size=65536, as_model=False):
+        """Will get all users and yield them one at a time. The response is parsed while it is downloaded, so unlike
+        get_users only one user and one chunk of the response are kept in memory.
+
+        :param chunk_size: The amount of bytes read from the response at once.
+        :type chunk_size: int
+        :param as_model: When True, syncope.models.User objects are returned instead of dicts.
+        :type as_model: bool
+        :return: An generator with json data for every user.
+        :raises requests.exceptions.HTTPError: When the users could not be retrieved.
+        :raises ValueError: When the response is not an valid JSON array.
+        :Example:
+
+        >>> import syncope
+        >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password")
+        >>> for user in syn.iter_users():
+        ...     print user['username']
+        rossini
+        verdi
+        <cut>
+        """
+        data = self._get(self.rest_users, stream=True)
+        try:
+            if data.status_code != 200:
+                raise requests.exceptions.HTTPError('Could not get the users.', response=data)
+            for user in _iter_json_array(data.iter_content(chunk_size), data.encoding or 'utf-8'):
+                yield User(user) if as_model else user
+        finally:
+            data.close()
+
+    @_action
+    def get_user_by_id(self, id=None, as_model=False):
         """Will get all data from specific user, specified via id.
 
         :param id: The id of the user to get information.
         :type id: int
+        :param as_model: When True, an syncope.models.User object is returned instead of an dict.
+        :type as_model: bool
         :return: False when something went wrong, or json data with all information from this specific user.
         :Example:
 
@@ -204,18 +974,30 @@ class Syncope(object):
         if id is None:
             raise ValueError('This search needs an id to work!')
 
-        data = self._get(self.rest_users + "/" + str(id))
+        if self.user_cache is not None:
+            user = self.user_cache.get(id=id)
+            if user is not None:
+                return User(user) if as_model else user
+            generation = self.user_cache.generation
+
+        data = self._get(self.rest_users + "/" + str(id), cache='users')
 
         if data.status_code == 200:
-            return data.json()
+            user = data.json()
+            if self.user_cache is not None:
+                self.user_cache.put(user, generation)
+            return User(user) if as_model else user
         else:
             return False
 
-    def get_users_by_query(self, arguments=None):
+    @_action
+    def get_users_by_query(self, arguments=None, as_model=False):
         """Will search an user. It will require an python dict to be used for the searching.
 
-        :param arguments: An JSON structure. See example for more information.
+        :param arguments: An JSON structure or an syncope.search.Condition. See example for more information.
         :type arguments: JSON
+        :param as_model: When True, syncope.models.User objects are returned instead of dicts.
+        :type as_model: bool
         :return: False when something went wrong, or json data with all information from the search request.
         :Example:
 
@@ -231,17 +1013,18 @@ class Syncope(object):
         if arguments is None:
             raise ValueError('This search needs an dict to work!')
 
-        data = self._post(self.rest_users +"/search", arguments)
+        data = self._post(self.rest_users +"/search", arguments, idempotent=True)
 
         if data.status_code == 200:
-            return data.json()
+            return [User(user) for user in data.json()] if as_model else data.json()
         else:
             return False
 
+    @_action
     def get_user_count_by_query(self, arguments=None):
         """Will count the users matching the search request.
 
-        :param arguments: An JSON structure. See example for more information.
+        :param arguments: An JSON structure or an syncope.search.Condition. See example for more information.
         :type arguments: JSON
         :return: False when something went wrong, or the amount of users matching the request.
         :Example:
@@ -258,22 +1041,25 @@ class Syncope(object):
         if arguments is None:
             raise ValueError('This search needs an dict to work!')
 
-        data = self._post(self.rest_users +"/search/count", arguments)
+        data = self._post(self.rest_users +"/search/count", arguments, idempotent=True)
 
         if data.status_code == 200:
             return data.json()
         else:
             return False
 
-    def get_paged_users_by_query(self, arguments=None, page=None, size=None):
+    @_action
+    def get_paged_users_by_query(self, arguments=None, page=None, size=None, as_model=False):
         """Will search an user and will return the data by pages.
 
-        :param arguments: An JSON structure. See example for more information.
+        :param arguments: An JSON structure or an syncope.search.Condition. See example for more information.
         :type arguments: JSON
         :param page: The page it should return.
         :type page: int
         :param size: The amount of results per page.
         :type size: int
+        :param as_model: When True, syncope.models.User objects are returned instead of dicts.
+        :type as_model: bool
         :return: False when something went wrong, or json data with all information from the search request.
         :Example:
 
@@ -292,18 +1078,103 @@ class Syncope(object):
         if size is None:
             raise ValueError('This search needs an size to work!')
 
-        data = self._post(self.rest_users +"/search", arguments, "?page=" + str(page) + "&size=" + str(size))
+        data = self._post(self.rest_users +"/search", arguments, "?page=" + str(page) + "&size=" + str(size), idempotent=True)
 
         if data.status_code == 200:
-            return data.json()
+            return [User(user) for user in data.json()] if as_model else data.json()
         else:
             return False
 
-    def get_user_by_name(self, username=None):
+    def _get_search_page(self, arguments, page, size):
+        """Will get one page of an user search. This function will be called from the iter_users functions.
+
+        :param arguments: An JSON structure with the search request.
+        :param page: The page it should return.
+        :param size: The amount of results per page.
+        :return: Returns the list of users on this page.
+        """
+        data = self._post(self.rest_users + "/search", arguments, "?page=" + str(page) + "&size=" + str(size), idempotent=True)
+
+        if data.status_code != 200:
+            raise requests.exceptions.HTTPError('Could not get page ' + str(page) + ' of the search.', response=data)
+        return data.json()
+
+    @_action
+    def iter_users_by_query(self, arguments=None, page_size=100, prefetch=1, as_model=False):
+        """Will search users and yield them one at a time. Pages are only requested when they are needed, so only one
+        page is kept in memory.
+
+        The amount of users is counted before the first page is requested, which is used to know when to stop. Users
+        which are created or deleted during the iteration can shift the pages, like with get_paged_users_by_query.
+
+        With prefetch higher then 1, that amount of pages is requested at the same time by an pool of threads. The
+        users are still yielded in page order, and at most 'prefetch' pages are kept in memory. Keep prefetch lower
+        or equal to the pool_maxsize of this object, otherwise the extra connections are not reused.
+
+        :param arguments: An JSON structure or an syncope.search.Condition. See get_users_by_query for more information.
+        :type arguments: JSON
+        :param page_size: The amount of users per requested page.
+        :type page_size: int
+        :param prefetch: The amount of pages which are requested at the same time.
+        :type prefetch: int
+        :param as_model: When True, syncope.models.User objects are returned instead of dicts.
+        :type as_model: bool
+        :return: An generator with json data for every user matching the search request.
+        :raises requests.exceptions.HTTPError: When the users could not be counted or an page could not be retrieved.
+        :Example:
+
+        >>> import syncope
+        >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password")
+        >>> search_req = '{"type":"LEAF","attributableCond":{"type":"EQ","schema":"status","expression":"active"}}'
+        >>> for user in syn.iter_users_by_query(search_req, page_size=500, prefetch=4):
+        ...     print user['username']
+        rossini
+        verdi
+        <cut>
+        """
+        if arguments is None:
+            raise ValueError('This search needs an JSON to work!')
+        if page_size < 1:
+            raise ValueError('This search needs an page_size of at least 1 to work!')
+        if prefetch < 1:
+            raise ValueError('This search needs an prefetch of at least 1 to work!')
+
+        # The arguments are checked above when this function is called, the users are yielded by the generator.
+        return _iterate_as('iter_users_by_query', self._iter_users_by_query(arguments, page_size, prefetch, as_model))
+
+    def _iter_users_by_query(self, arguments, page_size, prefetch, as_model):
+        """Will yield the users of an search for iter_users_by_query.
+
+        :return: An generator with json data for every user matching the search request.
+        """
+        data = self._post(self.rest_users + "/search/count", arguments, idempotent=True)
+        if data.status_code != 200:
+            raise requests.exceptions.HTTPError('Could not count the users of the search.', response=data)
+        pages = (int(data.json()) + page_size - 1) // page_size
+
+        if prefetch > 1 and pages > 1:
+            results = _bounded_map(lambda page: self._get_search_page(arguments, page, page_size),
+                                   range(1, pages + 1), min(prefetch, pages))
+            for users in results:
+                for user in users:
+                    yield User(user) if as_model else user
+            return
+
+        for page in range(1, pages + 1):
+            users = self._get_search_page(arguments, page, page_size)
+            for user in users:
+                yield User(user) if as_model else user
+            if len(users) < page_size:
+                break
+
+    @_action
+    def get_user_by_name(self, username=None, as_model=False):
         """Will get all data from specific user, specified via username.
 
         :param username: The username of the user to get information.
         :type username: string
+        :param as_model: When True, an syncope.models.User object is returned instead of an dict.
+        :type as_model: bool
         :return: False when something went wrong, or json data with all information from this specific user.
         :Example:
 
@@ -314,13 +1185,64 @@ class Syncope(object):
         """
         if username is None:
             raise ValueError('This search needs an username to work!')
+        if self.user_cache is not None:
+            user = self.user_cache.get(username=username)
+            if user is not None:
+                return User(user) if as_model else user
+            generation = self.user_cache.generation
+
         data = self._get(self.rest_users, "?username=" + str(username))
 
         if data.status_code == 200:
-            return data.json()
+            user = data.json()
+            if self.user_cache is not None:
+                self.user_cache.put(user, generation)
+            return User(user) if as_model else user
         else:
             return False
 
+    @_action
+    def resolve_usernames(self, names=None, chunk=50, concurrency=1):
+        """Will get the ids of many users with an few searches, instead of calling get_user_by_name for every user.
+        The usernames are searched in chunks of 'chunk' names with an OR condition, keep it small enough for the
+        maximum request size of the server.
+
+        :param names: The usernames to resolve.
+        :type names: list
+        :param chunk: The amount of usernames per search.
+        :type chunk: int
+        :param concurrency: The amount of searches running at the same time.
+        :type concurrency: int
+        :return: False when something went wrong, or an dict from username to id. Unknown usernames are not in it.
+        :Example:
+
+        >>> import syncope
+        >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password")
+        >>> print syn.resolve_usernames(["rossini", "puccini", "unknown"])
+        {u'rossini': 1, u'puccini': 5}
+        """
+        if names is None:
+            raise ValueError('This search needs usernames to work!')
+        if chunk < 1:
+            raise ValueError('This search needs an chunk of at least 1 to work!')
+
+        names = list(collections.OrderedDict.fromkeys(names))
+        chunks = [names[start:start + chunk] for start in range(0, len(names), chunk)]
+        search = lambda part: self._get_search_page(or_(*[attributable("username").eq(name) for name in part]),
+                                                    1, len(part))
+        result = {}
+        generation = self.user_cache.generation if self.user_cache is not None else None
+        try:
+            for users in _bounded_map(search, chunks, concurrency) if concurrency > 1 else map(search, chunks):
+                for user in users:
+                    result[user['username']] = user['id']
+                    if self.user_cache is not None:
+                        self.user_cache.put(user, generation)
+        except requests.exceptions.HTTPError:
+            return False
+        return result
+
+    @_action
     def get_users_count(self):
         """Will count all users found in Syncope and return an number.
 
@@ -339,6 +1261,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def enable_user_by_id(self, id=None):
         """Will activate an user.
 
@@ -356,11 +1279,15 @@ class Syncope(object):
             raise ValueError('This search needs an id to work!')
 
         data = self._post(self.rest_users + "/" + str(id) + "/status/activate", '{}')
+        self._invalidate('users')
+        if self.user_cache is not None:
+            self.user_cache.invalidate(id)
         if data.status_code == 200:
             return data.json()
         else:
             return False
 
+    @_action
     def enable_user_by_name(self, username=None):
         """Will activate an user.
 
@@ -378,11 +1305,15 @@ class Syncope(object):
             raise ValueError('This search needs an username to work!')
 
         data = self._post(self.rest_users + "/activateByUsername/" + username, '{}')
+        self._invalidate('users')
+        if self.user_cache is not None:
+            self.user_cache.invalidate(username=username)
         if data.status_code == 200:
             return data.json()
         else:
             return False
 
+    @_action
     def reactivate_user_by_id(self, id=None):
         """Will reactivate an user.
 
@@ -400,11 +1331,15 @@ class Syncope(object):
             raise ValueError('This search needs an id to work!')
 
         data = self._post(self.rest_users + "/" + str(id) + "/status/reactivate", '{}')
+        self._invalidate('users')
+        if self.user_cache is not None:
+            self.user_cache.invalidate(id)
         if data.status_code == 200:
             return data.json()
         else:
             return False
 
+    @_action
     def reactivate_user_by_name(self, username=None):
         """Will reactivate an user.
 
@@ -422,11 +1357,15 @@ class Syncope(object):
             raise ValueError('This search needs an username to work!')
 
         data = self._post(self.rest_users + "/reactivateByUsername/" + username, '{}')
+        self._invalidate('users')
+        if self.user_cache is not None:
+            self.user_cache.invalidate(username=username)
         if data.status_code == 200:
             return data.json()
         else:
             return False
 
+    @_action
     def suspend_user_by_id(self, id=None):
         """Will suspend an user.
 
@@ -444,11 +1383,15 @@ class Syncope(object):
             raise ValueError('This search needs an id to work!')
 
         data = self._post(self.rest_users + "/" + str(id) + "/status/suspend", '{}')
+        self._invalidate('users')
+        if self.user_cache is not None:
+            self.user_cache.invalidate(id)
         if data.status_code == 200:
             return data.json()
         else:
             return False
 
+    @_action
     def suspend_user_by_name(self, username=None):
         """Will suspend an user.
 
@@ -466,11 +1409,126 @@ class Syncope(object):
             raise ValueError('This search needs an username to work!')
 
         data = self._post(self.rest_users + "/suspendByUsername/" + username, '{}')
+        self._invalidate('users')
+        if self.user_cache is not None:
+            self.user_cache.invalidate(username=username)
         if data.status_code == 200:
             return data.json()
         else:
             return False
 
+    # Not marked as action, so the requests belong to the called action (or to the bulk action calling this).
+    def bulk_action(self, action, items, concurrency=4, rate=None):
+        """Will call an action for multiple items at the same time, with at most 'concurrency' calls running and
+        'rate' calls started per second. This function is used by the bulk actions like suspend_users, and can be
+        used for other actions too.
+
+        An call fails when the action returns False or raises an exception, like an requests exception or an ValueError
+        for an invalid item. An failed call is logged and will not stop the other calls.
+
+        :param action: The function to call with every item, like suspend_user_by_id.
+        :param items: An iterable with the items, like the ids or usernames of the users.
+        :type items: iterable
+        :param concurrency: The maximum amount of actions running at the same time.
+        :type concurrency: int
+        :param rate: The maximum amount of actions started per second, or None for no limit.
+        :type rate: float
+        :return: An dict with the list of 'succeeded' and 'failed' items.
+        :Example:
+
+        >>> import syncope
+        >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password")
+        >>> print syn.bulk_action(syn.delete_role_by_id, [14, 15], concurrency=2)
+        {'failed': [15], 'succeeded': [14]}
+        """
+        if concurrency < 1:
+            raise ValueError('This action needs an concurrency of at least 1 to work!')
+        limiter = _RateLimiter(rate) if rate else None
+
+        def call(item):
+            if limiter is not None:
+                limiter.wait()
+            try:
+                return item, action(item) is not False
+            except Exception:
+                _log.exception('The action failed for %r', item)
+                return item, False
+
+        summary = {'succeeded': [], 'failed': []}
+        for item, succeeded in _bounded_map(call, items, concurrency):
+            summary['succeeded' if succeeded else 'failed'].append(item)
+        return summary
+
+    @_action
+    def suspend_users(self, users, by_name=False, concurrency=4, rate=None):
+        """Will suspend multiple users at the same time.
+
+        :param users: An iterable with the ids of the users to suspend, or the usernames when by_name is True.
+        :type users: iterable
+        :param by_name: When True, the users are suspended by username instead of by id.
+        :type by_name: bool
+        :param concurrency: The maximum amount of users suspended at the same time.
+        :type concurrency: int
+        :param rate: The maximum amount of users suspended per second, or None for no limit.
+        :type rate: float
+        :return: An dict with the list of 'succeeded' and 'failed' ids or usernames.
+        :Example:
+
+        >>> import syncope
+        >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password")
+        >>> print syn.suspend_users(["rossini", "verdi", "nobody"], by_name=True, concurrency=8, rate=50)
+        {'failed': ['nobody'], 'succeeded': ['rossini', 'verdi']}
+        """
+        action = self.suspend_user_by_name if by_name else self.suspend_user_by_id
+        return self.bulk_action(action, users, concurrency, rate)
+
+    @_action
+    def reactivate_users(self, users, by_name=False, concurrency=4, rate=None):
+        """Will reactivate multiple users at the same time.
+
+        :param users: An iterable with the ids of the users to reactivate, or the usernames when by_name is True.
+        :type users: iterable
+        :param by_name: When True, the users are reactivated by username instead of by id.
+        :type by_name: bool
+        :param concurrency: The maximum amount of users reactivated at the same time.
+        :type concurrency: int
+        :param rate: The maximum amount of users reactivated per second, or None for no limit.
+        :type rate: float
+        :return: An dict with the list of 'succeeded' and 'failed' ids or usernames.
+        :Example:
+
+        >>> import syncope
+        >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password")
+        >>> print syn.reactivate_users([1, 2, 3])
+        {'failed': [], 'succeeded': [1, 2, 3]}
+        """
+        action = self.reactivate_user_by_name if by_name else self.reactivate_user_by_id
+        return self.bulk_action(action, users, concurrency, rate)
+
+    @_action
+    def enable_users(self, users, by_name=False, concurrency=4, rate=None):
+        """Will activate multiple users at the same time.
+
+        :param users: An iterable with the ids of the users to activate, or the usernames when by_name is True.
+        :type users: iterable
+        :param by_name: When True, the users are activated by username instead of by id.
+        :type by_name: bool
+        :param concurrency: The maximum amount of users activated at the same time.
+        :type concurrency: int
+        :param rate: The maximum amount of users activated per second, or None for no limit.
+        :type rate: float
+        :return: An dict with the list of 'succeeded' and 'failed' ids or usernames.
+        :Example:
+
+        >>> import syncope
+        >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password")
+        >>> print syn.enable_users(["rossini", "verdi"], by_name=True)
+        {'failed': [], 'succeeded': ['rossini', 'verdi']}
+        """
+        action = self.enable_user_by_name if by_name else self.enable_user_by_id
+        return self.bulk_action(action, users, concurrency, rate)
+
+    @_action
     def delete_user_by_id(self, id=None):
         """Will delete an user.
 
@@ -482,24 +1540,45 @@ class Syncope(object):
             raise ValueError('This search needs an id to work!')
 
         data = self._get("/syncope/rest/user/delete/" + str(id))
+        self._invalidate('users')
+        if self.user_cache is not None:
+            self.user_cache.invalidate(id)
 
         if data.status_code == 200:
             return True
         else:
             return False
 
+    @_action
     def get_roles(self):
         """Get information from all roles in JSON.
 
         :return: False when something went wrong, or json data with all information from all roles.
         """
-        data = self._get(self.rest_roles)
+        data = self._get(self.rest_roles, revalidate=True, cache='roles')
 
         if data.status_code == 200:
             return data.json()
         else:
             return False
 
+    @_action
+    def get_role_tree(self):
+        """Will get all roles with one request and return them as an tree, for walking the role hierarchy.
+
+        :return: An RoleTree with all roles. See the RoleTree class for more information.
+        :Example:
+
+        >>> import syncope
+        >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password")
+        >>> tree = syn.get_role_tree()
+        >>> print [role['name'] for role in tree.ancestors(2)]
+        [u'root']
+        >>> tree.refresh()
+        """
+        return RoleTree(self)
+
+    @_action
     def get_role_by_id(self, id=None):
         """Will get all data from specific role, specified via id.
 
@@ -523,6 +1602,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def get_parent_role_by_id(self, id=None):
         """Will get all data for the parent of the provided role id.
 
@@ -546,6 +1626,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def get_children_role_by_id(self, id=None):
         """Will get all data for the parent of the provided role id.
 
@@ -569,6 +1650,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def create_role(self, arguments=None):
         """Will create an role.
 
@@ -587,12 +1669,14 @@ class Syncope(object):
             raise ValueError('This search needs JSON data to work!')
 
         data = self._post(self.rest_roles, arguments)
+        self._invalidate('roles', 'entitlements')
 
         if data.status_code == 201:
             return data.json()
         else:
             return False
 
+    @_action
     def delete_role_by_id(self, id=None):
         """Will delete an role.
 
@@ -604,12 +1688,14 @@ class Syncope(object):
             raise ValueError('This search needs an id to work!')
 
         data = self._get("/syncope/rest/role/delete/" + str(id))
+        self._invalidate('roles', 'entitlements')
 
         if data.status_code == 200:
             return True
         else:
             return False
 
+    @_action
     def update_role(self, arguments=None):
         """Will update an role.
 
@@ -628,12 +1714,14 @@ class Syncope(object):
             raise ValueError('This search needs JSON data to work!')
 
         data = self._post("/syncope/rest/role/update", arguments)
+        self._invalidate('roles', 'entitlements')
 
         if data.status_code == 200:
             return data.json()
         else:
             return False
 
+    @_action
     def get_log_levels(self):
         """Get information from all log levels in JSON.
 
@@ -646,6 +1734,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def get_log_level_by_name(self, name=None):
         """Get information for specific log level.
 
@@ -668,6 +1757,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def create_or_update_log_level(self, arguments=None):
         """Will create or update an log level.
 
@@ -699,6 +1789,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def delete_log_level_by_name(self, name=None):
         """Will delete an log level by the name.
 
@@ -721,6 +1812,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def get_audit(self):
         """Get information from all audit rules in JSON.
 
@@ -733,6 +1825,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def create_audit(self, arguments=None):
         """Will create an log level.
 
@@ -757,6 +1850,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def delete_audit(self, arguments=None):
         """Will delete an audit rule.
 
@@ -781,6 +1875,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def get_configurations(self):
         """Will get all configured configuration options.
 
@@ -792,13 +1887,14 @@ class Syncope(object):
         >>> print syn.get_configurations()
         [{u'value': u'SHA1', u'key': u'password.cipher.algorithm'}, {u'value': u'not-existing', <cut>
         """
-        data = self._get(self.rest_configurations)
+        data = self._get(self.rest_configurations, revalidate=True, cache='configurations')
 
         if data.status_code == 200:
             return data.json()
         else:
             return False
 
+    @_action
     def get_configuration_by_key(self, key=None):
         """Will get the info for specific configuration key.
 
@@ -821,6 +1917,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def create_configuration(self, arguments=None):
         """Will create an configuration item.
 
@@ -839,12 +1936,14 @@ class Syncope(object):
             raise ValueError('This search needs JSON data to work!')
 
         data = self._post(self.rest_configurations, arguments)
+        self._invalidate('configurations')
 
         if data.status_code == 201:
             return True
         else:
             return False
 
+    @_action
     def update_configuration(self, arguments=None):
         """Will update the configuration.
 
@@ -869,12 +1968,14 @@ class Syncope(object):
             return False
 
         data = self._put(self.rest_configurations + "/" + config_key, arguments)
+        self._invalidate('configurations')
 
         if data.status_code == 204:
             return True
         else:
             return False
 
+    @_action
     def delete_configuration_by_key(self, key=None):
         """Will delete an configuration item..
 
@@ -892,12 +1993,14 @@ class Syncope(object):
             raise ValueError('This search needs JSON data to work!')
 
         data = self._delete(self.rest_configurations + "/" + key)
+        self._invalidate('configurations')
 
         if data.status_code == 204:
             return True
         else:
             return False
 
+    @_action
     def get_configuration_validators(self):
         """Will get the info for the configuration validators.
 
@@ -916,6 +2019,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def get_configuration_mailtemplates(self):
         """Will get the info for the mailtemplates.
 
@@ -934,6 +2038,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def get_configuration_stream(self):
         """Returns configuration as an downloadable content.xml database export file.
 
@@ -955,6 +2060,109 @@ class Syncope(object):
         else:
             return False
 
+    @_action
+    def download_configuration_stream(self, path_or_fileobj=None, chunk_size=65536, checksum=None, progress=None):
+        """Will write the content.xml database export to an file while it is downloaded, so the export is never
+        completely in memory.
+
+        :param path_or_fileobj: The path of the file to write, or an file object opened in binary mode. An file
+            given by path is removed again when the download fails.
+        :param chunk_size: The amount of bytes read from the response and written at once.
+        :type chunk_size: int
+        :param checksum: Optional name of an hashlib algorithm, like 'sha256', to calculate the checksum of the export.
+        :type checksum: str
+        :param progress: Optional function which is called after every chunk with the amount of written bytes and the
+            total size of the export (None when the server doesn't tell).
+        :return: False when something went wrong, the hexdigest of the export when an checksum is given, or True.
+        :Example:
+
+        >>> import syncope
+        >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password")
+        >>> print syn.download_configuration_stream("/backup/content.xml", checksum="sha256")
+        9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08
+        """
+        if path_or_fileobj is None:
+            raise ValueError('This download needs an path or file object to work!')
+        digest = hashlib.new(checksum) if checksum is not None else None
+
+        data = self._get_xml(self.rest_configurations + "/stream", stream=True)
+        try:
+            if data.status_code != 200:
+                return False
+            total = data.headers.get('Content-Length')
+            total = int(total) if total is not None and total.isdigit() else None
+
+            if hasattr(path_or_fileobj, 'write'):
+                output_file = path_or_fileobj
+            else:
+                output_file = open(path_or_fileobj, 'wb')
+            try:
+                written = 0
+                for chunk in data.iter_content(chunk_size):
+                    output_file.write(chunk)
+                    if digest is not None:
+                        digest.update(chunk)
+                    written += len(chunk)
+                    if progress is not None:
+                        progress(written, total)
+            except Exception:
+                if output_file is not path_or_fileobj:
+                    output_file.close()
+                    os.remove(path_or_fileobj)
+                raise
+            if output_file is not path_or_fileobj:
+                output_file.close()
+        finally:
+            data.close()
+
+        return digest.hexdigest() if digest is not None else True
+
+    @_action
+    def iter_configuration_stream(self, tags=None):
+        """Will get the content.xml database export and yield its rows (the children of the root element) one at a
+        time. The XML is parsed while it is downloaded and every row is cleared when the next one is requested, so
+        the export doesn't need to fit in memory. Copy the information you need from an row before continuing.
+
+        :param tags: Optional list of tags to yield, like ['SyncopeConf']. Other rows are skipped.
+        :type tags: list
+        :return: An generator with an xml.etree.ElementTree.Element for every row.
+        :raises requests.exceptions.HTTPError: When the export could not be retrieved.
+        :Example:
+
+        >>> import syncope
+        >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password")
+        >>> for row in syn.iter_configuration_stream(tags=['SyncopeConf']):
+        ...     print row.get('confKey'), row.get('confValue')
+        token.length 256
+        <cut>
+        """
+        data = self._get_xml(self.rest_configurations + "/stream", stream=True)
+        try:
+            if data.status_code != 200:
+                raise requests.exceptions.HTTPError('Could not get the configuration stream.', response=data)
+            # Let urllib3 undo an gzip or deflate Content-Encoding while reading.
+            data.raw.decode_content = True
+
+            root = None
+            depth = 0
+            for event, element in ET.iterparse(data.raw, events=('start', 'end')):
+                if event == 'start':
+                    if root is None:
+                        root = element
+                    depth += 1
+                    continue
+                depth -= 1
+                if depth != 1:
+                    continue
+                if tags is None or element.tag in tags:
+                    yield element
+                # Drop the row from the root, so it can be freed.
+                element.clear()
+                del root[:]
+        finally:
+            data.close()
+
+    @_action
     def get_entitlements(self):
         """Will return a list of all known entitlements.
 
@@ -966,13 +2174,14 @@ class Syncope(object):
         >>> print syn.get_entitlements()
         [{u'name': u'NOTIFICATION_UPDATE'}, {u'name': u'SCHEMA_CREATE'}, <cut>
         """
-        data = self._get(self.rest_entitlements)
+        data = self._get(self.rest_entitlements, revalidate=True, cache='entitlements')
 
         if data.status_code == 200:
             return data.json()
         else:
             return False
 
+    @_action
     def get_own_entitlements(self):
         """Will return a list of all known entitlements.
 
@@ -991,6 +2200,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def get_notifications(self):
         """Will return a list of all notifications.
 
@@ -1002,13 +2212,14 @@ class Syncope(object):
         >>> print syn.get_notifications()
         [{u'recipientAttrType': u'UserSchema', u'about': {u'membershipCond': None, <cut>
         """
-        data = self._get(self.rest_notifications)
+        data = self._get(self.rest_notifications, revalidate=True)
 
         if data.status_code == 200:
             return data.json()
         else:
             return False
 
+    @_action
     def get_notification_by_id(self, id=None):
         """Will return information for notification by id.
 
@@ -1031,6 +2242,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def create_notification(self, arguments=None):
         """Get create an notification.
 
@@ -1054,6 +2266,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def update_notification_by_id(self, arguments=None):
         """Get information for specific log level.
 
@@ -1077,6 +2290,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def delete_notification_by_id(self, id=None):
         """Get information for specific log level.
 
@@ -1099,6 +2313,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def get_account_policies(self):
         """Will return a list of account policies.
 
@@ -1110,13 +2325,14 @@ class Syncope(object):
         >>> print syn.get_account_policies()
         [{u'usedByResources': [], u'description': u'sample account policy', <cut>
         """
-        data = self._get(self.cxf_account_policies)
+        data = self._get(self.cxf_account_policies, revalidate=True, cache='account_policies')
 
         if data.status_code == 200:
             return data.json()
         else:
             return False
 
+    @_action
     def get_account_policy_by_id(self, id=None):
         """Will return information with account policy for id.
 
@@ -1137,6 +2353,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def create_account_policy(self, arguments=None):
         """Will create an account policy.
 
@@ -1154,12 +2371,14 @@ class Syncope(object):
         if arguments is None:
             raise ValueError('This create needs an JSON to work!')
         data = self._post(self.rest_account_policies + "/create", arguments)
+        self._invalidate('account_policies')
 
         if data.status_code == 200:
             return data.json()
         else:
             return False
 
+    @_action
     def update_account_policy(self, arguments=None):
         """Will update an account policy.
 
@@ -1177,12 +2396,14 @@ class Syncope(object):
         if arguments is None:
             raise ValueError('This update needs an JSON to work!')
         data = self._post(self.rest_account_policies + "/update", arguments)
+        self._invalidate('account_policies')
 
         if data.status_code == 200:
             return data.json()
         else:
             return False
 
+    @_action
     def delete_account_policy(self, id=None):
         """Will delete an account policy.
 
@@ -1199,12 +2420,14 @@ class Syncope(object):
         if id is None:
             raise ValueError('This delete needs an id to work!')
         data = self._delete(self.cxf_account_policies + "/" + str(id))
+        self._invalidate('account_policies')
 
         if data.status_code == 204:
             return True
         else:
             return False
 
+    @_action
     def get_sync_policies(self):
         """Will return a list of sync policies.
 
@@ -1216,13 +2439,14 @@ class Syncope(object):
         >>> print syn.get_account_policies()
         [{u'usedByResources': [u'resource-csv'], u'description': u'sync policy 2' <cut>
         """
-        data = self._get(self.cxf_sync_policies)
+        data = self._get(self.cxf_sync_policies, revalidate=True)
 
         if data.status_code == 200:
             return data.json()
         else:
             return False
 
+    @_action
     def get_sync_policy_by_id(self, id=None):
         """Will return information with sync policy for id.
 
@@ -1243,6 +2467,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def create_sync_policy(self, arguments=None):
         """Will create an sync policy.
 
@@ -1266,6 +2491,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def update_sync_policy(self, arguments=None):
         """Will update an sync policy.
 
@@ -1289,6 +2515,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def delete_sync_policy(self, id=None):
         """Will delete an account policy.
 
@@ -1311,6 +2538,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def get_password_policies(self):
         """Will return a list of password policies.
 
@@ -1322,13 +2550,14 @@ class Syncope(object):
         >>> print syn.get_account_policies()
         [{u'usedByResources': [u'resource-csv'], u'description': u'password policy 2' <cut>
         """
-        data = self._get(self.cxf_password_policies)
+        data = self._get(self.cxf_password_policies, revalidate=True)
 
         if data.status_code == 200:
             return data.json()
         else:
             return False
 
+    @_action
     def get_password_policy_by_id(self, id=None):
         """Will return information with password policy for id.
 
@@ -1349,6 +2578,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def create_password_policy(self, arguments=None):
         """Will create an password policy.
 
@@ -1372,6 +2602,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def update_password_policy(self, arguments=None):
         """Will update an password policy.
 
@@ -1395,6 +2626,7 @@ class Syncope(object):
         else:
             return False
 
+    @_action
     def delete_password_policy(self, id=None):
         """Will delete an account policy.
 
@@ -0,0 +1,487 @@
+"""Asyncio version of the Syncope Rest Interface. This module needs python 3.5+ and aiohttp, so it is not built
+or imported on python 2: use syncope.aio instead of importing this module."""
+
+import asyncio
+import json
+
+import aiohttp
+
+
+class AsyncSyncope(object):
+
+    """Asyncio Syncope Rest Interface.
+
+    All actions are coroutines with the same arguments and return values as the actions of the Syncope class, so
+    see the Syncope class for their documentation and examples.
+    """
+
+    def __init__(self, syncope_url='', username=None, password=None, timeout=10, pool_maxsize=100, keep_alive=60,
+                 concurrency=100):
+        """
+        Will initialize the syncope module.
+
+        All requests are send via one aiohttp session, which is created with the first request and closed with
+        close() (or when used as an async context manager).
+
+        :param syncope_url: the URL to the Syncope server.
+        :param username: The username to login.
+        :param password: The password for the user configured in username.
+        :param timeout: HTTP requests timeout in seconds.
+        :param pool_maxsize: The maximum amount of connections kept open to the Syncope server.
+        :param keep_alive: Idle time in seconds after which pooled connections are dropped.
+        :param concurrency: The maximum amount of requests running at the same time.
+        :Example:
+
+        >>> import asyncio
+        >>> from syncope.aio import AsyncSyncope
+        >>> async def main():
+        ...     async with AsyncSyncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password") as syn:
+        ...         return await asyncio.gather(*[syn.get_user_by_id(id) for id in range(1, 6)])
+        >>> print(asyncio.get_event_loop().run_until_complete(main()))
+        [{'status': 'active', 'username': 'rossini', <cut>}, <cut>]
+        """
+        if not syncope_url:
+            raise ValueError('This interface needs an Syncope URL to work!')
+
+        if not username:
+            raise ValueError('This interface needs an username to work!')
+
+        if not password:
+            raise ValueError('This interface needs an password to work!')
+
+        self.syncope_url = syncope_url
+        self.headers = {'Content-Type': 'application/json'}
+        self.username = username
+        self.password = password
+        self.timeout = int(timeout)
+        self.pool_maxsize = int(pool_maxsize)
+        self.keep_alive = keep_alive
+        self.concurrency = int(concurrency)
+        self.session = None
+        self._semaphore = None
+        self.rest_configurations = 'syncope/cxf/configurations'
+        self.cxf_account_policies = 'syncope/cxf/policies/account'
+        self.cxf_sync_policies = 'syncope/cxf/policies/sync'
+        self.cxf_password_policies = 'syncope/cxf/policies/password'
+        self.rest_account_policies = 'syncope/rest/policy/account'
+        self.rest_sync_policies = 'syncope/rest/policy/sync'
+        self.rest_password_policies = 'syncope/rest/policy/password'
+        self.rest_entitlements = 'syncope/cxf/entitlements'
+        self.rest_logging = 'syncope/cxf/logger/normal'
+        self.rest_log_audit = 'syncope/cxf/logger/audit'
+        self.rest_notifications = 'syncope/cxf/notifications'
+        self.rest_roles = 'syncope/cxf/roles'
+        self.rest_users = 'syncope/cxf/users'
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Will close the session and all its connections to the Syncope server.
+
+        :return: None
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _get_session(self):
+        """Will return the aiohttp session, created on first use so it belongs to the running event loop.
+
+        :return: Returns the aiohttp session.
+        """
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_maxsize, keepalive_timeout=self.keep_alive)
+            self.session = aiohttp.ClientSession(connector=connector,
+                                                 auth=aiohttp.BasicAuth(self.username, self.password),
+                                                 timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self.session
+
+    async def _request(self, method, rest_path, arguments=None, params=None, xml=False):
+        """Will send the request to the syncope server. This function will be called from the actual actions.
+
+        :param method: The HTTP method, like GET or POST.
+        :param rest_path: uri of the rest action.
+        :param arguments: Optional arguments in JSON format.
+        :param params: Optional parameters to the uri, like: ?username=something.
+        :param xml: When True, the request is done with XML instead of JSON.
+        :return: Returns the status code and the body of the response.
+        """
+        if xml:
+            syncope_path = "{0}/{1}{2}".format(self.syncope_url, rest_path, params or '')
+            headers = {'Content-Type': 'application/xml'}
+        else:
+            syncope_path = "{0}/{1}.json{2}".format(self.syncope_url, rest_path, params or '')
+            headers = self.headers
+
+        session = self._get_session()
+        async with self._semaphore:
+            async with session.request(method, syncope_path, headers=headers, data=arguments) as response:
+                return response.status, await response.read()
+
+    async def _call(self, method, rest_path, arguments=None, params=None, status=200, result='json'):
+        """Will do the request and will return the result like the Syncope actions do.
+
+        :param method: The HTTP method, like GET or POST.
+        :param rest_path: uri of the rest action.
+        :param arguments: Optional arguments in JSON format.
+        :param params: Optional parameters to the uri, like: ?username=something.
+        :param status: The status code of an successful request.
+        :param result: What to return on success: 'json' for the json data, 'text' for the body or 'true' for True.
+        :return: False when something went wrong, or the result.
+        """
+        if method in ('POST', 'PUT') and arguments is None:
+            raise ValueError('No arguments are given to ' + method + '.')
+
+        status_code, body = await self._request(method, rest_path, arguments, params, xml=result == 'text')
+
+        if status_code != status:
+            return False
+        if result == 'json':
+            return json.loads(body.decode('utf-8'))
+        if result == 'text':
+            return body.decode('utf-8')
+        return True
+
+    async def create_user(self, arguments):
+        """See Syncope.create_user."""
+        return await self._call('POST', self.rest_users, arguments, status=201)
+
+    async def update_user(self, arguments):
+        """See Syncope.update_user."""
+        return await self._call('POST', "/syncope/rest/user/update", arguments)
+
+    async def get_users(self):
+        """See Syncope.get_users."""
+        return await self._call('GET', self.rest_users)
+
+    async def get_user_by_id(self, id=None):
+        """See Syncope.get_user_by_id."""
+        if id is None:
+            raise ValueError('This search needs an id to work!')
+        return await self._call('GET', self.rest_users + "/" + str(id))
+
+    async def get_users_by_query(self, arguments=None):
+        """See Syncope.get_users_by_query."""
+        if arguments is None:
+            raise ValueError('This search needs an dict to work!')
+        return await self._call('POST', self.rest_users + "/search", arguments)
+
+    async def get_user_count_by_query(self, arguments=None):
+        """See Syncope.get_user_count_by_query."""
+        if arguments is None:
+            raise ValueError('This search needs an dict to work!')
+        return await self._call('POST', self.rest_users + "/search/count", arguments)
+
+    async def get_paged_users_by_query(self, arguments=None, page=None, size=None):
+        """See Syncope.get_paged_users_by_query."""
+        if arguments is None:
+            raise ValueError('This search needs an JSON to work!')
+        if page is None:
+            raise ValueError('This search needs an page to work!')
+        if size is None:
+            raise ValueError('This search needs an size to work!')
+        return await self._call('POST', self.rest_users + "/search", arguments,
+                                "?page=" + str(page) + "&size=" + str(size))
+
+    async def get_user_by_name(self, username=None):
+        """See Syncope.get_user_by_name."""
+        if username is None:
+            raise ValueError('This search needs an username to work!')
+        return await self._call('GET', self.rest_users, params="?username=" + str(username))
+
+    async def get_users_count(self):
+        """See Syncope.get_users_count."""
+        return await self._call('GET', self.rest_users + "/count")
+
+    async def enable_user_by_id(self, id=None):
+        """See Syncope.enable_user_by_id."""
+        if id is None:
+            raise ValueError('This search needs an id to work!')
+        return await self._call('POST', self.rest_users + "/" + str(id) + "/status/activate", '{}')
+
+    async def enable_user_by_name(self, username=None):
+        """See Syncope.enable_user_by_name."""
+        if username is None:
+            raise ValueError('This search needs an username to work!')
+        return await self._call('POST', self.rest_users + "/activateByUsername/" + username, '{}')
+
+    async def reactivate_user_by_id(self, id=None):
+        """See Syncope.reactivate_user_by_id."""
+        if id is None:
+            raise ValueError('This search needs an id to work!')
+        return await self._call('POST', self.rest_users + "/" + str(id) + "/status/reactivate", '{}')
+
+    async def reactivate_user_by_name(self, username=None):
+        """See Syncope.reactivate_user_by_name."""
+        if username is None:
+            raise ValueError('This search needs an username to work!')
+        return await self._call('POST', self.rest_users + "/reactivateByUsername/" + username, '{}')
+
+    async def suspend_user_by_id(self, id=None):
+        """See Syncope.suspend_user_by_id."""
+        if id is None:
+            raise ValueError('This search needs an id to work!')
+        return await self._call('POST', self.rest_users + "/" + str(id) + "/status/suspend", '{}')
+
+    async def suspend_user_by_name(self, username=None):
+        """See Syncope.suspend_user_by_name."""
+        if username is None:
+            raise ValueError('This search needs an username to work!')
+        return await self._call('POST', self.rest_users + "/suspendByUsername/" + username, '{}')
+
+    async def delete_user_by_id(self, id=None):
+        """See Syncope.delete_user_by_id."""
+        if id is None:
+            raise ValueError('This search needs an id to work!')
+        return await self._call('GET', "/syncope/rest/user/delete/" + str(id), result='true')
+
+    async def get_roles(self):
+        """See Syncope.get_roles."""
+        return await self._call('GET', self.rest_roles)
+
+    async def get_role_by_id(self, id=None):
+        """See Syncope.get_role_by_id."""
+        if id is None:
+            raise ValueError('This search needs an id to work!')
+        return await self._call('GET', self.rest_roles + "/" + str(id))
+
+    async def get_parent_role_by_id(self, id=None):
+        """See Syncope.get_parent_role_by_id."""
+        if id is None:
+            raise ValueError('This search needs an id to work!')
+        return await self._call('GET', self.rest_roles + "/" + str(id) + "/parent")
+
+    async def get_children_role_by_id(self, id=None):
+        """See Syncope.get_children_role_by_id."""
+        if id is None:
+            raise ValueError('This search needs an id to work!')
+        return await self._call('GET', self.rest_roles + "/" + str(id) + "/children")
+
+    async def create_role(self, arguments=None):
+        """See Syncope.create_role."""
+        if arguments is None:
+            raise ValueError('This search needs JSON data to work!')
+        return await self._call('POST', self.rest_roles, arguments, status=201)
+
+    async def delete_role_by_id(self, id=None):
+        """See Syncope.delete_role_by_id."""
+        if id is None:
+            raise ValueError('This search needs an id to work!')
+        return await self._call('GET', "/syncope/rest/role/delete/" + str(id), result='true')
+
+    async def update_role(self, arguments=None):
+        """See Syncope.update_role."""
+        if arguments is None:
+            raise ValueError('This search needs JSON data to work!')
+        return await self._call('POST', "/syncope/rest/role/update", arguments)
+
+    async def get_log_levels(self):
+        """See Syncope.get_log_levels."""
+        return await self._call('GET', self.rest_logging)
+
+    async def get_log_level_by_name(self, name=None):
+        """See Syncope.get_log_level_by_name."""
+        if name is None:
+            raise ValueError('This search needs log level name to work!')
+        return await self._call('GET', self.rest_logging + "/" + name)
+
+    async def create_or_update_log_level(self, arguments=None):
+        """See Syncope.create_or_update_log_level."""
+        if arguments is None:
+            raise ValueError('This search needs JSON data to work!')
+        json_data = json.loads(arguments)
+        if not json_data:
+            return False
+        return await self._call('POST', "syncope/rest/logger/log/" + json_data['name'] + "/" + json_data['level'],
+                                arguments)
+
+    async def delete_log_level_by_name(self, name=None):
+        """See Syncope.delete_log_level_by_name."""
+        if name is None:
+            raise ValueError('This search needs log level name to work!')
+        return await self._call('DELETE', self.rest_logging + "/" + name, status=204, result='true')
+
+    async def get_audit(self):
+        """See Syncope.get_audit."""
+        return await self._call('GET', self.rest_log_audit)
+
+    async def create_audit(self, arguments=None):
+        """See Syncope.create_audit."""
+        if arguments is None:
+            raise ValueError('This search needs JSON data to work!')
+        return await self._call('PUT', "syncope/rest/logger/audit/enable", arguments, result='true')
+
+    async def delete_audit(self, arguments=None):
+        """See Syncope.delete_audit."""
+        if arguments is None:
+            raise ValueError('This search needs JSON data to work!')
+        return await self._call('PUT', "syncope/rest/logger/audit/disable", arguments, result='true')
+
+    async def get_configurations(self):
+        """See Syncope.get_configurations."""
+        return await self._call('GET', self.rest_configurations)
+
+    async def get_configuration_by_key(self, key=None):
+        """See Syncope.get_configuration_by_key."""
+        if key is None:
+            raise ValueError('This search needs an configuration key to work!')
+        return await self._call('GET', self.rest_configurations + "/" + key)
+
+    async def create_configuration(self, arguments=None):
+        """See Syncope.create_configuration."""
+        if arguments is None:
+            raise ValueError('This search needs JSON data to work!')
+        return await self._call('POST', self.rest_configurations, arguments, status=201, result='true')
+
+    async def update_configuration(self, arguments=None):
+        """See Syncope.update_configuration."""
+        if arguments is None:
+            raise ValueError('This search needs JSON data to work!')
+        json_data = json.loads(arguments)
+        if "key" not in json_data:
+            return False
+        return await self._call('PUT', self.rest_configurations + "/" + json_data['key'], arguments, status=204,
+                                result='true')
+
+    async def delete_configuration_by_key(self, key=None):
+        """See Syncope.delete_configuration_by_key."""
+        if key is None:
+            raise ValueError('This search needs JSON data to work!')
+        return await self._call('DELETE', self.rest_configurations + "/" + key, status=204, result='true')
+
+    async def get_configuration_validators(self):
+        """See Syncope.get_configuration_validators."""
+        return await self._call('GET', self.rest_configurations + "/validators")
+
+    async def get_configuration_mailtemplates(self):
+        """See Syncope.get_configuration_mailtemplates."""
+        return await self._call('GET', self.rest_configurations + "/mailTemplates")
+
+    async def get_configuration_stream(self):
+        """See Syncope.get_configuration_stream. Unlike the Syncope version, this will return the XML as text."""
+        return await self._call('GET', self.rest_configurations + "/stream", result='text')
+
+    async def get_entitlements(self):
+        """See Syncope.get_entitlements."""
+        return await self._call('GET', self.rest_entitlements)
+
+    async def get_own_entitlements(self):
+        """See Syncope.get_own_entitlements."""
+        return await self._call('GET', self.rest_entitlements + "/own")
+
+    async def get_notifications(self):
+        """See Syncope.get_notifications."""
+        return await self._call('GET', self.rest_notifications)
+
+    async def get_notification_by_id(self, id=None):
+        """See Syncope.get_notification_by_id."""
+        if id is None:
+            raise ValueError('This search needs an id to work!')
+        return await self._call('GET', self.rest_notifications + "/" + str(id))
+
+    async def create_notification(self, arguments=None):
+        """See Syncope.create_notification."""
+        if arguments is None:
+            raise ValueError('This search needs an JSON to work!')
+        return await self._call('POST', self.rest_notifications, arguments, status=201, result='true')
+
+    async def update_notification_by_id(self, arguments=None):
+        """See Syncope.update_notification_by_id."""
+        if arguments is None:
+            raise ValueError('This search needs an JSON to work!')
+        return await self._call('POST', "syncope/rest/notification/update", arguments, result='true')
+
+    async def delete_notification_by_id(self, id=None):
+        """See Syncope.delete_notification_by_id."""
+        if id is None:
+            raise ValueError('This search needs an JSON to work!')
+        return await self._call('DELETE', self.rest_notifications + "/" + str(id), status=204, result='true')
+
+    async def get_account_policies(self):
+        """See Syncope.get_account_policies."""
+        return await self._call('GET', self.cxf_account_policies)
+
+    async def get_account_policy_by_id(self, id=None):
+        """See Syncope.get_account_policy_by_id."""
+        if id is None:
+            raise ValueError('This needs an ID to work!')
+        return await self._call('GET', self.cxf_account_policies + "/" + str(id))
+
+    async def create_account_policy(self, arguments=None):
+        """See Syncope.create_account_policy."""
+        if arguments is None:
+            raise ValueError('This create needs an JSON to work!')
+        return await self._call('POST', self.rest_account_policies + "/create", arguments)
+
+    async def update_account_policy(self, arguments=None):
+        """See Syncope.update_account_policy."""
+        if arguments is None:
+            raise ValueError('This update needs an JSON to work!')
+        return await self._call('POST', self.rest_account_policies + "/update", arguments)
+
+    async def delete_account_policy(self, id=None):
+        """See Syncope.delete_account_policy."""
+        if id is None:
+            raise ValueError('This delete needs an id to work!')
+        return await self._call('DELETE', self.cxf_account_policies + "/" + str(id), status=204, result='true')
+
+    async def get_sync_policies(self):
+        """See Syncope.get_sync_policies."""
+        return await self._call('GET', self.cxf_sync_policies)
+
+    async def get_sync_policy_by_id(self, id=None):
+        """See Syncope.get_sync_policy_by_id."""
+        if id is None:
+            raise ValueError('This needs an ID to work!')
+        return await self._call('GET', self.cxf_account_policies + "/" + str(id))
+
+    async def create_sync_policy(self, arguments=None):
+        """See Syncope.create_sync_policy."""
+        if arguments is None:
+            raise ValueError('This create needs an JSON to work!')
+        return await self._call('POST', self.rest_sync_policies + "/create", arguments)
+
+    async def update_sync_policy(self, arguments=None):
+        """See Syncope.update_sync_policy."""
+        if arguments is None:
+            raise ValueError('This update needs an JSON to work!')
+        return await self._call('POST', self.rest_sync_policies + "/update", arguments)
+
+    async def delete_sync_policy(self, id=None):
+        """See Syncope.delete_sync_policy."""
+        if id is None:
+            raise ValueError('This delete needs an id to work!')
+        return await self._call('DELETE', self.cxf_sync_policies + "/" + str(id), status=204, result='true')
+
+    async def get_password_policies(self):
+        """See Syncope.get_password_policies."""
+        return await self._call('GET', self.cxf_password_policies)
+
+    async def get_password_policy_by_id(self, id=None):
+        """See Syncope.get_password_policy_by_id."""
+        if id is None:
+            raise ValueError('This needs an ID to work!')
+        return await self._call('GET', self.cxf_account_policies + "/" + str(id))
+
+    async def create_password_policy(self, arguments=None):
+        """See Syncope.create_password_policy."""
+        if arguments is None:
+            raise ValueError('This create needs an JSON to work!')
+        return await self._call('POST', self.rest_password_policies + "/create", arguments)
+
+    async def update_password_policy(self, arguments=None):
+        """See Syncope.update_password_policy."""
+        if arguments is None:
+            raise ValueError('This update needs an JSON to work!')
+        return await self._call('POST', self.rest_password_policies + "/update", arguments)
+
+    async def delete_password_policy(self, id=None):
+        """See Syncope.delete_password_policy."""
+        if id is None:
+            raise ValueError('This delete needs an id to work!')
+        return await self._call('DELETE', self.cxf_password_policies + "/" + str(id), status=204, result='true')
@@ -0,0 +1,14 @@
+"""Asyncio version of the Syncope Rest Interface. This module needs python 3.5+ and aiohttp.
+
+The interface itself is in syncope._aio, which is only built and imported on python 3.5+ as it uses the async syntax.
+On python 2 importing this module raises an ImportError, like when aiohttp is not installed.
+"""
+
+import sys
+
+if sys.version_info < (3, 5):
+    raise ImportError('syncope.aio needs python 3.5 or newer.')
+
+from syncope._aio import AsyncSyncope
+
+__all__ = ['AsyncSyncope']
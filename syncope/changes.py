@@ -0,0 +1,166 @@
+"""Will poll Syncope for the users which are created or changed since the previous poll.
+
+Syncope 1.1 only keeps the creationDate and the changePwdDate of an user, there is no date of the last change. So
+with Syncope 1.1 only new users and users with an changed password are found: changes of attributes, memberships,
+resources or the status are not seen. Syncope 1.2 has an lastChangeDate, which can be given as one of the fields.
+"""
+
+import json
+import os
+import time
+
+import requests
+
+from syncope.models import User
+from syncope.search import attributable, or_
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+# The dates of an user in Syncope 1.1.
+DATE_FIELDS = ('creationDate', 'changePwdDate')
+
+
+def _changed(user, fields):
+    """Will return the last of the dates of an user, in milliseconds."""
+    return max(user.get(field) or 0 for field in fields)
+
+
+def _write_atomic(path, data):
+    """Will write the file via an temporary file, so the file is never half written."""
+    temporary = '{0}.{1}.tmp'.format(path, os.getpid())
+    with open(temporary, 'w') as temporary_file:
+        temporary_file.write(data)
+        temporary_file.flush()
+        os.fsync(temporary_file.fileno())
+    try:
+        os.replace(temporary, path)
+    except AttributeError:
+        # Python 2 has no os.replace, rename only replaces an existing file on posix.
+        os.rename(temporary, path)
+
+
+class ChangeFeed(object):
+
+    """Will search the users with one of the date fields (by default creationDate or changePwdDate) since the
+    watermark, the last date seen in the previous poll. The watermark is saved in an file, so the next process
+    continues where this one stopped. See the module documentation for which changes are found with Syncope 1.1.
+
+    The watermark only moves after all changed users of an poll are handled, so an user is never skipped. When an
+    process stops during an poll, the users of that poll are returned again by the next one.
+    """
+
+    def __init__(self, syncope=None, path=None, watermark=0, page_size=100, date_format=DATE_FORMAT, as_model=False,
+                 fields=DATE_FIELDS):
+        """
+        Will initialize the change feed.
+
+        :param syncope: The Syncope object to use.
+        :param path: Optional path of the file to keep the watermark in. It is created after the first poll.
+        :param watermark: The date in milliseconds to start from when there is no watermark file. The default of 0
+            returns all users in the first poll.
+        :param page_size: The amount of users per requested page.
+        :param date_format: The format of the dates in the searches (in UTC), or None to search with milliseconds.
+        :param as_model: When True, syncope.models.User objects are returned instead of dicts.
+        :param fields: The date fields of the user to search. Use ('creationDate', 'lastChangeDate') with an Syncope
+            version which has an lastChangeDate, to find all changes.
+        :Example:
+
+        >>> import syncope
+        >>> from syncope.changes import ChangeFeed
+        >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password")
+        >>> feed = ChangeFeed(syn, "/var/lib/sync/syncope.watermark")
+        >>> for user in feed.poll():
+        ...     print user['username']
+        wdijkerman
+        """
+        if syncope is None:
+            raise ValueError('This change feed needs an Syncope object to work!')
+        if not fields:
+            raise ValueError('This change feed needs date fields to work!')
+
+        self.syncope = syncope
+        self.path = path
+        self.page_size = page_size
+        self.date_format = date_format
+        self.as_model = as_model
+        self.fields = tuple(fields)
+        self.watermark = watermark
+        # The ids of the users changed at exactly the watermark, which are already returned.
+        self.seen = set()
+        self.load()
+
+    def load(self):
+        """Will read the watermark from the file, when it exists.
+
+        :return: The watermark in milliseconds.
+        """
+        if self.path is not None and os.path.exists(self.path):
+            with open(self.path) as watermark_file:
+                data = json.load(watermark_file)
+            self.watermark = data['watermark']
+            self.seen = set(data.get('seen', []))
+        return self.watermark
+
+    def save(self):
+        """Will write the watermark to the file.
+
+        :return: None
+        """
+        if self.path is not None:
+            _write_atomic(self.path, json.dumps({'watermark': self.watermark, 'seen': sorted(self.seen)}))
+
+    def query(self):
+        """Will return the search condition for the users changed since the watermark.
+
+        :return: An syncope.search.Condition.
+        """
+        if self.date_format is None:
+            since = self.watermark
+        else:
+            # Dates in searches have no milliseconds, so the search starts at the second of the watermark.
+            since = time.strftime(self.date_format, time.gmtime(self.watermark // 1000))
+        return or_(*[attributable(field).ge(since) for field in self.fields])
+
+    def poll(self):
+        """Will return the users created or changed since the previous poll. The watermark is moved and saved when all
+        users are returned.
+
+        :return: An generator with json data for every changed user.
+        :raises requests.exceptions.HTTPError: When an page of the search could not be retrieved.
+        """
+        query = self.query()
+        watermark = self.watermark
+        seen = set(self.seen)
+        page = 1
+        while True:
+            users = self.syncope.get_paged_users_by_query(query, page, self.page_size)
+            if users is False:
+                raise requests.exceptions.HTTPError('Could not get page ' + str(page) + ' of the changed users.')
+            for user in users:
+                changed = _changed(user, self.fields)
+                if changed < self.watermark or changed == self.watermark and user['id'] in self.seen:
+                    continue
+                if changed > watermark:
+                    watermark = changed
+                    seen = set()
+                if changed == watermark:
+                    seen.add(user['id'])
+                yield User(user) if self.as_model else user
+            if len(users) < self.page_size:
+                break
+            page += 1
+
+        self.watermark = watermark
+        self.seen = seen
+        self.save()
+
+    def follow(self, interval=600):
+        """Will poll forever, with 'interval' seconds between the polls.
+
+        :param interval: The time in seconds between the start of two polls.
+        :return: An generator with json data for every changed user.
+        """
+        while True:
+            started = time.time()
+            for user in self.poll():
+                yield user
+            time.sleep(max(0, interval - (time.time() - started)))
@@ -0,0 +1,136 @@
+"""Will create the UserMod for update_user with only the changes between an user and its desired state."""
+
+from syncope.models import User
+
+
+def _as_dict(user):
+    return user.as_dict() if isinstance(user, User) else user
+
+
+def _index(attributes, skip=()):
+    """Will convert attributes (an list of {schema, values} dicts, or an dict from schema to values) to an dict from
+    schema to an list of values."""
+    if attributes is None:
+        return {}
+    if isinstance(attributes, dict):
+        items = attributes.items()
+    else:
+        items = ((attribute['schema'], attribute.get('values')) for attribute in attributes)
+    index = {}
+    for schema, values in items:
+        if schema in skip:
+            continue
+        if values is None:
+            values = []
+        elif not isinstance(values, (list, tuple, set)):
+            values = [values]
+        index[schema] = list(values)
+    return index
+
+
+def _readonly(attributes):
+    if attributes is None or isinstance(attributes, dict):
+        return frozenset()
+    return frozenset(attribute['schema'] for attribute in attributes if attribute.get('readonly'))
+
+
+def _values_mods(current, desired):
+    """Will return the attribute mods and the removed schemas to change the current attributes to the desired ones.
+    Syncope returns the schemas of an user without values too, these are the same as absent schemas."""
+    updated = []
+    for schema, values in sorted(desired.items()):
+        old = current.get(schema, [])
+        added = [value for value in values if value not in old]
+        removed = [value for value in old if value not in values]
+        if added or removed:
+            updated.append({'schema': schema, 'valuesToBeAdded': added, 'valuesToBeRemoved': removed})
+    removed = sorted(schema for schema, values in current.items() if values and schema not in desired)
+    return updated, removed
+
+
+def user_mod(current, desired, update_password=False):
+    """Will create the UserMod with only the changes needed to change the current user to the desired user.
+
+    Only the keys which are in the desired user are compared, so an desired user without 'memberships' will not
+    change the memberships. But the keys which are given are complete: attributes which are not in the desired
+    'attributes' are removed. Attributes can be given like Syncope returns them (an list of {schema, values} dicts) or
+    as an dict from schema to values. Attributes without values are the same as absent attributes, and readonly
+    attributes of the current user are never changed.
+
+    Syncope only returns the hashed password of an user, so an password can't be compared. The desired password is
+    ignored, unless update_password is True: then it is always send.
+
+    :param current: The current user, as returned by get_user_by_id (an dict or syncope.models.User).
+    :param desired: The desired user, an dict with the keys to compare or an syncope.models.User.
+    :param update_password: When True, the password of the desired user is set.
+    :return: None when nothing has to be changed, or the UserMod as dict.
+    :Example:
+
+    >>> import syncope
+    >>> from syncope.diff import user_mod
+    >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password")
+    >>> current = syn.get_user_by_id(5)
+    >>> attributes = {'firstname': 'Giacomo', 'surname': 'Puccini', 'fullname': 'Giacomo Puccini',
+    ...               'userId': 'puccini@apache.org'}
+    >>> print user_mod(current, {'attributes': attributes})
+    None
+    >>> print user_mod(current, {'attributes': {'firstname': 'Giacomo', 'surname': 'Puccini', 'ctype': 'opera'}})
+    {'id': 5, 'attributesToBeUpdated': [{'schema': 'ctype', 'valuesToBeAdded': ['opera'], 'valuesToBeRemoved': []}],
+     'attributesToBeRemoved': ['fullname', 'userId']}
+    """
+    current = _as_dict(current)
+    desired = _as_dict(desired)
+    mod = {}
+
+    if desired.get('username') is not None and desired['username'] != current.get('username'):
+        mod['username'] = desired['username']
+    if update_password and desired.get('password'):
+        mod['password'] = desired['password']
+
+    for key, updated_key, removed_key in (('attributes', 'attributesToBeUpdated', 'attributesToBeRemoved'),
+                                          ('virtualAttributes', 'virtualAttributesToBeUpdated',
+                                           'virtualAttributesToBeRemoved')):
+        if key not in desired:
+            continue
+        readonly = _readonly(current.get(key))
+        updated, removed = _values_mods(_index(current.get(key), readonly), _index(desired[key], readonly))
+        if updated:
+            mod[updated_key] = updated
+        if removed:
+            mod[removed_key] = removed
+
+    if 'derivedAttributes' in desired:
+        old = set(_index(current.get('derivedAttributes')))
+        new = set(_index(desired['derivedAttributes']))
+        if new - old:
+            mod['derivedAttributesToBeAdded'] = sorted(new - old)
+        if old - new:
+            mod['derivedAttributesToBeRemoved'] = sorted(old - new)
+
+    if 'resources' in desired:
+        old = current.get('resources') or []
+        new = desired['resources'] or []
+        added = [resource for resource in new if resource not in old]
+        removed = [resource for resource in old if resource not in new]
+        if added:
+            mod['resourcesToBeAdded'] = added
+        if removed:
+            mod['resourcesToBeRemoved'] = removed
+
+    if 'memberships' in desired:
+        # Memberships can be given as membership dicts or as role ids.
+        roles = [membership['roleId'] if isinstance(membership, dict) else membership
+                 for membership in desired['memberships'] or []]
+        current_roles = dict((membership['roleId'], membership['id'])
+                             for membership in current.get('memberships') or [])
+        added = [{'role': role} for role in roles if role not in current_roles]
+        removed = [id for role, id in sorted(current_roles.items()) if role not in roles]
+        if added:
+            mod['membershipsToBeAdded'] = added
+        if removed:
+            mod['membershipsToBeRemoved'] = removed
+
+    if not mod:
+        return None
+    mod['id'] = current['id']
+    return mod
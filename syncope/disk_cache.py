@@ -0,0 +1,163 @@
+"""SQLite cache for the responses of the Syncope class, which can be shared by multiple processes."""
+
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_TTLS = {
+    'roles': 300,
+    'configurations': 300,
+    'entitlements': 3600,
+    'account_policies': 300,
+    'users': 60,
+}
+
+
+class DiskCache(object):
+
+    """Will keep the responses of read actions in an SQLite database file, so short living processes on the same host
+    don't have to request the same information again.
+
+    The responses are grouped per endpoint, every endpoint has its own time to live:
+
+    * roles: get_roles
+    * configurations: get_configurations
+    * entitlements: get_entitlements
+    * account_policies: get_account_policies
+    * users: get_user_by_id
+
+    The write actions of an Syncope object using the cache will remove the responses of the changed endpoint.
+    Changes made by other clients are only seen after the time to live.
+
+    The database file is created readable for its owner only, as it contains the responses of the Syncope server.
+    """
+
+    def __init__(self, path=None, ttls=None, default_ttl=300, timeout=30):
+        """
+        Will initialize the cache.
+
+        :param path: The path of the SQLite database file, which is created (with mode 0600) when it doesn't exist.
+        :param ttls: Optional dict with the time to live in seconds per endpoint, overriding DEFAULT_TTLS. An time to
+            live of 0 will disable the cache for that endpoint.
+        :type ttls: dict
+        :param default_ttl: The time to live in seconds of endpoints which are not in ttls or DEFAULT_TTLS.
+        :param timeout: The time in seconds to wait when an other process has locked the database.
+        :Example:
+
+        >>> import syncope
+        >>> from syncope.disk_cache import DiskCache
+        >>> cache = DiskCache("/var/cache/syncope.sqlite", ttls={'roles': 3600})
+        >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password", disk_cache=cache)
+        >>> print len(syn.get_roles())
+        14
+        """
+        if not path:
+            raise ValueError('This cache needs an path to work!')
+
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.default_ttl = default_ttl
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+
+    def _connect(self):
+        # An connection can't be used after an fork, so every process opens its own.
+        if self._connection is None or self._pid != os.getpid():
+            # SQLite creates the file with the umask, and the WAL files with the mode of the database file.
+            os.close(os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600))
+            connection = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+            try:
+                connection.execute('PRAGMA journal_mode=WAL')
+            except sqlite3.DatabaseError:
+                pass
+            connection.execute('CREATE TABLE IF NOT EXISTS responses (endpoint TEXT NOT NULL, key TEXT NOT NULL, '
+                               'expires REAL NOT NULL, content_type TEXT, encoding TEXT, body BLOB NOT NULL, '
+                               'PRIMARY KEY (endpoint, key))')
+            connection.commit()
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def ttl(self, endpoint):
+        """Will return the time to live of an endpoint.
+
+        :param endpoint: The name of the endpoint, like roles.
+        :return: The time to live in seconds.
+        """
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, endpoint, key):
+        """Will return an cached response.
+
+        :param endpoint: The name of the endpoint, like roles.
+        :param key: The key of the response within the endpoint.
+        :return: None when the response is not cached or expired, or an (body, content_type, encoding) tuple.
+        """
+        if not self.ttl(endpoint):
+            return None
+        with self.lock:
+            row = self._connect().execute('SELECT body, content_type, encoding FROM responses WHERE endpoint = ? AND '
+                                          'key = ? AND expires > ?', (endpoint, key, time.time())).fetchone()
+        if row is None:
+            return None
+        return bytes(row[0]), row[1], row[2]
+
+    def put(self, endpoint, key, body, content_type=None, encoding=None):
+        """Will cache an response for the time to live of its endpoint.
+
+        :param endpoint: The name of the endpoint, like roles.
+        :param key: The key of the response within the endpoint.
+        :param body: The body of the response as bytes.
+        :param content_type: The Content-Type header of the response.
+        :param encoding: The encoding of the body.
+        :return: None
+        """
+        ttl = self.ttl(endpoint)
+        if not ttl:
+            return
+        now = time.time()
+        with self.lock:
+            connection = self._connect()
+            with connection:
+                connection.execute('DELETE FROM responses WHERE expires <= ?', (now,))
+                connection.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                                   (endpoint, key, now + ttl, content_type, encoding, sqlite3.Binary(body)))
+
+    def invalidate(self, endpoint, key=None):
+        """Will remove the cached responses of an endpoint.
+
+        :param endpoint: The name of the endpoint, like roles.
+        :param key: Optional key, to only remove that response of the endpoint.
+        :return: None
+        """
+        with self.lock:
+            connection = self._connect()
+            with connection:
+                if key is None:
+                    connection.execute('DELETE FROM responses WHERE endpoint = ?', (endpoint,))
+                else:
+                    connection.execute('DELETE FROM responses WHERE endpoint = ? AND key = ?', (endpoint, key))
+
+    def clear(self):
+        """Will remove all cached responses.
+
+        :return: None
+        """
+        with self.lock:
+            connection = self._connect()
+            with connection:
+                connection.execute('DELETE FROM responses')
+
+    def close(self):
+        """Will close the database connection of this process.
+
+        :return: None
+        """
+        with self.lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
@@ -0,0 +1,792 @@
+"""In-process stand-in for an Syncope 1.1 server, for tests and benchmarks without an real Syncope instance."""
+
+import base64
+import calendar
+import collections
+import copy
+import hashlib
+import json
+import random
+import re
+import socket
+import sys
+import threading
+import time
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs
+
+
+def _now():
+    return int(time.time() * 1000)
+
+
+def _attribute(schema, *values):
+    return {"schema": schema, "values": list(values), "readonly": False}
+
+
+def _sample_user(id, username, firstname, surname, roles=()):
+    return {
+        "id": id, "username": username, "password": "5baa61e4c9b93f3f0682250b6cf8331b7ee68fd8", "status": "active",
+        "token": None, "tokenExpireTime": None, "creationDate": 1287572400000, "changePwdDate": None,
+        "lastLoginDate": None, "failedLogins": 0,
+        "attributes": [_attribute("firstname", firstname), _attribute("surname", surname),
+                       _attribute("fullname", firstname + " " + surname),
+                       _attribute("userId", username + "@apache.org"), _attribute("ctype")],
+        "derivedAttributes": [], "virtualAttributes": [], "resources": [], "propagationStatusTOs": [],
+        "memberships": [{"id": id * 10 + index, "roleId": role_id, "roleName": role_name, "attributes": [],
+                         "derivedAttributes": [], "virtualAttributes": [], "resources": [],
+                         "propagationStatusTOs": []} for index, (role_id, role_name) in enumerate(roles)],
+    }
+
+
+def _sample_role(id, name, parent):
+    return {"id": id, "name": name, "parent": parent, "attributes": [], "derivedAttributes": [],
+            "virtualAttributes": [], "resources": [], "entitlements": [], "inheritAttributes": False,
+            "inheritDerivedAttributes": False, "inheritVirtualAttributes": False, "inheritOwner": False,
+            "inheritAccountPolicy": False, "inheritPasswordPolicy": False, "userOwner": None, "roleOwner": None,
+            "accountPolicy": None, "passwordPolicy": None}
+
+
+def sample_data(extra_users=0):
+    """Will return an small data set, based on the test content of Syncope 1.1.
+
+    :param extra_users: The amount of generated users (user1, user2, ...) added to the 5 sample users.
+    :return: An dict with the users, roles, configurations, loggers, audits, entitlements, notifications and policies.
+    """
+    roles = [(1, "root", 0), (2, "child", 1), (3, "citizen", 0), (4, "employee", 1), (5, "secretary", 4),
+             (6, "director", 4), (7, "managingDirector", 6), (8, "otherchild", 1), (9, "roleForWorkflowApproval", 0),
+             (10, "managingCompany", 0), (11, "roleForWorkflowOptIn", 0), (12, "aRoleForPropagation", 0),
+             (13, "bRoleForPropagation", 0), (14, "artDirector", 10)]
+    return {
+        "users": [_sample_user(1, "rossini", "Gioacchino", "Rossini", [(1, "root"), (2, "child")]),
+                  _sample_user(2, "verdi", "Giuseppe", "Verdi", [(1, "root")]),
+                  _sample_user(3, "vivaldi", "Antonio", "Vivaldi"),
+                  _sample_user(4, "bellini", "Vincenzo", "Bellini"),
+                  _sample_user(5, "puccini", "Giacomo", "Puccini", [(14, "artDirector")])] +
+                 [_sample_user(100 + index, "user" + str(index), "User", str(index), [(2, "child")])
+                  for index in range(1, extra_users + 1)],
+        "roles": [_sample_role(*role) for role in roles],
+        "configurations": [{"key": "password.cipher.algorithm", "value": "SHA1"},
+                           {"key": "notificationjob.cronExpression", "value": ""},
+                           {"key": "token.length", "value": "256"},
+                           {"key": "token.expireTime", "value": "60"}],
+        "loggers": [{"name": "ROOT", "level": "INFO"}, {"name": "org.apache.syncope", "level": "INFO"},
+                    {"name": "org.apache.syncope.core.rest", "level": "DEBUG"}],
+        "audits": [],
+        "entitlements": [{"name": name} for name in ("USER_LIST", "USER_CREATE", "USER_READ", "USER_UPDATE",
+                                                     "USER_DELETE", "ROLE_LIST", "ROLE_CREATE", "ROLE_READ",
+                                                     "ROLE_UPDATE", "ROLE_DELETE", "CONFIGURATION_LIST",
+                                                     "NOTIFICATION_LIST", "POLICY_LIST")],
+        "notifications": [{"id": 1, "events": ["create"], "about": None, "recipients": None,
+                           "recipientAttrType": "UserSchema", "recipientAttrName": "email", "selfAsRecipient": True,
+                           "sender": "admin@syncope.apache.org", "subject": "Welcome", "template": "optin",
+                           "traceLevel": "FAILURES"}],
+        "policies": {"account": [{"id": 5, "type": "GLOBAL_ACCOUNT", "description": "global account policy",
+                                  "specification": {"maxLength": 0, "minLength": 0}}],
+                     "password": [{"id": 2, "type": "GLOBAL_PASSWORD", "description": "global password policy",
+                                   "specification": {"historyLength": 1, "maxLength": 0, "minLength": 8}}],
+                     "sync": [{"id": 3, "type": "GLOBAL_SYNC", "description": "global sync policy",
+                               "specification": {"conflictResolutionAction": "IGNORE"}}]},
+    }
+
+
+def _to_number(value):
+    """Will convert an search expression or an user value to an number, so they can be compared.
+
+    Dates are accepted as milliseconds or as "yyyy-MM-dd HH:mm:ss" (UTC), the format used by Syncope searches.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        parsed = time.strptime(str(value), "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+    return calendar.timegm(parsed) * 1000
+
+
+def _compare(operator, values, expression):
+    """Will compare the values of an user against the expression of an search condition."""
+    values = [value for value in values if value not in (None, "")]
+    if operator == "ISNULL":
+        return not values
+    if operator == "ISNOTNULL":
+        return bool(values)
+    if operator == "EQ":
+        return any(str(value) == str(expression) for value in values)
+    if operator == "LIKE":
+        pattern = re.compile("^" + re.escape(str(expression)).replace("\\%", ".*").replace("%", ".*")
+                             .replace("\\_", ".").replace("_", ".") + "$", re.DOTALL)
+        return any(pattern.match(str(value)) for value in values)
+
+    for value in values:
+        left, right = _to_number(value), _to_number(expression)
+        if left is None or right is None:
+            left, right = str(value), str(expression)
+        if operator == "GT" and left > right or operator == "GE" and left >= right or \
+                operator == "LT" and left < right or operator == "LE" and left <= right:
+            return True
+    return False
+
+
+def _matches(condition, user):
+    """Will evaluate an Syncope 1.1 search condition for an user.
+
+    :param condition: The search condition as python dict, like {"type": "LEAF", "attributableCond": {...}}.
+    :param user: The user as python dict.
+    :return: True when the user matches the condition.
+    """
+    node_type = condition.get("type", "LEAF")
+    if node_type == "AND":
+        return _matches(condition["leftNodeCond"], user) and _matches(condition["rightNodeCond"], user)
+    if node_type == "OR":
+        return _matches(condition["leftNodeCond"], user) or _matches(condition["rightNodeCond"], user)
+
+    if condition.get("attributableCond"):
+        cond = condition["attributableCond"]
+        result = _compare(cond["type"], [user.get(cond["schema"])], cond.get("expression"))
+    elif condition.get("attributeCond"):
+        cond = condition["attributeCond"]
+        values = []
+        for attribute in user.get("attributes", []) + user.get("derivedAttributes", []):
+            if attribute["schema"] == cond["schema"]:
+                values.extend(attribute["values"])
+        result = _compare(cond["type"], values, cond.get("expression"))
+    elif condition.get("resourceCond"):
+        result = condition["resourceCond"]["resourceName"] in user.get("resources", [])
+    elif condition.get("membershipCond"):
+        cond = condition["membershipCond"]
+        result = any(membership["roleId"] == cond.get("roleId") or membership["roleName"] == cond.get("roleName")
+                     for membership in user.get("memberships", []))
+    else:
+        raise ValueError("Unsupported search condition: " + json.dumps(condition))
+
+    return not result if node_type == "NOT_LEAF" else result
+
+
+class _Store(object):
+
+    """In-memory data of the fake server."""
+
+    def __init__(self, data):
+        self.lock = threading.RLock()
+        self.users = collections.OrderedDict((user["id"], user) for user in data["users"])
+        self.roles = collections.OrderedDict((role["id"], role) for role in data["roles"])
+        self.configurations = collections.OrderedDict((conf["key"], conf) for conf in data["configurations"])
+        self.loggers = collections.OrderedDict((logger["name"], logger) for logger in data["loggers"])
+        self.audits = list(data["audits"])
+        self.entitlements = list(data["entitlements"])
+        self.notifications = collections.OrderedDict((notification["id"], notification)
+                                                     for notification in data["notifications"])
+        self.policies = dict((policy_type, collections.OrderedDict((policy["id"], policy) for policy in policies))
+                             for policy_type, policies in data["policies"].items())
+        ids = list(self.users) + list(self.roles) + list(self.notifications) + \
+            [id for policies in self.policies.values() for id in policies]
+        self.last_id = max(ids or [0])
+
+    def next_id(self):
+        self.last_id += 1
+        return self.last_id
+
+    def find_user(self, username):
+        for user in self.users.values():
+            if user["username"] == username:
+                return user
+        return None
+
+
+def _apply_attribute_mods(attributes, to_update, to_remove, value_key="values"):
+    """Will apply the attribute changes of an UserMod or RoleMod to the list of attributes."""
+    by_schema = collections.OrderedDict((attribute["schema"], attribute) for attribute in attributes)
+    for schema in to_remove:
+        by_schema.pop(schema, None)
+    for mod in to_update:
+        if isinstance(mod, dict):
+            attribute = by_schema.setdefault(mod["schema"], {"schema": mod["schema"], value_key: [],
+                                                             "readonly": False})
+            values = [value for value in attribute[value_key] if value not in mod.get("valuesToBeRemoved", [])]
+            values.extend(value for value in mod.get("valuesToBeAdded", []) if value not in values)
+            attribute[value_key] = values
+        else:
+            by_schema.setdefault(mod, {"schema": mod, value_key: [], "readonly": False})
+    return list(by_schema.values())
+
+
+class FakeSyncopeHandler(BaseHTTPRequestHandler):
+
+    """Handles the requests for the FakeSyncopeServer."""
+
+    protocol_version = "HTTP/1.1"
+    # Send the headers and body of an response at once, small responses would otherwise wait for delayed ACKs.
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    routes = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def do_PUT(self):
+        self._handle()
+
+    def do_DELETE(self):
+        self._handle()
+
+    def _handle(self):
+        fake = self.server.fake
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        fake._record(self.command, self.path)
+
+        delay = fake._delay()
+        if delay:
+            time.sleep(delay)
+
+        error = fake._error()
+        if error:
+            return self._send(error, {"status": error, "type": "Unavailable"})
+
+        if not self._authorized(fake):
+            return self._send(401, {"status": 401, "type": "Unauthorized"})
+
+        # Some actions use an rest path starting with an slash, so the path can start with "//".
+        path, _, query = self.path.partition("?")
+        path = path.strip("/")
+        is_json = path.endswith(".json")
+        if is_json:
+            path = path[:-len(".json")]
+        query = dict((key, values[0]) for key, values in parse_qs(query).items())
+        try:
+            arguments = json.loads(body.decode("utf-8")) if body else None
+        except ValueError:
+            return self._send(400, {"status": 400, "type": "InvalidJSON"})
+
+        for method, pattern, action in self.routes:
+            if method != self.command:
+                continue
+            match = pattern.match(path)
+            if match:
+                with fake.store.lock:
+                    result = action(fake.store, arguments, query, *match.groups())
+                status, data = result[0], result[1]
+                return self._send(status, data, xml=not is_json and isinstance(data, str))
+        return self._send(404, {"status": 404, "type": "NotFound"})
+
+    def _authorized(self, fake):
+        header = self.headers.get("Authorization") or ""
+        if not header.startswith("Basic "):
+            return False
+        credentials = base64.b64decode(header[len("Basic "):].encode("ascii")).decode("utf-8")
+        return credentials == fake.username + ":" + fake.password
+
+    def _send(self, status, data, xml=False):
+        if data is None:
+            body = b""
+        elif xml:
+            body = data.encode("utf-8")
+        else:
+            body = json.dumps(data).encode("utf-8")
+
+        etag = None
+        if self.command == "GET" and status == 200:
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                status, body = 304, b""
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/xml" if xml else "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _route(method, pattern):
+    """Will register an function as the handler of the requests matching the method and path pattern."""
+    def register(action):
+        FakeSyncopeHandler.routes.append((method, re.compile("^" + pattern + "$"), action))
+        return action
+    return register
+
+
+def _found(data, status=200):
+    if data is None:
+        return 404, {"status": 404, "type": "NotFound"}
+    return status, copy.deepcopy(data)
+
+
+def _search(store, arguments, query):
+    users = [user for user in store.users.values() if _matches(arguments, user)]
+    if "page" in query:
+        size = int(query.get("size", 10))
+        page = int(query["page"])
+        users = users[(page - 1) * size:page * size]
+    return users
+
+
+@_route("GET", "syncope/cxf/users")
+def _get_users(store, arguments, query):
+    if "username" in query:
+        return _found(store.find_user(query["username"]))
+    return _found(list(store.users.values()))
+
+
+@_route("GET", "syncope/cxf/users/count")
+def _count_users(store, arguments, query):
+    return 200, len(store.users)
+
+
+@_route("GET", r"syncope/cxf/users/(\d+)")
+def _get_user(store, arguments, query, id):
+    return _found(store.users.get(int(id)))
+
+
+def _hash_password(password):
+    """Will hash an password like Syncope does with the default password.cipher.algorithm (SHA1)."""
+    return hashlib.sha1(password.encode("utf-8")).hexdigest()
+
+
+def _membership(store, role):
+    return {"id": store.next_id(), "roleId": role["id"], "roleName": role["name"], "attributes": [],
+            "derivedAttributes": [], "virtualAttributes": [], "resources": [], "propagationStatusTOs": []}
+
+
+@_route("POST", "syncope/cxf/users")
+def _create_user(store, arguments, query):
+    if not arguments or not arguments.get("username"):
+        return 400, {"status": 400, "type": "RequiredValuesMissing", "elements": ["username"]}
+    if store.find_user(arguments["username"]) is not None:
+        return 409, {"status": 409, "type": "DataIntegrityViolation", "elements": [arguments["username"]]}
+    id = store.next_id()
+    user = _sample_user(id, arguments["username"], "", "")
+    user.update(copy.deepcopy(arguments))
+    user.update({"id": id, "status": "active", "creationDate": _now(), "failedLogins": 0})
+    if arguments.get("password"):
+        user["password"] = _hash_password(arguments["password"])
+    roles = [store.roles.get(membership.get("roleId")) for membership in arguments.get("memberships") or []]
+    user["memberships"] = [_membership(store, role) for role in roles if role is not None]
+    store.users[user["id"]] = user
+    return _found(user, 201)
+
+
+@_route("POST", r"syncope/cxf/users/search")
+def _search_users(store, arguments, query):
+    return 200, copy.deepcopy(_search(store, arguments, query))
+
+
+@_route("POST", r"syncope/cxf/users/search/count")
+def _search_users_count(store, arguments, query):
+    return 200, len(_search(store, arguments, {}))
+
+
+def _set_status(user, action):
+    if user is None:
+        return _found(None)
+    user["status"] = "suspended" if action == "suspend" else "active"
+    return _found(user)
+
+
+@_route("POST", r"syncope/cxf/users/(\d+)/status/(activate|reactivate|suspend)")
+def _set_status_by_id(store, arguments, query, id, action):
+    return _set_status(store.users.get(int(id)), action)
+
+
+@_route("POST", r"syncope/cxf/users/(activate|reactivate|suspend)ByUsername/(.+)")
+def _set_status_by_name(store, arguments, query, action, username):
+    return _set_status(store.find_user(username), action)
+
+
+@_route("POST", "syncope/rest/user/update")
+def _update_user(store, arguments, query):
+    user = store.users.get((arguments or {}).get("id"))
+    if user is None:
+        return _found(None)
+    if arguments.get("username") and arguments["username"] != user["username"]:
+        if store.find_user(arguments["username"]) is not None:
+            return 409, {"status": 409, "type": "DataIntegrityViolation", "elements": [arguments["username"]]}
+        user["username"] = arguments["username"]
+    if arguments.get("password"):
+        user["password"] = _hash_password(arguments["password"])
+        user["changePwdDate"] = _now()
+    user["attributes"] = _apply_attribute_mods(user["attributes"], arguments.get("attributesToBeUpdated", []),
+                                               arguments.get("attributesToBeRemoved", []))
+    user["derivedAttributes"] = _apply_attribute_mods(user["derivedAttributes"],
+                                                      arguments.get("derivedAttributesToBeAdded", []),
+                                                      arguments.get("derivedAttributesToBeRemoved", []))
+    user["virtualAttributes"] = _apply_attribute_mods(user["virtualAttributes"],
+                                                      arguments.get("virtualAttributesToBeUpdated", []),
+                                                      arguments.get("virtualAttributesToBeRemoved", []))
+    resources = [resource for resource in user["resources"] if resource not in arguments.get("resourcesToBeRemoved", [])]
+    resources.extend(resource for resource in arguments.get("resourcesToBeAdded", []) if resource not in resources)
+    user["resources"] = resources
+    memberships = [membership for membership in user["memberships"]
+                   if membership["id"] not in arguments.get("membershipsToBeRemoved", [])]
+    for mod in arguments.get("membershipsToBeAdded", []):
+        role = store.roles.get(mod.get("role"))
+        if role is not None and not any(membership["roleId"] == role["id"] for membership in memberships):
+            memberships.append(_membership(store, role))
+    user["memberships"] = memberships
+    return _found(user)
+
+
+@_route("GET", r"syncope/rest/user/delete/(\d+)")
+def _delete_user(store, arguments, query, id):
+    return _found(store.users.pop(int(id), None))
+
+
+@_route("GET", "syncope/cxf/roles")
+def _get_roles(store, arguments, query):
+    return _found(list(store.roles.values()))
+
+
+@_route("GET", r"syncope/cxf/roles/(\d+)")
+def _get_role(store, arguments, query, id):
+    return _found(store.roles.get(int(id)))
+
+
+@_route("GET", r"syncope/cxf/roles/(\d+)/parent")
+def _get_parent_role(store, arguments, query, id):
+    role = store.roles.get(int(id))
+    return _found(store.roles.get(role["parent"]) if role is not None else None)
+
+
+@_route("GET", r"syncope/cxf/roles/(\d+)/children")
+def _get_children_roles(store, arguments, query, id):
+    if int(id) not in store.roles:
+        return _found(None)
+    return _found([role for role in store.roles.values() if role["parent"] == int(id)])
+
+
+@_route("POST", "syncope/cxf/roles")
+def _create_role(store, arguments, query):
+    if not arguments or not arguments.get("name"):
+        return 400, {"status": 400, "type": "RequiredValuesMissing", "elements": ["name"]}
+    id = store.next_id()
+    role = _sample_role(id, arguments["name"], arguments.get("parent", 0))
+    role.update(copy.deepcopy(arguments))
+    role["id"] = id
+    store.roles[role["id"]] = role
+    return _found(role, 201)
+
+
+@_route("POST", "syncope/rest/role/update")
+def _update_role(store, arguments, query):
+    role = store.roles.get((arguments or {}).get("id"))
+    if role is None:
+        return _found(None)
+    if arguments.get("name"):
+        role["name"] = arguments["name"]
+    role["attributes"] = _apply_attribute_mods(role["attributes"], arguments.get("attributesToBeUpdated", []),
+                                               arguments.get("attributesToBeRemoved", []))
+    return _found(role)
+
+
+@_route("GET", r"syncope/rest/role/delete/(\d+)")
+def _delete_role(store, arguments, query, id):
+    return _found(store.roles.pop(int(id), None))
+
+
+@_route("GET", "syncope/cxf/logger/normal")
+def _get_loggers(store, arguments, query):
+    return _found(list(store.loggers.values()))
+
+
+@_route("GET", r"syncope/cxf/logger/normal/([^/]+)")
+def _get_logger(store, arguments, query, name):
+    return _found(store.loggers.get(name))
+
+
+@_route("POST", r"syncope/rest/logger/log/([^/]+)/([^/]+)")
+def _set_logger(store, arguments, query, name, level):
+    store.loggers[name] = {"name": name, "level": level}
+    return _found(store.loggers[name])
+
+
+@_route("DELETE", r"syncope/cxf/logger/normal/([^/]+)")
+def _delete_logger(store, arguments, query, name):
+    return (204, None) if store.loggers.pop(name, None) is not None else _found(None)
+
+
+@_route("GET", "syncope/cxf/logger/audit")
+def _get_audits(store, arguments, query):
+    return _found(store.audits)
+
+
+@_route("PUT", "syncope/rest/logger/audit/(enable|disable)")
+def _set_audit(store, arguments, query, action):
+    if not arguments:
+        return 400, {"status": 400, "type": "InvalidJSON"}
+    store.audits = [audit for audit in store.audits if audit != arguments]
+    if action == "enable":
+        store.audits.append(arguments)
+    return 200, None
+
+
+@_route("GET", "syncope/cxf/configurations")
+def _get_configurations(store, arguments, query):
+    return _found(list(store.configurations.values()))
+
+
+@_route("GET", "syncope/cxf/configurations/validators")
+def _get_validators(store, arguments, query):
+    return 200, ["org.apache.syncope.core.persistence.validation.attrvalue.AlwaysTrueValidator",
+                 "org.apache.syncope.core.persistence.validation.attrvalue.BasicValidator",
+                 "org.apache.syncope.core.persistence.validation.attrvalue.EmailAddressValidator"]
+
+
+@_route("GET", "syncope/cxf/configurations/mailTemplates")
+def _get_mail_templates(store, arguments, query):
+    return 200, ["confirmPasswordReset", "optin", "requestPasswordReset"]
+
+
+@_route("GET", "syncope/cxf/configurations/stream")
+def _get_configuration_stream(store, arguments, query):
+    rows = ['<?xml version="1.0" encoding="UTF-8" standalone="no"?>', "<dataset>"]
+    for conf in store.configurations.values():
+        rows.append('  <SyncopeConf confKey=%s confValue=%s/>' % (json.dumps(conf["key"]), json.dumps(conf["value"])))
+    for role in store.roles.values():
+        rows.append('  <SyncopeRole id="%d" name=%s parent_id="%d"/>' % (role["id"], json.dumps(role["name"]),
+                                                                        role["parent"]))
+    for user in store.users.values():
+        rows.append('  <SyncopeUser id="%d" username=%s status=%s/>' % (user["id"], json.dumps(user["username"]),
+                                                                       json.dumps(user["status"])))
+    rows.append("</dataset>")
+    return 200, str("\n".join(rows))
+
+
+@_route("GET", r"syncope/cxf/configurations/([^/]+)")
+def _get_configuration(store, arguments, query, key):
+    return _found(store.configurations.get(key))
+
+
+@_route("POST", "syncope/cxf/configurations")
+def _create_configuration(store, arguments, query):
+    if not arguments or "key" not in arguments:
+        return 400, {"status": 400, "type": "RequiredValuesMissing", "elements": ["key"]}
+    store.configurations[arguments["key"]] = arguments
+    return 201, None
+
+
+@_route("PUT", r"syncope/cxf/configurations/([^/]+)")
+def _update_configuration(store, arguments, query, key):
+    if key not in store.configurations:
+        return _found(None)
+    store.configurations[key] = arguments
+    return 204, None
+
+
+@_route("DELETE", r"syncope/cxf/configurations/([^/]+)")
+def _delete_configuration(store, arguments, query, key):
+    return (204, None) if store.configurations.pop(key, None) is not None else _found(None)
+
+
+@_route("GET", "syncope/cxf/entitlements(?:/own)?")
+def _get_entitlements(store, arguments, query):
+    return _found(store.entitlements)
+
+
+@_route("GET", "syncope/cxf/notifications")
+def _get_notifications(store, arguments, query):
+    return _found(list(store.notifications.values()))
+
+
+@_route("GET", r"syncope/cxf/notifications/(\d+)")
+def _get_notification(store, arguments, query, id):
+    return _found(store.notifications.get(int(id)))
+
+
+@_route("POST", "syncope/cxf/notifications")
+def _create_notification(store, arguments, query):
+    if not arguments:
+        return 400, {"status": 400, "type": "InvalidJSON"}
+    notification = copy.deepcopy(arguments)
+    notification["id"] = store.next_id()
+    store.notifications[notification["id"]] = notification
+    return 201, None
+
+
+@_route("POST", "syncope/rest/notification/update")
+def _update_notification(store, arguments, query):
+    if (arguments or {}).get("id") not in store.notifications:
+        return _found(None)
+    store.notifications[arguments["id"]] = copy.deepcopy(arguments)
+    return _found(arguments)
+
+
+@_route("DELETE", r"syncope/cxf/notifications/(\d+)")
+def _delete_notification(store, arguments, query, id):
+    return (204, None) if store.notifications.pop(int(id), None) is not None else _found(None)
+
+
+@_route("GET", "syncope/cxf/policies/(account|sync|password)")
+def _get_policies(store, arguments, query, policy_type):
+    return _found(list(store.policies[policy_type].values()))
+
+
+@_route("GET", r"syncope/cxf/policies/(?:account|sync|password)/(\d+)")
+def _get_policy(store, arguments, query, id):
+    for policies in store.policies.values():
+        if int(id) in policies:
+            return _found(policies[int(id)])
+    return _found(None)
+
+
+@_route("POST", "syncope/rest/policy/(account|sync|password)/create")
+def _create_policy(store, arguments, query, policy_type):
+    if not arguments:
+        return 400, {"status": 400, "type": "InvalidJSON"}
+    policy = copy.deepcopy(arguments)
+    policy["id"] = store.next_id()
+    store.policies[policy_type][policy["id"]] = policy
+    return _found(policy)
+
+
+@_route("POST", "syncope/rest/policy/(account|sync|password)/update")
+def _update_policy(store, arguments, query, policy_type):
+    if (arguments or {}).get("id") not in store.policies[policy_type]:
+        return _found(None)
+    store.policies[policy_type][arguments["id"]] = copy.deepcopy(arguments)
+    return _found(arguments)
+
+
+@_route("DELETE", r"syncope/cxf/policies/(account|sync|password)/(\d+)")
+def _delete_policy(store, arguments, query, policy_type, id):
+    return (204, None) if store.policies[policy_type].pop(int(id), None) is not None else _found(None)
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients closing an streamed response early will reset the connection, which is not an error here.
+        if not isinstance(sys.exc_info()[1], socket.error):
+            HTTPServer.handle_error(self, request, client_address)
+
+
+class FakeSyncopeServer(object):
+
+    """Stand-in for an Syncope 1.1 server, running in an background thread of this process.
+
+    It implements the users, roles, configurations, logger, entitlements, notifications and policies endpoints used by
+    the Syncope class against an in-memory store, with optional latency and error injection.
+    """
+
+    def __init__(self, username="admin", password="password", data=None, latency=0, error_rate=0, error_status=503,
+                 seed=None, host="127.0.0.1", port=0):
+        """
+        Will initialize the fake server. The server is started with start() or when used as an context manager.
+
+        :param username: The username which is accepted.
+        :param password: The password which is accepted.
+        :param data: The initial data, like returned by sample_data(). Defaults to sample_data().
+        :param latency: Seconds added to every request, or an (minimum, maximum) tuple for an random latency.
+        :param error_rate: The fraction of requests (0 - 1) which is answered with error_status.
+        :param error_status: The HTTP status code of the injected errors.
+        :param seed: Optional seed for the random latency and errors, to make them reproducible.
+        :param host: The address to listen on.
+        :param port: The port to listen on, 0 to use an free port.
+        :Example:
+
+        >>> import syncope
+        >>> from syncope.fake_server import FakeSyncopeServer
+        >>> with FakeSyncopeServer(latency=0.005) as server:
+        ...     syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password")
+        ...     print syn.get_user_by_id(5)['username']
+        puccini
+        """
+        self.username = username
+        self.password = password
+        self.store = _Store(copy.deepcopy(data if data is not None else sample_data()))
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.host = host
+        self.port = port
+        self.request_count = 0
+        self.requests = collections.deque(maxlen=10000)
+        self._errors = collections.deque()
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def url(self):
+        """The URL to use as syncope_url."""
+        return "http://{0}:{1}".format(self.host, self.port)
+
+    def start(self):
+        """Will start the server in an background thread.
+
+        :return: None
+        """
+        self._server = _ThreadingHTTPServer((self.host, self.port), FakeSyncopeHandler)
+        self._server.fake = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Will stop the server.
+
+        :return: None
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def inject_errors(self, count=1, status=None):
+        """Will answer the next 'count' requests with an error.
+
+        :param count: The amount of requests which will fail.
+        :param status: The HTTP status code of the errors, defaults to error_status.
+        :return: None
+        """
+        with self._lock:
+            self._errors.extend([status or self.error_status] * count)
+
+    def _record(self, method, path):
+        with self._lock:
+            self.request_count += 1
+            self.requests.append((method, path))
+
+    def _delay(self):
+        if isinstance(self.latency, (tuple, list)):
+            with self._lock:
+                return self.random.uniform(*self.latency)
+        return self.latency
+
+    def _error(self):
+        with self._lock:
+            if self._errors:
+                return self._errors.popleft()
+            if self.error_rate and self.random.random() < self.error_rate:
+                return self.error_status
+        return None
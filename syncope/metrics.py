@@ -0,0 +1,143 @@
+"""Request metrics of the Syncope class, per action and HTTP method."""
+
+import collections
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Endpoint(object):
+
+    """Counters of one action and HTTP method."""
+
+    __slots__ = ('count', 'statuses', 'bytes_in', 'bytes_out', 'latency_sum', 'buckets')
+
+    def __init__(self, buckets):
+        self.count = 0
+        self.statuses = collections.defaultdict(int)
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * (len(buckets) + 1)
+
+
+class Metrics(object):
+
+    """Will count the requests, status codes, bytes and latencies of an Syncope object per action and HTTP method.
+
+    One Metrics object can be shared by multiple Syncope objects.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Will initialize the metrics.
+
+        :param buckets: The upper bounds in seconds of the latency histogram buckets.
+        :Example:
+
+        >>> import syncope
+        >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password", metrics=True)
+        >>> syn.get_user_by_name("puccini")
+        >>> print syn.metrics.as_dict()['get_user_by_name']['GET']['statuses']
+        {'200': 1}
+        >>> print syn.metrics.to_prometheus()
+        # HELP syncope_client_requests_total Requests send to Syncope.
+        <cut>
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.endpoints = {}
+        self.lock = threading.Lock()
+
+    def record(self, action, method, status, latency, bytes_out=0, bytes_in=0):
+        """Will record one request.
+
+        :param action: The name of the Syncope action, like get_user_by_name.
+        :param method: The HTTP method, like GET.
+        :param status: The HTTP status code, or None when no response was received.
+        :param latency: The duration of the request in seconds.
+        :param bytes_out: The size of the request body.
+        :param bytes_in: The size of the response body.
+        """
+        index = len(self.buckets)
+        for position, bound in enumerate(self.buckets):
+            if latency <= bound:
+                index = position
+                break
+
+        with self.lock:
+            endpoint = self.endpoints.get((action, method))
+            if endpoint is None:
+                endpoint = self.endpoints[(action, method)] = _Endpoint(self.buckets)
+            endpoint.count += 1
+            endpoint.statuses[str(status) if status is not None else 'error'] += 1
+            endpoint.bytes_in += bytes_in
+            endpoint.bytes_out += bytes_out
+            endpoint.latency_sum += latency
+            endpoint.buckets[index] += 1
+
+    def reset(self):
+        """Will remove all recorded requests.
+
+        :return: None
+        """
+        with self.lock:
+            self.endpoints.clear()
+
+    def as_dict(self):
+        """Will return the metrics as dict.
+
+        :return: An dict per action, with per HTTP method the 'count', 'statuses', 'bytes_in', 'bytes_out',
+            'latency_sum' and the cumulative 'latency_buckets' (upper bound as string, including '+Inf').
+        """
+        result = {}
+        with self.lock:
+            for (action, method), endpoint in self.endpoints.items():
+                result.setdefault(action, {})[method] = {
+                    'count': endpoint.count,
+                    'statuses': dict(endpoint.statuses),
+                    'bytes_in': endpoint.bytes_in,
+                    'bytes_out': endpoint.bytes_out,
+                    'latency_sum': endpoint.latency_sum,
+                    'latency_buckets': self._cumulative(endpoint),
+                }
+        return result
+
+    def to_prometheus(self, prefix='syncope_client'):
+        """Will return the metrics in the Prometheus text format.
+
+        :param prefix: The prefix of the metric names.
+        :return: The metrics as string.
+        """
+        requests, bytes_out, bytes_in, histogram = [], [], [], []
+        with self.lock:
+            for (action, method), endpoint in sorted(self.endpoints.items()):
+                labels = 'action="{0}",method="{1}"'.format(action, method)
+                for status, count in sorted(endpoint.statuses.items()):
+                    requests.append('{0}_requests_total{{{1},status="{2}"}} {3}'.format(prefix, labels, status, count))
+                bytes_out.append('{0}_request_bytes_total{{{1}}} {2}'.format(prefix, labels, endpoint.bytes_out))
+                bytes_in.append('{0}_response_bytes_total{{{1}}} {2}'.format(prefix, labels, endpoint.bytes_in))
+                for bound, count in self._cumulative(endpoint).items():
+                    histogram.append('{0}_request_duration_seconds_bucket{{{1},le="{2}"}} {3}'.format(
+                        prefix, labels, bound, count))
+                histogram.append('{0}_request_duration_seconds_sum{{{1}}} {2!r}'.format(prefix, labels,
+                                                                                        endpoint.latency_sum))
+                histogram.append('{0}_request_duration_seconds_count{{{1}}} {2}'.format(prefix, labels,
+                                                                                        endpoint.count))
+
+        lines = ['# HELP {0}_requests_total Requests send to Syncope.'.format(prefix),
+                 '# TYPE {0}_requests_total counter'.format(prefix)] + requests
+        lines += ['# HELP {0}_request_bytes_total Bytes send to Syncope.'.format(prefix),
+                  '# TYPE {0}_request_bytes_total counter'.format(prefix)] + bytes_out
+        lines += ['# HELP {0}_response_bytes_total Bytes received from Syncope.'.format(prefix),
+                  '# TYPE {0}_response_bytes_total counter'.format(prefix)] + bytes_in
+        lines += ['# HELP {0}_request_duration_seconds Duration of the requests to Syncope.'.format(prefix),
+                  '# TYPE {0}_request_duration_seconds histogram'.format(prefix)] + histogram
+        return '\n'.join(lines) + '\n'
+
+    def _cumulative(self, endpoint):
+        buckets = collections.OrderedDict()
+        total = 0
+        for bound, count in zip([repr(float(bound)) for bound in self.buckets] + ['+Inf'], endpoint.buckets):
+            total += count
+            buckets[bound] = total
+        return buckets
@@ -0,0 +1,173 @@
+"""Compact objects for the users returned by the Syncope class, as an alternative to the JSON dicts."""
+
+try:
+    _intern = intern
+except NameError:
+    from sys import intern as _intern
+
+_NO_VALUES = ()
+
+
+def _index(attributes):
+    """Will convert an list of {schema, values, readonly} dicts to an dict from schema to values, and an tuple of the
+    readonly schemas."""
+    index = {}
+    readonly = []
+    for attribute in attributes or _NO_VALUES:
+        schema = attribute['schema']
+        if isinstance(schema, str):
+            # The same schema names are used by every user, so keep them only once in memory.
+            schema = _intern(schema)
+        index[schema] = attribute.get('values') or []
+        if attribute.get('readonly'):
+            readonly.append(schema)
+    return index, tuple(readonly) or _NO_VALUES
+
+
+def _unindex(index, readonly):
+    return [{'schema': schema, 'values': list(values), 'readonly': schema in readonly}
+            for schema, values in index.items()]
+
+
+class _Attributable(object):
+
+    """Base of the objects with attributes, derived attributes and virtual attributes."""
+
+    __slots__ = ('attributes', 'derived_attributes', 'virtual_attributes', 'readonly', 'derived_readonly',
+                 'virtual_readonly', 'resources', 'propagation_status', 'extra')
+
+    _fields = ()
+
+    def _load(self, data):
+        data = dict(data)
+        data.pop('memberships', None)
+        for name, key in self._fields:
+            setattr(self, name, data.pop(key, None))
+        # An schema can be readonly in one list and not in an other, so every list has its own readonly schemas.
+        self.attributes, self.readonly = _index(data.pop('attributes', None))
+        self.derived_attributes, self.derived_readonly = _index(data.pop('derivedAttributes', None))
+        self.virtual_attributes, self.virtual_readonly = _index(data.pop('virtualAttributes', None))
+        self.resources = tuple(data.pop('resources', None) or _NO_VALUES)
+        self.propagation_status = data.pop('propagationStatusTOs', None) or _NO_VALUES
+        # Keys unknown to this version are kept, so as_dict returns everything that was received.
+        self.extra = data or None
+
+    def _dump(self):
+        data = dict((key, getattr(self, name)) for name, key in self._fields)
+        data['attributes'] = _unindex(self.attributes, self.readonly)
+        data['derivedAttributes'] = _unindex(self.derived_attributes, self.derived_readonly)
+        data['virtualAttributes'] = _unindex(self.virtual_attributes, self.virtual_readonly)
+        data['resources'] = list(self.resources)
+        data['propagationStatusTOs'] = list(self.propagation_status)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def attribute(self, schema, default=None):
+        """Will return the first value of an attribute, derived attribute or virtual attribute.
+
+        :param schema: The name of the schema, like firstname.
+        :param default: The value to return when the attribute doesn't exist or has no values.
+        :return: The first value of the attribute, or the default.
+        """
+        for index in (self.attributes, self.derived_attributes, self.virtual_attributes):
+            values = index.get(schema)
+            if values:
+                return values[0]
+        return default
+
+
+class Membership(_Attributable):
+
+    """The membership of an user in an role."""
+
+    __slots__ = ('id', 'role_id', 'role_name')
+
+    _fields = (('id', 'id'), ('role_id', 'roleId'), ('role_name', 'roleName'))
+
+    def __init__(self, data):
+        self._load(data)
+
+    def as_dict(self):
+        """Will return the membership as JSON dict, like it is returned by Syncope.
+
+        :return: The membership as dict.
+        """
+        return self._dump()
+
+    def __repr__(self):
+        return '<Membership {0} of role {1}>'.format(self.id, self.role_name)
+
+
+class User(_Attributable):
+
+    """An user, with an dict from schema to values for the attributes. The memberships are only converted to Membership
+    objects when they are used.
+
+    :Example:
+
+    >>> import syncope
+    >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password")
+    >>> user = syn.get_user_by_id(5, as_model=True)
+    >>> print user.username, user.attribute('fullname'), user.attributes['firstname']
+    puccini Giacomo Puccini [u'Giacomo']
+    >>> print [membership.role_name for membership in user.memberships]
+    [u'root']
+    """
+
+    __slots__ = ('id', 'username', 'password', 'status', 'token', 'token_expire_time', 'creation_date',
+                 'change_pwd_date', 'last_login_date', 'failed_logins', '_memberships')
+
+    _fields = (('id', 'id'), ('username', 'username'), ('password', 'password'), ('status', 'status'),
+               ('token', 'token'), ('token_expire_time', 'tokenExpireTime'), ('creation_date', 'creationDate'),
+               ('change_pwd_date', 'changePwdDate'), ('last_login_date', 'lastLoginDate'),
+               ('failed_logins', 'failedLogins'))
+
+    def __init__(self, data):
+        """
+        Will create an user from an JSON dict returned by Syncope.
+
+        :param data: The user as dict.
+        :type data: dict
+        """
+        self._memberships = data.get('memberships') or _NO_VALUES
+        self._load(data)
+
+    @property
+    def memberships(self):
+        """The memberships of the user, as list of Membership objects."""
+        if self._memberships and not isinstance(self._memberships[0], Membership):
+            self._memberships = [Membership(membership) for membership in self._memberships]
+        return self._memberships
+
+    @property
+    def role_ids(self):
+        """The ids of the roles the user is member of."""
+        if self._memberships and not isinstance(self._memberships[0], Membership):
+            return [membership['roleId'] for membership in self._memberships]
+        return [membership.role_id for membership in self._memberships]
+
+    def as_dict(self):
+        """Will return the user as JSON dict, like it is returned by Syncope. On python 2 the attributes can be in an
+        other order.
+
+        :return: The user as dict.
+        """
+        data = self._dump()
+        data['memberships'] = [membership.as_dict() if isinstance(membership, Membership) else dict(membership)
+                               for membership in self._memberships]
+        return data
+
+    def __eq__(self, other):
+        if not isinstance(other, User):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '<User {0} {1}>'.format(self.id, self.username)
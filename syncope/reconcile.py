@@ -0,0 +1,277 @@
+"""Will bring the users in Syncope in line with an desired set of users, for example from an HR export."""
+
+import csv
+import json
+import sys
+
+from syncope.diff import user_mod
+from syncope.models import User
+
+MISSING_ACTIONS = ('suspend', 'delete', None)
+_DONE = {'create': 'created', 'update': 'updated', 'reactivate': 'reactivated', 'suspend': 'suspended',
+         'delete': 'deleted'}
+
+
+def read_json(path):
+    """Will read the desired users from an JSON file with an list of users.
+
+    :param path: The path of the JSON file.
+    :return: The list of desired users.
+    """
+    with open(path) as json_file:
+        return json.load(json_file)
+
+
+def read_csv(path, separator=';'):
+    """Will read the desired users from an CSV file with an header. The columns username, password, status, resources
+    and memberships (role ids) are used for the user, all other columns are attributes. Multiple resources, roles or
+    attribute values are separated by the separator, empty cells are attributes without values.
+
+    :param path: The path of the CSV file.
+    :param separator: The separator of multiple values in one cell.
+    :return: An generator with every desired user.
+    """
+    # The csv module handles the newlines itself, so quoted cells can contain newlines.
+    if sys.version_info < (3,):
+        csv_file = open(path, 'rb')
+    else:
+        csv_file = open(path, newline='')
+    with csv_file:
+        for row in csv.DictReader(csv_file):
+            user = {'username': row.pop('username'), 'attributes': {}}
+            for key in ('password', 'status'):
+                if row.get(key):
+                    user[key] = row[key]
+                row.pop(key, None)
+            if 'resources' in row:
+                user['resources'] = [value for value in (row.pop('resources') or '').split(separator) if value]
+            if 'memberships' in row:
+                user['memberships'] = [int(value) for value in (row.pop('memberships') or '').split(separator)
+                                       if value]
+            for schema, cell in row.items():
+                user['attributes'][schema] = [value for value in (cell or '').split(separator) if value]
+            yield user
+
+
+def _attribute_list(attributes):
+    if attributes is None or not isinstance(attributes, dict):
+        return attributes or []
+    return [{'schema': schema, 'values': values if isinstance(values, list) else [values], 'readonly': False}
+            for schema, values in attributes.items()]
+
+
+def _create_arguments(desired):
+    """Will create the arguments for create_user from an desired user."""
+    arguments = dict((key, value) for key, value in desired.items() if key not in ('status', 'memberships'))
+    for key in ('attributes', 'derivedAttributes', 'virtualAttributes'):
+        if key in arguments:
+            arguments[key] = _attribute_list(arguments[key])
+    if desired.get('memberships'):
+        arguments['memberships'] = [{'roleId': membership['roleId'] if isinstance(membership, dict) else membership}
+                                    for membership in desired['memberships']]
+    return arguments
+
+
+class Plan(object):
+
+    """The changes needed to reconcile the users, created by Reconciler.plan."""
+
+    def __init__(self):
+        self.creates = []
+        self.updates = []
+        self.suspends = []
+        self.reactivates = []
+        self.deletes = []
+
+    def __len__(self):
+        return len(self.creates) + len(self.updates) + len(self.suspends) + len(self.reactivates) + len(self.deletes)
+
+    def phases(self):
+        """Will return the changes per action, as (action, [(username, argument), ...]) tuples in the order they are
+        applied."""
+        return [('create', self.creates), ('update', self.updates), ('reactivate', self.reactivates),
+                ('suspend', self.suspends), ('delete', self.deletes)]
+
+    def actions(self):
+        """Will return every change as (action, username, argument) tuple, in the order they are applied."""
+        for action, changes in self.phases():
+            for username, argument in changes:
+                yield action, username, argument
+
+    def as_dict(self):
+        """Will return the plan as dict, for example to show an dry run as JSON.
+
+        :return: An dict with the usernames to 'create', 'reactivate', 'suspend' and 'delete', and the UserMod per
+            username to 'update'.
+        """
+        return {
+            'create': [username for username, arguments in self.creates],
+            'update': dict(self.updates),
+            'reactivate': [username for username, id in self.reactivates],
+            'suspend': [username for username, id in self.suspends],
+            'delete': [username for username, id in self.deletes],
+        }
+
+
+class Reconciler(object):
+
+    """Will compare the desired users with the users in Syncope and create, update, suspend or delete users to make
+    them the same.
+
+    The users in Syncope are read once (with iter_users, or with an paged search when an query is given). Only
+    the keys given in an desired user are compared, see syncope.diff.user_mod. The password of an desired user is
+    used to create it, but is only set for existing users when update_passwords is True, as Syncope only returns
+    hashed passwords which can't be compared. Syncope creates active users, so an new desired user with the status
+    'suspended' is suspended after it is created.
+    """
+
+    def __init__(self, syncope=None, query=None, missing='suspend', page_size=100, prefetch=1, concurrency=4,
+                 rate=None, update_passwords=False):
+        """
+        Will initialize the reconciler.
+
+        :param syncope: The Syncope object to use.
+        :param query: Optional search (JSON or syncope.search.Condition) to limit the users which are reconciled, for
+            example the members of one role. By default all users are reconciled.
+        :param missing: What to do with users in Syncope which are not desired: 'suspend', 'delete' or None to keep
+            them.
+        :param page_size: The amount of users per page of the query.
+        :param prefetch: The amount of pages of the query which are requested at the same time.
+        :param concurrency: The maximum amount of changes applied at the same time.
+        :param rate: The maximum amount of changes applied per second, or None for no limit.
+        :param update_passwords: When True, the password of every existing desired user with an password is set, on
+            every run.
+        :Example:
+
+        >>> import syncope
+        >>> from syncope.reconcile import Reconciler, read_csv
+        >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password")
+        >>> reconciler = Reconciler(syn, missing='suspend', concurrency=8, rate=20)
+        >>> plan = reconciler.plan(read_csv("users.csv"))
+        >>> print plan.as_dict()
+        {'create': ['wdijkerman'], 'update': {}, 'reactivate': [], 'suspend': ['verdi'], 'delete': []}
+        >>> print reconciler.apply(plan)
+        {'created': ['wdijkerman'], 'updated': [], 'reactivated': [], 'suspended': ['verdi'], 'deleted': [], 'failed': []}
+        """
+        if syncope is None:
+            raise ValueError('This reconciler needs an Syncope object to work!')
+        if missing not in MISSING_ACTIONS:
+            raise ValueError('This reconciler needs missing to be suspend, delete or None to work!')
+
+        self.syncope = syncope
+        self.query = query
+        self.missing = missing
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.concurrency = concurrency
+        self.rate = rate
+        self.update_passwords = update_passwords
+
+    def current_users(self):
+        """Will get the users in Syncope which are reconciled.
+
+        :return: An dict from username to syncope.models.User.
+        """
+        if self.query is None:
+            users = self.syncope.iter_users(as_model=True)
+        else:
+            users = self.syncope.iter_users_by_query(self.query, page_size=self.page_size, prefetch=self.prefetch,
+                                                     as_model=True)
+        return dict((user.username, user) for user in users)
+
+    def plan(self, desired, current=None):
+        """Will compare the desired users with the users in Syncope, without changing anything.
+
+        :param desired: An iterable with the desired users, as dicts with at least an username.
+        :param current: Optional dict from username to the current user, instead of getting them from Syncope.
+        :return: An Plan with the changes.
+        """
+        if current is None:
+            current = self.current_users()
+        plan = Plan()
+        seen = set()
+        for user in desired:
+            username = user.get('username')
+            if not username:
+                raise ValueError('Every desired user needs an username!')
+            if username in seen:
+                raise ValueError('The desired user {0} is given more then once!'.format(username))
+            seen.add(username)
+
+            existing = current.get(username)
+            if existing is None:
+                plan.creates.append((username, _create_arguments(user)))
+                # Syncope creates active users, the new user has no id yet so it is suspended by name.
+                if user.get('status') == 'suspended':
+                    plan.suspends.append((username, None))
+                continue
+            if not isinstance(existing, User):
+                existing = User(existing)
+
+            mod = user_mod(existing, dict((key, value) for key, value in user.items() if key != 'status'),
+                           self.update_passwords)
+            if mod is not None:
+                plan.updates.append((username, mod))
+            if user.get('status') == 'suspended' and existing.status != 'suspended':
+                plan.suspends.append((username, existing.id))
+            elif user.get('status') == 'active' and existing.status == 'suspended':
+                plan.reactivates.append((username, existing.id))
+
+        if self.missing is not None:
+            for username, existing in sorted(current.items()):
+                if username in seen:
+                    continue
+                if not isinstance(existing, User):
+                    existing = User(existing)
+                if self.missing == 'delete':
+                    plan.deletes.append((username, existing.id))
+                elif existing.status != 'suspended':
+                    plan.suspends.append((username, existing.id))
+        return plan
+
+    def _apply_action(self, change):
+        action, username, argument = change
+        if action == 'create':
+            return self.syncope.create_user(json.dumps(argument))
+        if action == 'update':
+            return self.syncope.update_user(json.dumps(argument))
+        if action == 'reactivate':
+            return self.syncope.reactivate_user_by_id(argument)
+        if action == 'suspend':
+            if argument is None:
+                return self.syncope.suspend_user_by_name(username)
+            return self.syncope.suspend_user_by_id(argument)
+        return self.syncope.delete_user_by_id(argument)
+
+    def apply(self, plan, dry_run=False):
+        """Will apply the changes of an plan concurrently, with at most 'concurrency' changes at the same time and
+        'rate' changes per second. The actions are applied one after the other: first all creates, then the updates,
+        reactivates, suspends and deletes, so two changes of the same user never run at the same time.
+
+        :param plan: The Plan created by plan.
+        :param dry_run: When True, nothing is changed and the usernames which would be changed are returned.
+        :return: An dict with the 'created', 'updated', 'reactivated', 'suspended' and 'deleted' usernames, and the
+            (action, username) tuples which 'failed'.
+        """
+        result = {'created': [], 'updated': [], 'reactivated': [], 'suspended': [], 'deleted': [], 'failed': []}
+        if dry_run:
+            for action, username, argument in plan.actions():
+                result[_DONE[action]].append(username)
+            return result
+
+        for action, changes in plan.phases():
+            summary = self.syncope.bulk_action(self._apply_action, [(action, username, argument)
+                                                                    for username, argument in changes],
+                                               self.concurrency, self.rate)
+            result[_DONE[action]].extend(username for action, username, argument in summary['succeeded'])
+            result['failed'].extend((action, username) for action, username, argument in summary['failed'])
+        return result
+
+    def reconcile(self, desired, dry_run=False):
+        """Will plan and apply the changes for the desired users.
+
+        :param desired: An iterable with the desired users, as dicts with at least an username.
+        :param dry_run: When True, nothing is changed.
+        :return: See apply.
+        """
+        return self.apply(self.plan(desired), dry_run=dry_run)
@@ -0,0 +1,188 @@
+"""Role hierarchy of an Syncope server, build from a single get_roles call."""
+
+import collections
+import requests
+
+
+def _cycle_error(id):
+    return ValueError('Role ' + str(id) + ' is part of an cycle in the role hierarchy!')
+
+
+class RoleTree(object):
+
+    """Index of all roles, which can be used to walk the role hierarchy without doing an request per role."""
+
+    def __init__(self, syncope=None, roles=None):
+        """
+        Will build the role tree.
+
+        :param syncope: An Syncope object, used to get the roles when 'roles' is not given and by refresh().
+        :param roles: An list of roles, like returned by Syncope.get_roles().
+        :Example:
+
+        >>> import syncope
+        >>> syn = syncope.Syncope(syncope_url="http://192.168.10.13:9080", username="admin", password="password")
+        >>> tree = syncope.RoleTree(syn)
+        >>> print tree.path(2)
+        [u'root', u'child']
+        >>> print [role['name'] for role in tree.children(1)]
+        [u'child', u'otherchild', <cut>]
+        """
+        if syncope is None and roles is None:
+            raise ValueError('This tree needs an Syncope object or roles to work!')
+
+        self.syncope = syncope
+        if roles is None:
+            self.refresh()
+        else:
+            self._build(roles)
+
+    def refresh(self):
+        """Will get all roles from the Syncope server again and rebuild the tree.
+
+        :return: None
+        """
+        if self.syncope is None:
+            raise ValueError('This refresh needs an Syncope object to work!')
+
+        roles = self.syncope.get_roles()
+        if roles is False:
+            raise requests.exceptions.HTTPError('Could not get the roles.')
+        self._build(roles)
+
+    def _build(self, roles):
+        """Will (re)build all indexes for the list of roles.
+
+        :param roles: An list of roles.
+        """
+        self.roles = collections.OrderedDict((role['id'], role) for role in roles)
+        self.parents = {}
+        self.child_ids = dict((id, []) for id in self.roles)
+        self.root_ids = []
+        for id, role in self.roles.items():
+            parent = role.get('parent')
+            if parent in self.roles and parent != id:
+                self.parents[id] = parent
+                self.child_ids[parent].append(id)
+            else:
+                self.root_ids.append(id)
+
+        self.depths = {}
+        queue = collections.deque((id, 0) for id in self.root_ids)
+        while queue:
+            id, depth = queue.popleft()
+            self.depths[id] = depth
+            queue.extend((child, depth + 1) for child in self.child_ids[id])
+
+    def __len__(self):
+        return len(self.roles)
+
+    def __contains__(self, id):
+        return id in self.roles
+
+    def __iter__(self):
+        return iter(self.roles.values())
+
+    def get(self, id):
+        """Will return the role.
+
+        :param id: The id of the role.
+        :type id: int
+        :return: The role, or None when the role doesn't exist.
+        """
+        return self.roles.get(id)
+
+    def roots(self):
+        """Will return all roles without an parent.
+
+        :return: An list of roles.
+        """
+        return [self.roles[id] for id in self.root_ids]
+
+    def parent(self, id):
+        """Will return the parent of the role.
+
+        :param id: The id of the role.
+        :type id: int
+        :return: The parent role, or None for an root role.
+        """
+        parent = self.parents.get(self._check(id))
+        return self.roles[parent] if parent is not None else None
+
+    def children(self, id):
+        """Will return the direct children of the role.
+
+        :param id: The id of the role.
+        :type id: int
+        :return: An list of roles.
+        """
+        return [self.roles[child] for child in self.child_ids[self._check(id)]]
+
+    def ancestors(self, id):
+        """Will return all parents of the role, starting with its direct parent.
+
+        :param id: The id of the role.
+        :type id: int
+        :return: An list of roles.
+        :raises ValueError: When the parents of the role form an cycle.
+        """
+        ancestors = []
+        seen = set([self._check(id)])
+        parent = self.parents.get(id)
+        while parent is not None:
+            if parent in seen:
+                raise _cycle_error(parent)
+            seen.add(parent)
+            ancestors.append(self.roles[parent])
+            parent = self.parents.get(parent)
+        return ancestors
+
+    def descendants(self, id):
+        """Will return all children of the role and their children, level by level.
+
+        :param id: The id of the role.
+        :type id: int
+        :return: An list of roles.
+        :raises ValueError: When the role is part of an cycle.
+        """
+        descendants = []
+        seen = set([self._check(id)])
+        queue = collections.deque(self.child_ids[id])
+        while queue:
+            child = queue.popleft()
+            if child in seen:
+                raise _cycle_error(child)
+            seen.add(child)
+            descendants.append(self.roles[child])
+            queue.extend(self.child_ids[child])
+        return descendants
+
+    def depth(self, id):
+        """Will return the depth of the role in the tree.
+
+        :param id: The id of the role.
+        :type id: int
+        :return: 0 for an root role, 1 for its children and so on.
+        :raises ValueError: When the parents of the role form an cycle, so it has no root.
+        """
+        if self._check(id) not in self.depths:
+            raise _cycle_error(id)
+        return self.depths[id]
+
+    def path(self, id):
+        """Will return the names of all roles from the root to this role.
+
+        :param id: The id of the role.
+        :type id: int
+        :return: An list of role names.
+        :raises ValueError: When the parents of the role form an cycle.
+        """
+        names = [role['name'] for role in self.ancestors(id)]
+        names.reverse()
+        names.append(self.roles[id]['name'])
+        return names
+
+    def _check(self, id):
+        if id not in self.roles:
+            raise KeyError('Role ' + str(id) + ' does not exist!')
+        return id
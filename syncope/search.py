@@ -0,0 +1,274 @@
+"""Builder for the search conditions of the user searches, like get_users_by_query.
+
+Conditions are combined with & (AND), | (OR) and ~ (NOT), or with and_, or_ and not_:
+
+>>> from syncope.search import attributable, attribute, membership, resource
+>>> query = attributable("status").eq("active") & (attribute("surname").like("P%") | membership(role_id=14))
+>>> print query.to_json()
+{"leftNodeCond":{"attributableCond":{"expression":"active","schema":"status","type":"EQ"},"type":"LEAF"},<cut>}
+>>> print syn.get_users_by_query(query)
+
+Before the condition is compiled to the JSON of Syncope, nested AND and OR conditions are flattened, duplicate
+conditions are removed, NOT conditions are moved to the leafs (Syncope only knows NOT_LEAF) and long AND and OR
+chains are compiled to an balanced tree instead of an deep one. The JSON is created once per condition object.
+"""
+
+import json
+
+try:
+    _text = basestring
+except NameError:
+    _text = str
+
+__all__ = ['Condition', 'attributable', 'attribute', 'resource', 'membership', 'and_', 'or_', 'not_']
+
+
+class Condition(object):
+
+    """Base of all search conditions. Conditions can't be changed after they are created."""
+
+    __slots__ = ('_key', '_dict', '_json')
+
+    def __init__(self):
+        self._key = None
+        self._dict = None
+        self._json = None
+
+    def __and__(self, other):
+        return and_(self, other)
+
+    def __or__(self, other):
+        return or_(self, other)
+
+    def __invert__(self):
+        return self._negate()
+
+    def __eq__(self, other):
+        return isinstance(other, Condition) and self.key() == other.key()
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return '<{0} {1}>'.format(self.__class__.__name__, self.to_json())
+
+    def key(self):
+        """Will return an hashable representation of the condition, which is used to find duplicate conditions."""
+        if self._key is None:
+            self._key = self._make_key()
+        return self._key
+
+    def to_dict(self):
+        """Will compile the condition to the search structure of Syncope.
+
+        :return: The condition as dict, like {"type": "LEAF", "attributableCond": {...}}.
+        """
+        if self._dict is None:
+            self._dict = self._compile()
+        return self._dict
+
+    def to_json(self):
+        """Will compile the condition to the search JSON of Syncope, which can be given to the user searches.
+
+        :return: The condition as JSON string.
+        """
+        if self._json is None:
+            self._json = json.dumps(self.to_dict(), separators=(',', ':'), sort_keys=True)
+        return self._json
+
+    def __str__(self):
+        return self.to_json()
+
+
+class _Leaf(Condition):
+
+    __slots__ = ('cond', 'values', 'negated')
+
+    def __init__(self, cond, values, negated=False):
+        Condition.__init__(self)
+        self.cond = cond
+        self.values = tuple(sorted(values.items()))
+        self.negated = negated
+
+    def _make_key(self):
+        return ('LEAF', self.cond, self.values, self.negated)
+
+    def _negate(self):
+        return _Leaf(self.cond, dict(self.values), not self.negated)
+
+    def _compile(self):
+        return {'type': 'NOT_LEAF' if self.negated else 'LEAF', self.cond: dict(self.values)}
+
+
+class _Node(Condition):
+
+    """An AND or OR condition with any amount of children, which is compiled to binary nodes."""
+
+    __slots__ = ('type', 'children')
+
+    def __init__(self, node_type, children):
+        Condition.__init__(self)
+        self.type = node_type
+        self.children = children
+
+    def _make_key(self):
+        return (self.type,) + tuple(child.key() for child in self.children)
+
+    def _negate(self):
+        # De Morgan, as Syncope can only negate leafs.
+        return _combine('OR' if self.type == 'AND' else 'AND', [~child for child in self.children])
+
+    def _compile(self):
+        return self._balance(self.children)
+
+    def _balance(self, children):
+        if len(children) == 1:
+            return children[0].to_dict()
+        middle = len(children) // 2
+        return {'type': self.type, 'leftNodeCond': self._balance(children[:middle]),
+                'rightNodeCond': self._balance(children[middle:])}
+
+
+def _combine(node_type, conditions):
+    children = []
+    seen = set()
+    for condition in conditions:
+        if not isinstance(condition, Condition):
+            raise ValueError('Only search conditions can be combined, got: {0!r}'.format(condition))
+        # (a & b) & c is the same as a & b & c.
+        parts = condition.children if isinstance(condition, _Node) and condition.type == node_type else (condition,)
+        for part in parts:
+            if part.key() not in seen:
+                seen.add(part.key())
+                children.append(part)
+    if not children:
+        raise ValueError('This condition needs at least one condition to work!')
+    if len(children) == 1:
+        return children[0]
+    return _Node(node_type, tuple(children))
+
+
+def and_(*conditions):
+    """Will return an condition matching when all conditions match.
+
+    :param conditions: The conditions.
+    :return: An Condition.
+    """
+    return _combine('AND', conditions)
+
+
+def or_(*conditions):
+    """Will return an condition matching when one of the conditions matches.
+
+    :param conditions: The conditions.
+    :return: An Condition.
+    """
+    return _combine('OR', conditions)
+
+
+def not_(condition):
+    """Will return an condition matching when the condition doesn't match.
+
+    :param condition: The condition.
+    :return: An Condition.
+    """
+    if not isinstance(condition, Condition):
+        raise ValueError('Only search conditions can be negated, got: {0!r}'.format(condition))
+    return ~condition
+
+
+class _Field(object):
+
+    """An schema of the user, to create leaf conditions for."""
+
+    __slots__ = ('cond', 'schema')
+
+    def __init__(self, cond, schema):
+        if not schema:
+            raise ValueError('This condition needs an schema to work!')
+        self.cond = cond
+        self.schema = schema
+
+    def _leaf(self, operator, expression=None):
+        values = {'type': operator, 'schema': self.schema}
+        if expression is not None:
+            values['expression'] = expression if isinstance(expression, _text) else str(expression)
+        return _Leaf(self.cond, values)
+
+    def eq(self, expression):
+        """Will match when the value is equal to the expression."""
+        return self._leaf('EQ', expression)
+
+    def like(self, expression):
+        """Will match with an pattern, % matches any text and _ one character."""
+        return self._leaf('LIKE', expression)
+
+    def isnull(self):
+        """Will match when there is no value."""
+        return self._leaf('ISNULL')
+
+    def isnotnull(self):
+        """Will match when there is an value."""
+        return self._leaf('ISNOTNULL')
+
+    def gt(self, expression):
+        """Will match when the value is greater then the expression."""
+        return self._leaf('GT', expression)
+
+    def ge(self, expression):
+        """Will match when the value is greater then or equal to the expression."""
+        return self._leaf('GE', expression)
+
+    def lt(self, expression):
+        """Will match when the value is lower then the expression."""
+        return self._leaf('LT', expression)
+
+    def le(self, expression):
+        """Will match when the value is lower then or equal to the expression."""
+        return self._leaf('LE', expression)
+
+
+def attributable(schema):
+    """Will return an field for an property of the user itself, like username, status or creationDate.
+
+    :param schema: The name of the property.
+    :return: An field with eq, like, isnull, isnotnull, gt, ge, lt and le functions to create conditions.
+    """
+    return _Field('attributableCond', schema)
+
+
+def attribute(schema):
+    """Will return an field for an attribute of the user, like firstname.
+
+    :param schema: The name of the attribute schema.
+    :return: An field with eq, like, isnull, isnotnull, gt, ge, lt and le functions to create conditions.
+    """
+    return _Field('attributeCond', schema)
+
+
+def resource(name):
+    """Will return an condition matching the users with an resource.
+
+    :param name: The name of the resource.
+    :return: An Condition.
+    """
+    if not name:
+        raise ValueError('This condition needs an resource name to work!')
+    return _Leaf('resourceCond', {'resourceName': name})
+
+
+def membership(role_id=None, role_name=None):
+    """Will return an condition matching the members of an role.
+
+    :param role_id: The id of the role.
+    :param role_name: The name of the role, when no id is given.
+    :return: An Condition.
+    """
+    if role_id is not None:
+        return _Leaf('membershipCond', {'roleId': int(role_id)})
+    if role_name is not None:
+        return _Leaf('membershipCond', {'roleName': role_name})
+    raise ValueError('This condition needs an role_id or role_name to work!')
@@ -0,0 +1,20 @@
+"""Shared fixtures for the tests of python-syncope"""
+
+import sys
+import os
+import pytest
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+from syncope.fake_server import FakeSyncopeServer
+
+
+@pytest.fixture
+def server():
+    """Will start an FakeSyncopeServer with the sample data for one test."""
+    with FakeSyncopeServer() as server:
+        yield server
+
+# The asyncio tests use the async syntax, which python 2 can't compile.
+collect_ignore = ['test_aio.py'] if sys.version_info < (3, 5) else []
@@ -0,0 +1,65 @@
+"""Test script for the asyncio version of python-syncope"""
+
+import sys
+import os
+import pytest
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+pytest.importorskip('aiohttp')
+import asyncio
+from syncope.aio import AsyncSyncope
+
+
+def run(coroutine):
+    """Will run the coroutine in an new event loop."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test___init__syncope_url():
+    """ Will test __init__ function if syncope_url is provided.
+
+    :return: Should catch the ValueError.
+    """
+    with pytest.raises(ValueError) as excinfo:
+        AsyncSyncope(username="admin", password="password")
+    assert str(excinfo.value) == 'This interface needs an Syncope URL to work!'
+
+
+def test_get_user_by_id(server):
+    """Will get the users with id 1 till 5 at the same time.
+
+    :return: Should return: puccini for user 5
+    """
+    async def main():
+        async with AsyncSyncope(syncope_url=server.url, username="admin", password="password") as syn:
+            return await asyncio.gather(*[syn.get_user_by_id(id) for id in range(1, 6)])
+    users = run(main())
+    assert users[4]['username'] == "puccini"
+
+
+def test_get_user_by_id_false(server):
+    """Will get all information for user with id: 15.
+
+    :return: Should return: False.
+    """
+    async def main():
+        async with AsyncSyncope(syncope_url=server.url, username="admin", password="password") as syn:
+            return await syn.get_user_by_id(15)
+    assert run(main()) == False
+
+
+def test_get_roles_false(server):
+    """Will test to get all roles. (Wrong password)
+
+    :return: Should return: False
+    """
+    async def main():
+        async with AsyncSyncope(syncope_url=server.url, username="admin", password="passwrd") as syn:
+            return await syn.get_roles()
+    assert run(main()) == False
@@ -0,0 +1,66 @@
+"""Test script for the change feed of python-syncope"""
+
+import sys
+import os
+import json
+import pytest
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import syncope
+from syncope.changes import ChangeFeed, DATE_FORMAT
+
+
+def test_change_feed_raise():
+    """Will create an change feed without an Syncope object.
+
+    :return: Should catch the ValueError.
+    """
+    with pytest.raises(ValueError) as excinfo:
+        ChangeFeed(path="syncope.watermark")
+    assert str(excinfo.value) == 'This change feed needs an Syncope object to work!'
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password")
+    with pytest.raises(ValueError) as excinfo:
+        ChangeFeed(syn, fields=())
+    assert str(excinfo.value) == 'This change feed needs date fields to work!'
+
+
+@pytest.mark.parametrize("date_format", [DATE_FORMAT, None])
+def test_poll(server, tmpdir, date_format):
+    """Will poll the changed users, change an user and poll again with an new change feed.
+
+    :return: Should return: all users, no users and then only the changed user.
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password")
+    path = str(tmpdir.join("syncope.watermark"))
+    feed = ChangeFeed(syn, path, page_size=2, date_format=date_format)
+    assert sorted(user['username'] for user in feed.poll()) == ["bellini", "puccini", "rossini", "verdi", "vivaldi"]
+    assert json.load(open(path)) == {"watermark": 1287572400000, "seen": [1, 2, 3, 4, 5]}
+    assert list(feed.poll()) == []
+
+    # Syncope 1.1 has no date of the last change, so only the new user and the changed password are found.
+    assert syn.update_user('{"id": 2, "attributesToBeUpdated": [{"schema": "ctype", "valuesToBeAdded": ["opera"]}]}')
+    assert syn.update_user('{"id": 3, "password": "password1234"}')
+    assert syn.create_user('{"username": "wdijkerman", "attributes": []}')
+    feed = ChangeFeed(syn, path, page_size=2, date_format=date_format)
+    changed = list(feed.poll())
+    assert [user['username'] for user in changed] == ["vivaldi", "wdijkerman"]
+    assert feed.watermark == max(changed[0]['changePwdDate'], changed[1]['creationDate'])
+    assert list(ChangeFeed(syn, path, date_format=date_format).poll()) == []
+
+
+def test_poll_stopped(server, tmpdir):
+    """Will stop during an poll.
+
+    :return: Should return: the same users in the next poll, as the watermark is not moved.
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password")
+    path = str(tmpdir.join("syncope.watermark"))
+    feed = ChangeFeed(syn, path, as_model=True)
+    poll = feed.poll()
+    first = next(poll)
+    poll.close()
+    assert not os.path.exists(path)
+    assert feed.watermark == 0
+    assert first.id in [user.id for user in feed.poll()]
@@ -0,0 +1,86 @@
+"""Test script for the UserMod diff of python-syncope"""
+
+import sys
+import os
+import copy
+import pytest
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import syncope
+from syncope.diff import user_mod
+from syncope.models import User
+
+user = {
+    "id": 5, "username": "puccini", "password": None, "status": "active",
+    "attributes": [{"schema": "firstname", "values": ["Giacomo"], "readonly": False},
+                   {"schema": "fullname", "values": ["Giacomo Puccini"], "readonly": False},
+                   {"schema": "cool", "values": [], "readonly": False},
+                   {"schema": "loginDate", "values": ["2016-01-10"], "readonly": True}],
+    "derivedAttributes": [{"schema": "cn", "values": ["Puccini, Giacomo"], "readonly": True}],
+    "virtualAttributes": [],
+    "resources": ["ws-target-resource-1"],
+    "memberships": [{"id": 50, "roleId": 14, "roleName": "artDirector", "attributes": []}],
+}
+
+
+def test_no_changes():
+    """Will compare an user with itself.
+
+    :return: Should return: None
+    """
+    assert user_mod(user, copy.deepcopy(user)) is None
+    assert user_mod(user, User(user)) is None
+    assert user_mod(user, {"username": "puccini", "attributes": {"firstname": "Giacomo",
+                                                                 "fullname": ["Giacomo Puccini"]}}) is None
+
+
+def test_attributes():
+    """Will change, add and remove attributes.
+
+    :return: Should return: an UserMod with only the changed attributes, cool has no values so it is not removed.
+    """
+    mod = user_mod(user, {"attributes": {"firstname": "Giacomo", "surname": "Puccini"}})
+    assert mod == {"id": 5,
+                   "attributesToBeUpdated": [{"schema": "surname", "valuesToBeAdded": ["Puccini"],
+                                              "valuesToBeRemoved": []}],
+                   "attributesToBeRemoved": ["fullname"]}
+
+
+def test_memberships_and_resources():
+    """Will change the roles and resources of an user.
+
+    :return: Should return: an UserMod adding role 1 and removing membership 50 and the resource.
+    """
+    mod = user_mod(user, {"username": "gpuccini", "memberships": [1], "resources": []})
+    assert mod == {"id": 5, "username": "gpuccini", "membershipsToBeAdded": [{"role": 1}],
+                   "membershipsToBeRemoved": [50], "resourcesToBeRemoved": ["ws-target-resource-1"]}
+
+
+def test_password():
+    """Will compare an user with an hashed password with an desired plain password.
+
+    :return: Should return: None, and only the password with update_password.
+    """
+    current = dict(user, password="5baa61e4c9b93f3f0682250b6cf8331b7ee68fd8")
+    assert user_mod(current, {"password": "password"}) is None
+    assert user_mod(current, {"password": "password"}, update_password=True) == {"id": 5, "password": "password"}
+
+
+def test_update_user_if_changed(server):
+    """Will update user puccini 2 times with the same changes.
+
+    :return: Should return: 1 update request.
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password")
+    desired = {"password": "password", "attributes": {"firstname": "Giacomo", "surname": "Puccini",
+                                                      "fullname": "G. Puccini"}}
+    current = syn.update_user_if_changed(syn.get_user_by_id(5), desired)
+    assert User(current).attribute("fullname") == "G. Puccini"
+    requests = server.request_count
+    assert syn.update_user_if_changed(current, desired) is current
+    assert server.request_count == requests
+    assert syn.update_user_if_changed(current, desired, update_password=True)['changePwdDate'] is not None
+    with pytest.raises(ValueError):
+        syn.update_user_if_changed(current)
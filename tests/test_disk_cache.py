@@ -0,0 +1,73 @@
+"""Test script for the disk cache of python-syncope"""
+
+import sys
+import os
+import pytest
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import syncope
+from syncope.disk_cache import DiskCache
+
+
+def test_disk_cache_raise():
+    """Will create an cache without an path.
+
+    :return: Should catch the ValueError.
+    """
+    with pytest.raises(ValueError) as excinfo:
+        DiskCache()
+    assert str(excinfo.value) == 'This cache needs an path to work!'
+
+
+def test_put_and_invalidate(tmpdir):
+    """Will cache 2 responses and remove one of them.
+
+    :return: Should return: the body of the roles response, and None after the invalidation.
+    """
+    cache = DiskCache(str(tmpdir.join("cache.sqlite")), ttls={'users': 0})
+    cache.put("roles", "admin /roles", b'[{"id": 1}]', "application/json", "utf-8")
+    cache.put("users", "admin /users/5", b'{"id": 5}')
+    assert cache.get("roles", "admin /roles") == (b'[{"id": 1}]', "application/json", "utf-8")
+    assert cache.get("users", "admin /users/5") is None
+    cache.invalidate("roles")
+    assert cache.get("roles", "admin /roles") is None
+
+
+def test_shared_cache(server, tmpdir):
+    """Will get the roles and user 5 with 2 Syncope objects sharing the cache file.
+
+    :return: Should return: 14 roles and the user, requested once, until an role is created.
+    """
+    path = str(tmpdir.join("cache.sqlite"))
+    first = syncope.Syncope(syncope_url=server.url, username="admin", password="password", disk_cache=path)
+    second = syncope.Syncope(syncope_url=server.url, username="admin", password="password",
+                             disk_cache=DiskCache(path))
+    assert len(first.get_roles()) == 14
+    assert first.get_user_by_id(5)['username'] == "puccini"
+    assert server.request_count == 2
+    assert len(second.get_roles()) == 14
+    assert second.get_user_by_id(5)['username'] == "puccini"
+    assert server.request_count == 2
+
+    second.create_role('{"name": "cached", "parent": 1}')
+    assert len(first.get_roles()) == 15
+    assert server.request_count == 4
+
+
+def test_cache_credentials(server, tmpdir):
+    """Will get the roles and user 5 with the cache, and the roles again with an wrong password.
+
+    :return: Should return: False for the wrong password, an file only readable by its owner and no cached password.
+    """
+    path = str(tmpdir.join("cache.sqlite"))
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password", disk_cache=path)
+    assert len(syn.get_roles()) == 14
+    assert syn.get_user_by_id(5)['password'] == "5baa61e4c9b93f3f0682250b6cf8331b7ee68fd8"
+    assert 'password' not in syn.get_user_by_id(5)
+    assert os.stat(path).st_mode & 0o777 == 0o600
+
+    wrong = syncope.Syncope(syncope_url=server.url, username="admin", password="wrong", disk_cache=path)
+    assert wrong.get_roles() == False
+    assert wrong.get_user_by_id(5) == False
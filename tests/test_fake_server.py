@@ -0,0 +1,240 @@
+"""Test script for the fake Syncope server of python-syncope"""
+
+import hashlib
+import sys
+import threading
+import os
+import pytest
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import syncope
+from syncope.fake_server import FakeSyncopeServer, sample_data
+
+
+def test_get_user_by_id(server):
+    """Will get all information for user with id: 5.
+
+    :return: Should return: puccini
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password")
+    assert syn.get_user_by_id(5)['username'] == "puccini"
+    assert syn.get_user_by_id(15) == False
+
+
+def test_wrong_password(server):
+    """Will test to get all roles. (Wrong password)
+
+    :return: Should return: False
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="passwrd")
+    assert syn.get_roles() == False
+
+
+def test_get_users_by_query(server):
+    """Will search for users with an username starting with "v" or which are member of role 14.
+
+    :return: Should return: verdi, vivaldi, puccini
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password")
+    search_req = '{"type":"OR","leftNodeCond":{"type":"LEAF","attributableCond":{"type":"LIKE","schema":"username","expression":"v%"}},"rightNodeCond":{"type":"LEAF","membershipCond":{"roleId":14}}}'
+    assert [user['username'] for user in syn.get_users_by_query(search_req)] == ["verdi", "vivaldi", "puccini"]
+    search_req = '{"type":"NOT_LEAF","attributeCond":{"type":"EQ","schema":"surname","expression":"Verdi"}}'
+    assert syn.get_user_count_by_query(search_req) == 4
+
+
+def test_create_update_delete_user(server):
+    """Will create the user weedijkerman, rename it to wdijkerman and delete it.
+
+    :return: Should return: wdijkerman
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password")
+    user_data = syn.create_user('{"username": "weedijkerman", "password": "password1234", "attributes": []}')
+    assert user_data['password'] == hashlib.sha1(b"password1234").hexdigest()
+    assert syn.create_user('{"username": "weedijkerman", "attributes": []}') == False
+    update_user = '{"id":' + str(user_data['id']) + ',"username":"wdijkerman","membershipsToBeAdded":[{"role":2}]}'
+    user_data = syn.update_user(update_user)
+    assert user_data['username'] == "wdijkerman"
+    assert user_data['memberships'][0]['roleName'] == "child"
+    assert syn.delete_user_by_id(user_data['id']) == True
+    assert syn.get_user_by_name("wdijkerman") == False
+
+
+def test_create_users(server):
+    """Will create the users weedijkerman1 and weedijkerman2, the last one twice, without iterating the result.
+
+    :return: Should return: 201, 201 and 409, and the users exist when create_users returns.
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password")
+    users = [{"username": "weedijkerman1", "attributes": []}, {"username": "weedijkerman2", "attributes": []},
+             {"username": "weedijkerman2", "attributes": []}]
+    results = syn.create_users(users, concurrency=2)
+    assert syn.get_users_count() == 7
+    assert [result['status_code'] for result in results] == [201, 201, 409]
+    with pytest.raises(ValueError):
+        syn.create_users('{"username": "weedijkerman3", "attributes": []}')
+
+
+def test_create_users_invalid_response(server):
+    """Will create 2 users, the response of the first one is no JSON.
+
+    :return: Should return: an error for the first user, and the second user is created.
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password")
+
+    def break_response(call):
+        if call['status_code'] == 201 and "weedijkerman1" in call['response'].text:
+            call['response']._content = b"<html>Created</html>"
+
+    syn.add_hook('post_response', break_response)
+    results = syn.create_users([{"username": "weedijkerman1"}, {"username": "weedijkerman2"}], concurrency=1)
+    assert [result['status_code'] for result in results] == [201, 201]
+    assert results[0]['user'] is None and results[0]['error']
+    assert results[1]['user']['username'] == "weedijkerman2"
+
+
+def test_bulk_action_exception(server):
+    """Will suspend 3 users, the action raises an ValueError for an invalid item.
+
+    :return: Should return: the invalid item as failed, the other users are suspended.
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password")
+    summary = syn.bulk_action(syn.suspend_user_by_id, [2, None, 3], concurrency=2)
+    assert sorted(summary['succeeded']) == [2, 3]
+    assert summary['failed'] == [None]
+
+
+def test_user_cache_during_write(server):
+    """Will suspend user 5 while an get_user_by_id for it is in flight, with the user cache enabled.
+
+    :return: Should return: the suspended user, the user read before the suspend is not cached.
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password", user_cache_size=10)
+
+    def suspend(call):
+        if call['method'] == "GET" and call['action'] == "get_user_by_id":
+            syn.suspend_user_by_id(5)
+
+    syn.add_hook('post_response', suspend)
+    assert syn.get_user_by_id(5)['status'] == "active"
+    syn.remove_hook('post_response', suspend)
+    assert syn.get_user_by_id(5)['status'] == "suspended"
+
+
+def test_inject_errors(server):
+    """Will let the first 2 requests fail with an 503, which are retried.
+
+    :return: Should return: 5
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password", backoff_factor=0)
+    server.inject_errors(2)
+    assert syn.get_users_count() == 5
+    assert server.request_count == 3
+    server.inject_errors(1, status=500)
+    assert syn.get_users_count() == False
+
+
+def test_iter_users():
+    """Will get 305 users, parsed per chunk of 1000 bytes.
+
+    :return: Should return: 305
+    """
+    with FakeSyncopeServer(data=sample_data(extra_users=300)) as server:
+        syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password")
+        users = list(syn.iter_users(chunk_size=1000))
+        assert len(users) == 305
+        assert users == syn.get_users()
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7])
+def test_iter_json_array_chunks(size):
+    """Will parse an JSON array with numbers, split in chunks of 'size' bytes.
+
+    :return: Should return: the numbers, also when an float or exponent is split over two chunks.
+    """
+    data = b'[12.5, 1e3 , -0.25E-2,7,{"id": 1.5}, "a]b" ]'
+    chunks = [data[start:start + size] for start in range(0, len(data), size)]
+    assert list(syncope._iter_json_array(chunks)) == [12.5, 1e3, -0.25e-2, 7, {"id": 1.5}, "a]b"]
+    assert list(syncope._iter_json_array([b"[12.", b"5]"])) == [12.5]
+    assert list(syncope._iter_json_array([b"[1e", b"3]"])) == [1e3]
+    with pytest.raises(ValueError):
+        list(syncope._iter_json_array([b"[1 2]"]))
+    with pytest.raises(ValueError):
+        list(syncope._iter_json_array([b"[1, 2"]))
+
+
+def test_iter_configuration_stream(server):
+    """Will get the rows of the configuration stream, and only the roles.
+
+    :return: Should return: 23 rows of which 14 roles.
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password")
+    rows = [(row.tag, row.get('id')) for row in syn.iter_configuration_stream()]
+    assert len(rows) == 23
+    roles = [row.get('name') for row in syn.iter_configuration_stream(tags=['SyncopeRole'])]
+    assert len(roles) == 14
+    assert roles[0] == "root"
+
+
+def test_download_configuration_stream(server, tmpdir):
+    """Will download the configuration stream to an file, with an sha256 checksum and progress.
+
+    :return: Should return: the sha256 of the export.
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password")
+    export = syn.get_configuration_stream().content
+    progress = []
+    path = str(tmpdir.join("content.xml"))
+    assert syn.download_configuration_stream(path, chunk_size=100, checksum="sha256",
+                                             progress=lambda written, total: progress.append((written, total))) == \
+        hashlib.sha256(export).hexdigest()
+    with open(path, 'rb') as export_file:
+        assert export_file.read() == export
+    assert progress[-1] == (len(export), len(export))
+    assert len(progress) == (len(export) + 99) // 100
+
+
+def test_coalesce_gets():
+    """Will get user 5 from 10 threads at the same time, which should share one request.
+
+    :return: Should return: 10 times puccini with 1 request.
+    """
+    with FakeSyncopeServer(latency=0.2) as server:
+        syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password", coalesce_gets=True)
+        users = []
+        threads = [threading.Thread(target=lambda: users.append(syn.get_user_by_id(5))) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert [user['username'] for user in users] == ["puccini"] * 10
+        assert server.request_count == 1
+
+
+def test_conditional_gets(server):
+    """Will get the roles 2 times, the second time the server answers that they are not modified.
+
+    :return: Should return: 14 roles, with an 200 and an 304 response.
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password", conditional_gets=True,
+                          metrics=True)
+    roles = syn.get_roles()
+    assert len(roles) == 14
+    assert syn.get_roles() == roles
+    assert syn.metrics.as_dict()['get_roles']['GET']['statuses'] == {'200': 1, '304': 1}
+
+
+def test_resolve_usernames():
+    """Will get the ids of 205 usernames with 5 concurrent searches of 50 usernames.
+
+    :return: Should return: 204 ids, as user999 doesn't exist.
+    """
+    with FakeSyncopeServer(data=sample_data(extra_users=200)) as server:
+        syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password")
+        names = ["user" + str(number) for number in range(1, 201)] + ["rossini", "verdi", "vivaldi", "puccini",
+                                                                      "user999"]
+        ids = syn.resolve_usernames(names, chunk=50, concurrency=5)
+        assert len(ids) == 204
+        assert ids["puccini"] == 5
+        assert server.request_count == 5
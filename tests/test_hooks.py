@@ -0,0 +1,66 @@
+"""Test script for the request hooks of python-syncope"""
+
+import sys
+import os
+import pytest
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import syncope
+
+
+def test_add_hook_raise():
+    """Will add an hook for an event which doesn't exist.
+
+    :return: Should catch the ValueError.
+    """
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password")
+    with pytest.raises(ValueError) as excinfo:
+        syn.add_hook('post_request', lambda call: None)
+    assert str(excinfo.value) == 'Unknown hook event: post_request, should be one of: pre_request, post_response'
+
+
+def test_hooks(server):
+    """Will call the hooks for get_user_by_name and an retried get_roles.
+
+    :return: Should return: 3 calls, the first get_roles call with status 503.
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password", backoff_factor=0)
+    started, finished = [], []
+    syn.add_hook('pre_request', lambda call: started.append(call['action']))
+    syn.add_hook('post_response', finished.append)
+    syn.get_user_by_name("puccini")
+    server.inject_errors(1)
+    syn.get_roles()
+
+    assert started == ["get_user_by_name", "get_roles", "get_roles"]
+    assert [(call['action'], call['method'], call['status_code'], call['attempt']) for call in finished] == [
+        ("get_user_by_name", "GET", 200, 0), ("get_roles", "GET", 503, 0), ("get_roles", "GET", 200, 1)]
+    assert finished[0]['url'] == server.url + "/syncope/cxf/users.json?username=puccini"
+    assert finished[0]['bytes_in'] > 0
+    assert finished[0]['elapsed'] >= 0
+
+    assert syn.remove_hook('post_response', finished.append) is True
+    assert syn.remove_hook('post_response', finished.append) is False
+    syn.get_roles()
+    assert len(finished) == 3
+    assert len(started) == 4
+
+
+def test_failing_hook(server, caplog):
+    """Will update an user with an post_response hook which raises an exception.
+
+    :return: Should return: the updated user, and the exception is logged.
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password")
+
+    def failing(call):
+        raise RuntimeError("tracing is down")
+
+    syn.add_hook('pre_request', failing)
+    syn.add_hook('post_response', failing)
+    user_data = syn.update_user('{"id": 5, "username": "giacomo"}')
+    assert user_data['username'] == "giacomo"
+    assert len([record for record in caplog.records if record.name == "syncope"]) == 2
+    assert "tracing is down" in caplog.text
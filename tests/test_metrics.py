@@ -0,0 +1,82 @@
+"""Test script for the request metrics of python-syncope"""
+
+import sys
+import os
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import syncope
+from syncope.fake_server import FakeSyncopeServer
+from syncope.metrics import Metrics
+
+
+def test_record():
+    """Will record 3 requests of 2 actions.
+
+    :return: Should return: 2 GET requests of get_roles, one with an error.
+    """
+    metrics = Metrics(buckets=(0.1, 1.0))
+    metrics.record("get_roles", "GET", 200, 0.05, 0, 100)
+    metrics.record("get_roles", "GET", None, 2.0)
+    metrics.record("create_user", "POST", 201, 0.5, 20, 10)
+    result = metrics.as_dict()
+    assert result['get_roles']['GET']['count'] == 2
+    assert result['get_roles']['GET']['statuses'] == {'200': 1, 'error': 1}
+    assert result['get_roles']['GET']['latency_buckets'] == {'0.1': 1, '1.0': 1, '+Inf': 2}
+    assert result['create_user']['POST']['bytes_out'] == 20
+    metrics.reset()
+    assert metrics.as_dict() == {}
+
+
+def test_syncope_metrics(server):
+    """Will count the requests of get_user_by_name and an failing get_roles.
+
+    :return: Should return: 1 request of get_user_by_name and 2 of get_roles.
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password", metrics=True,
+                          backoff_factor=0)
+    syn.get_user_by_name("puccini")
+    server.inject_errors(1)
+    syn.get_roles()
+    result = syn.metrics.as_dict()
+    assert result['get_user_by_name']['GET']['statuses'] == {'200': 1}
+    assert result['get_user_by_name']['GET']['bytes_in'] > 0
+    assert result['get_roles']['GET']['statuses'] == {'200': 1, '503': 1}
+
+    output = syn.metrics.to_prometheus()
+    assert 'syncope_client_requests_total{action="get_roles",method="GET",status="503"} 1' in output
+    assert 'syncope_client_request_duration_seconds_count{action="get_user_by_name",method="GET"} 1' in output
+
+
+def test_action_names():
+    """Will count the requests of actions which do their requests from other threads or other actions.
+
+    :return: Should return: every request counted for the action which was called.
+    """
+    with FakeSyncopeServer(latency=0.1) as server:
+        syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password", metrics=True,
+                              coalesce_gets=True)
+        syn.create_users([{"username": "weedijkerman1"}, {"username": "weedijkerman2"}], concurrency=2)
+        syn.get_users()
+        users = list(syn.iter_users_by_query('{"type":"LEAF","attributableCond":{"type":"ISNOTNULL",'
+                                             '"schema":"username"}}', page_size=2, prefetch=2))
+        syn.update_user_if_changed(users[0], {"username": "rossini2"})
+        result = syn.metrics.as_dict()
+        assert sorted(result) == ["create_users", "get_users", "iter_users_by_query", "update_user_if_changed"]
+        assert result['create_users']['POST']['count'] == 2
+        # The count of the users and 4 pages of 2 users.
+        assert result['iter_users_by_query']['POST']['count'] == 5
+
+
+def test_bytes_out(server):
+    """Will create an user with an name which is longer in UTF-8 than in characters.
+
+    :return: Should return: the size of the request body in bytes, not in characters.
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password", metrics=True)
+    body = u'{"username": "dvo\u0159\u00e1k", "attributes": []}'
+    assert syn.create_user(body.encode('utf-8'))
+    assert syn.metrics.as_dict()['create_user']['POST']['bytes_out'] == len(body) + 2
+    assert syncope._body_size(body) == len(body) + 2
+    assert syncope._body_size(None) == 0
@@ -0,0 +1,78 @@
+"""Test script for the user model of python-syncope"""
+
+import sys
+import os
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import syncope
+from syncope.models import User, Membership
+
+user = {
+    "id": 5, "username": "puccini", "status": "active", "creationDate": 1287572400000, "failedLogins": 0,
+    "attributes": [{"schema": "firstname", "values": ["Giacomo"], "readonly": False},
+                   {"schema": "fullname", "values": ["Giacomo Puccini"], "readonly": False}],
+    "derivedAttributes": [{"schema": "cn", "values": ["Puccini, Giacomo"], "readonly": True}],
+    "virtualAttributes": [{"schema": "cn", "values": [], "readonly": False}],
+    "resources": ["ws-target-resource-1"],
+    "memberships": [{"id": 50, "roleId": 14, "roleName": "artDirector", "attributes": []}],
+    "securityQuestion": None,
+}
+
+
+def test_attributes():
+    """Will get the attributes of an user.
+
+    :return: Should return: Giacomo, Puccini, Giacomo
+    """
+    model = User(user)
+    assert model.username == "puccini"
+    assert model.creation_date == 1287572400000
+    assert model.attributes['firstname'] == ["Giacomo"]
+    assert model.attribute('cn') == "Puccini, Giacomo"
+    assert model.attribute('surname', 'unknown') == "unknown"
+    assert model.readonly == ()
+    assert model.derived_readonly == ("cn",)
+    assert model.virtual_readonly == ()
+    assert not hasattr(model, '__dict__')
+
+
+def test_memberships():
+    """Will get the memberships of an user, which are created when they are used.
+
+    :return: Should return: artDirector
+    """
+    model = User(user)
+    assert model.role_ids == [14]
+    assert isinstance(model.memberships[0], Membership)
+    assert model.memberships[0].role_name == "artDirector"
+    assert model.role_ids == [14]
+
+
+def test_as_dict():
+    """Will convert an user back to an dict.
+
+    :return: Should return: the dict the user was created with.
+    """
+    data = User(user).as_dict()
+    assert sorted(attribute['schema'] for attribute in data['attributes']) == ["firstname", "fullname"]
+    assert data['derivedAttributes'] == user['derivedAttributes']
+    assert data['virtualAttributes'] == user['virtualAttributes']
+    assert data['memberships'][0]['roleName'] == "artDirector"
+    assert data['securityQuestion'] is None
+    assert 'lastChangeDate' not in data
+    assert User(data) == User(user)
+
+
+def test_as_model(server):
+    """Will get user puccini as User object.
+
+    :return: Should return: puccini
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password")
+    model = syn.get_user_by_id(5, as_model=True)
+    assert model.username == "puccini"
+    assert model == syn.get_user_by_name("puccini", as_model=True)
+    assert [model.username for model in syn.get_users(as_model=True)] == \
+        [user['username'] for user in syn.get_users()]
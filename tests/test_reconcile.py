@@ -0,0 +1,92 @@
+"""Test script for the user reconciler of python-syncope"""
+
+import sys
+import os
+import pytest
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import syncope
+from syncope.reconcile import Reconciler, read_csv
+
+desired = [
+    {"username": "rossini", "memberships": [1, 2]},
+    {"username": "verdi", "status": "suspended"},
+    {"username": "puccini", "attributes": {"firstname": "Giacomo", "surname": "Puccini", "fullname": "Giacomo Puccini",
+                                           "userId": "puccini@apache.org", "cool": "true"}},
+    {"username": "wdijkerman", "password": "password1234", "memberships": [14],
+     "attributes": {"firstname": "Werner", "surname": "Dijkerman"}},
+    {"username": "mozart", "status": "suspended"},
+]
+
+
+def test_reconciler_raise():
+    """Will create an reconciler with an wrong missing action.
+
+    :return: Should catch the ValueError.
+    """
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password")
+    with pytest.raises(ValueError) as excinfo:
+        Reconciler(syn, missing='disable')
+    assert str(excinfo.value) == 'This reconciler needs missing to be suspend, delete or None to work!'
+
+
+def test_plan(server):
+    """Will plan the changes for the desired users, without changing anything.
+
+    :return: Should return: 2 creates, 1 update and 4 suspends.
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password")
+    plan = Reconciler(syn).plan(desired).as_dict()
+    assert plan['create'] == ["wdijkerman", "mozart"]
+    assert list(plan['update']) == ["puccini"]
+    # The ctype schema of puccini has no values, so it is not removed.
+    assert plan['update']['puccini'] == {"id": 5, "attributesToBeUpdated": [
+        {"schema": "cool", "valuesToBeAdded": ["true"], "valuesToBeRemoved": []}]}
+    assert plan['suspend'] == ["verdi", "mozart", "bellini", "vivaldi"]
+    assert Reconciler(syn).apply(Reconciler(syn).plan(desired), dry_run=True)['created'] == ["wdijkerman", "mozart"]
+    assert syn.get_user_by_name("wdijkerman") == False
+
+
+def test_reconcile(server):
+    """Will apply the changes for the desired users 2 times.
+
+    :return: Should return: the changed users, and no changes the second time.
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password")
+    actions = []
+    syn.add_hook('pre_request', lambda call: actions.append(call['action']))
+    reconciler = Reconciler(syn, missing='delete', concurrency=2, rate=100)
+    result = reconciler.reconcile(desired)
+    # The actions are applied one after the other.
+    phases = ["iter_users", "create_user", "update_user", "suspend_user_by_id", "suspend_user_by_name",
+              "delete_user_by_id"]
+    assert [phases.index(action) for action in actions] == sorted(phases.index(action) for action in actions)
+    assert result['created'] == ["wdijkerman", "mozart"]
+    assert result['updated'] == ["puccini"]
+    assert sorted(result['suspended']) == ["mozart", "verdi"]
+    assert sorted(result['deleted']) == ["bellini", "vivaldi"]
+    assert result['failed'] == []
+    assert syn.get_user_by_name("wdijkerman")['memberships'][0]['roleName'] == "artDirector"
+    assert syn.get_user_by_name("mozart")['status'] == "suspended"
+    assert len(reconciler.plan(desired)) == 0
+    plan = Reconciler(syn, missing=None, update_passwords=True).plan(desired).as_dict()
+    assert plan['update'] == {"wdijkerman": {"id": syn.get_user_by_name("wdijkerman")["id"], "password": "password1234"}}
+
+
+def test_read_csv(tmpdir):
+    """Will read the desired users from an CSV file.
+
+    :return: Should return: rossini with 2 roles and wdijkerman, with an address of 2 lines.
+    """
+    path = tmpdir.join("users.csv")
+    path.write(b"username,password,memberships,firstname,surname,address\n"
+               b"rossini,,1;2,Gioacchino,Rossini,\n"
+               b"wdijkerman,password1234,14,Werner,,\"Dorpstraat 1\r\nAmsterdam\"\n", mode="wb")
+    users = list(read_csv(str(path)))
+    assert users[0] == {"username": "rossini", "memberships": [1, 2],
+                        "attributes": {"firstname": ["Gioacchino"], "surname": ["Rossini"], "address": []}}
+    assert users[1]['password'] == "password1234"
+    assert users[1]['attributes']['surname'] == []
+    assert users[1]['attributes']['address'] == ["Dorpstraat 1\r\nAmsterdam"]
@@ -0,0 +1,119 @@
+"""Test script for the RoleTree of python-syncope"""
+
+import sys
+import os
+import pytest
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import syncope
+
+roles = [
+    {"id": 1, "name": "root", "parent": 0},
+    {"id": 2, "name": "child", "parent": 1},
+    {"id": 3, "name": "citizen", "parent": 0},
+    {"id": 4, "name": "employee", "parent": 1},
+    {"id": 5, "name": "secretary", "parent": 4},
+    {"id": 6, "name": "director", "parent": 4},
+    {"id": 7, "name": "managingDirector", "parent": 6},
+]
+
+
+def test_roles_raise():
+    """ Will test if an Syncope object or roles are given as argument.
+
+    :return: Should catch the ValueError.
+    """
+    with pytest.raises(ValueError) as excinfo:
+        syncope.RoleTree()
+    assert str(excinfo.value) == 'This tree needs an Syncope object or roles to work!'
+
+
+def test_roots():
+    """Will get all roles without an parent.
+
+    :return: Should return: root, citizen
+    """
+    tree = syncope.RoleTree(roles=roles)
+    assert len(tree) == 7
+    assert [role['name'] for role in tree.roots()] == ["root", "citizen"]
+
+
+def test_parent_and_children():
+    """Will get the parent and the children of role 4.
+
+    :return: Should return: root and secretary, director
+    """
+    tree = syncope.RoleTree(roles=roles)
+    assert tree.parent(4)['name'] == "root"
+    assert tree.parent(1) is None
+    assert [role['name'] for role in tree.children(4)] == ["secretary", "director"]
+    assert tree.children(7) == []
+
+
+def test_ancestors_and_descendants():
+    """Will get all parents of role 7 and all children of role 1.
+
+    :return: Should return: director, employee, root and child, employee, secretary, director, managingDirector
+    """
+    tree = syncope.RoleTree(roles=roles)
+    assert [role['id'] for role in tree.ancestors(7)] == [6, 4, 1]
+    assert [role['id'] for role in tree.descendants(1)] == [2, 4, 5, 6, 7]
+
+
+def test_depth_and_path():
+    """Will get the depth and path of role 7.
+
+    :return: Should return: 3 and root, employee, director, managingDirector
+    """
+    tree = syncope.RoleTree(roles=roles)
+    assert tree.depth(7) == 3
+    assert tree.depth(3) == 0
+    assert tree.path(7) == ["root", "employee", "director", "managingDirector"]
+
+
+def test_unknown_role():
+    """Will get the parent of an role which doesn't exist.
+
+    :return: Should catch the KeyError.
+    """
+    tree = syncope.RoleTree(roles=roles)
+    assert tree.get(21) is None
+    with pytest.raises(KeyError):
+        tree.parent(21)
+
+
+def test_cycle():
+    """Will walk an role hierarchy where role 9 and 10 are each others parent, and role 11 is an child of role 10.
+
+    :return: Should catch the ValueError, instead of walking the cycle forever.
+    """
+    tree = syncope.RoleTree(roles=roles + [
+        {"id": 9, "name": "chicken", "parent": 10},
+        {"id": 10, "name": "egg", "parent": 9},
+        {"id": 11, "name": "omelette", "parent": 10},
+    ])
+    assert tree.path(7) == ["root", "employee", "director", "managingDirector"]
+    with pytest.raises(ValueError) as excinfo:
+        tree.ancestors(9)
+    assert str(excinfo.value) == 'Role 9 is part of an cycle in the role hierarchy!'
+    with pytest.raises(ValueError):
+        tree.ancestors(11)
+    with pytest.raises(ValueError):
+        tree.descendants(9)
+    with pytest.raises(ValueError):
+        tree.depth(11)
+    with pytest.raises(ValueError):
+        tree.path(11)
+
+
+def test_get_role_tree():
+    """Will get the role tree from the Syncope server.
+
+    :return: Should return: root, child
+    """
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password")
+    tree = syn.get_role_tree()
+    assert len(tree) == 14
+    assert tree.path(2) == ["root", "child"]
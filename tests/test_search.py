@@ -0,0 +1,93 @@
+"""Test script for the search conditions of python-syncope"""
+
+import sys
+import os
+import json
+import pytest
+
+my_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, my_path + '/../')
+
+import syncope
+from syncope.search import attributable, attribute, membership, resource, and_, or_, not_
+
+
+def depth(condition):
+    if 'leftNodeCond' not in condition:
+        return 1
+    return 1 + max(depth(condition['leftNodeCond']), depth(condition['rightNodeCond']))
+
+
+def test_leaf():
+    """Will compile an condition on the username.
+
+    :return: Should return: the JSON of an LEAF with an attributableCond.
+    """
+    condition = attributable("username").eq("vivaldi")
+    assert json.loads(condition.to_json()) == {
+        "type": "LEAF", "attributableCond": {"type": "EQ", "schema": "username", "expression": "vivaldi"}}
+    assert condition.to_json() is condition.to_json()
+    assert membership(role_id="14").to_dict() == {"type": "LEAF", "membershipCond": {"roleId": 14}}
+
+
+def test_flatten_and_dedupe():
+    """Will combine conditions with duplicates and nested OR conditions.
+
+    :return: Should return: 3 conditions
+    """
+    a = attributable("username").like("v%")
+    b = attribute("surname").isnull()
+    c = resource("ws-target-resource-1")
+    condition = a | (b | (a | c)) | b
+    assert len(condition.children) == 3
+    assert condition == or_(a, b, c)
+    assert (a & a) == a
+
+
+def test_balanced():
+    """Will combine 64 conditions with OR.
+
+    :return: Should return: an tree with an depth of 7 instead of 64.
+    """
+    condition = or_(*[attributable("id").eq(id) for id in range(64)])
+    assert depth(condition.to_dict()) == 7
+
+
+def test_not():
+    """Will negate an AND condition, which is moved to the leafs.
+
+    :return: Should return: an OR of 2 NOT_LEAF conditions.
+    """
+    condition = not_(attributable("status").eq("active") & ~resource("ws-target-resource-1"))
+    result = condition.to_dict()
+    assert result['type'] == "OR"
+    assert result['leftNodeCond']['type'] == "NOT_LEAF"
+    assert result['rightNodeCond']['type'] == "LEAF"
+    assert ~~condition == condition
+
+
+def test_raise():
+    """Will combine an condition with an JSON string.
+
+    :return: Should catch the ValueError.
+    """
+    with pytest.raises(ValueError):
+        and_(attributable("status").eq("active"), '{"type": "LEAF"}')
+    with pytest.raises(ValueError):
+        membership()
+
+
+def test_search_with_condition(server):
+    """Will search users with an condition instead of JSON.
+
+    :return: Should return: the same users as the JSON search.
+    """
+    syn = syncope.Syncope(syncope_url=server.url, username="admin", password="password")
+    condition = attributable("username").like("v%") | membership(role_id=14)
+    search_req = '{"type":"OR","leftNodeCond":{"type":"LEAF","attributableCond":{"type":"LIKE",' \
+                 '"schema":"username","expression":"v%"}},"rightNodeCond":{"type":"LEAF","membershipCond":' \
+                 '{"roleId":14}}}'
+    assert syn.get_users_by_query(condition) == syn.get_users_by_query(search_req)
+    assert syn.get_user_count_by_query(condition) == 3
+    assert len(syn.get_paged_users_by_query(condition, 1, 2)) == 2
+    assert len(list(syn.iter_users_by_query(condition, page_size=2))) == 3
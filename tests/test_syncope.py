@@ -3,6 +3,7 @@
 import sys
 import os
 import pytest
+import requests
 import xml.etree.ElementTree as ET
 
 my_path = os.path.dirname(os.path.abspath(__file__))
@@ -51,6 +52,37 @@ def test__post():
     assert excinfo.value.message == 'No arguments are given to POST.'
 
 
+def test__post_connection_error():
+    """ Will test if an connection error is raised after all retries are done.
+
+    :return: Should catch the ConnectionError.
+    """
+    syn = syncope.Syncope(syncope_url="http://127.0.0.1:1", username="admin", password="admin", retries=2, backoff_factor=0)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        syn.create_user('{}')
+
+
+def test_context_manager():
+    """ Will test if the pooled session can be used via an context manager.
+
+    :return: Should return: 5
+    """
+    with syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password") as syn:
+        assert syn.get_users_count() == 5
+        assert syn.get_user_by_id(5)['username'] == "puccini"
+
+
+def test_close():
+    """ Will test if the session can still be used after it is closed.
+
+    :return: Should return: 5
+    """
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password", keep_alive=0)
+    assert syn.get_users_count() == 5
+    syn.close()
+    assert syn.get_users_count() == 5
+
+
 def test_get_users_count():
     """Will count the amount of users stored in the Syncope database.
 
@@ -80,6 +112,22 @@ def test_get_users_id_false():
     assert syn.get_user_by_id(15) == False
 
 
+def test_get_user_cache():
+    """Will get user 5 by id and by username, with the user cache enabled.
+
+    :return: Should return: the same user, until it is suspended.
+    """
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password", user_cache_size=10)
+    user_data = syn.get_user_by_id(5)
+    assert syn.user_cache.get(username="puccini") == user_data
+    assert syn.get_user_by_name("puccini") == user_data
+    syn.suspend_user_by_name("puccini")
+    assert syn.user_cache.get(id=5) is None
+    assert syn.get_user_by_id(5)['status'] == "suspended"
+    syn.reactivate_user_by_id(5)
+    assert syn.get_user_by_name("puccini")['status'] == "active"
+
+
 def test_get_users_by_query():
     """Will search on username to find "vivaldi"
 
@@ -112,6 +160,26 @@ def test_get_user_by_name():
     assert user_data['id'] == 3
 
 
+def test_resolve_usernames():
+    """Will get the ids of vivaldi, rossini and an user which doesn't exist, with 2 searches.
+
+    :return: Should return: {'vivaldi': 3, 'rossini': 1}
+    """
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password")
+    assert syn.resolve_usernames(["vivaldi", "rossini", "unknown"], chunk=2) == {"vivaldi": 3, "rossini": 1}
+
+
+def test_resolve_usernames_raise():
+    """Will get the ids without usernames.
+
+    :return: Should catch the ValueError.
+    """
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password")
+    with pytest.raises(ValueError) as excinfo:
+        syn.resolve_usernames()
+    assert excinfo.value.message == 'This search needs usernames to work!'
+
+
 def test_get_paged_users_by_query():
     """Will search for all active users and return 1 user per page, getting the first page.
 
@@ -124,6 +192,44 @@ def test_get_paged_users_by_query():
     assert username == "rossini"
 
 
+def test_iter_users_by_query():
+    """Will search for all active users with 2 users per page and iterate over all of them.
+
+    :return: Should return: 5
+    """
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password")
+    search_req = '{"type":"LEAF","attributableCond":{"type":"EQ","schema":"status","expression":"active"}}'
+    usernames = [user['username'] for user in syn.iter_users_by_query(search_req, page_size=2)]
+    assert len(usernames) == 5
+    assert usernames[0] == "rossini"
+
+
+def test_iter_users_by_query_prefetch():
+    """Will search for all active users with 1 user per page, while fetching 3 pages at the same time.
+
+    :return: Should return: the same users in the same order.
+    """
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password")
+    search_req = '{"type":"LEAF","attributableCond":{"type":"EQ","schema":"status","expression":"active"}}'
+    usernames = [user['username'] for user in syn.iter_users_by_query(search_req, page_size=1)]
+    prefetched = [user['username'] for user in syn.iter_users_by_query(search_req, page_size=1, prefetch=3)]
+    assert prefetched == usernames
+
+
+def test_iter_users_by_query_raise():
+    """ Will test if an search is given as argument.
+
+    :return: Should catch the ValueError.
+    """
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password")
+    with pytest.raises(ValueError) as excinfo:
+        syn.iter_users_by_query()
+    assert excinfo.value.message == 'This search needs an JSON to work!'
+    with pytest.raises(ValueError) as excinfo:
+        syn.iter_users_by_query('{"type":"LEAF"}', prefetch=0)
+    assert excinfo.value.message == 'This search needs an prefetch of at least 1 to work!'
+
+
 def test_suspend_user_by_id():
     """Will suspend the user for user id 1.
 
@@ -164,6 +270,25 @@ def test_reactivate_user_by_name():
     assert user_data['status'] == "active"
 
 
+def test_suspend_users():
+    """Will suspend the users vivaldi and nobody, where nobody doesn't exist.
+
+    :return: Should return: {'succeeded': ['vivaldi'], 'failed': ['nobody']}
+    """
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password")
+    summary = syn.suspend_users(["vivaldi", "nobody"], by_name=True, concurrency=2, rate=10)
+    assert summary == {'succeeded': ['vivaldi'], 'failed': ['nobody']}
+
+
+def test_reactivate_users():
+    """Will reactivate the user with id 3 (vivaldi).
+
+    :return: Should return: {'succeeded': [3], 'failed': []}
+    """
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password")
+    assert syn.reactivate_users(iter([3])) == {'succeeded': [3], 'failed': []}
+
+
 def test_create_user():
     """Will create an user weedijkerman
 
@@ -175,6 +300,22 @@ def test_create_user():
     assert user_data['username'] == "weedijkerman"
 
 
+def test_create_users():
+    """Will create the users weedijkerman1 and weedijkerman2, the last one twice.
+
+    :return: Should return: 201, 201 and 409
+    """
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password")
+    create_user = '{"attributes": [{"schema": "firstname","values": ["Werner"],"readonly": false},{"schema": "surname","values": ["Dijkerman"],"readonly": false},{"schema": "fullname","values": ["Werner Dijkerman"],"readonly": false},{"schema": "userId","values": ["werner@dj-wasabi.nl"],"readonly": false}],"id": 0,"derivedAttributes": [],"virtualAttributes": [],"password": "password1234","username": "%s"}'
+    users = [create_user % "weedijkerman1", create_user % "weedijkerman2", create_user % "weedijkerman2"]
+    results = syn.create_users(users, concurrency=1)
+    assert [result['status_code'] for result in results] == [201, 201, 409]
+    assert results[0]['user']['username'] == "weedijkerman1"
+    assert results[2]['user'] is None
+    for result in results[:2]:
+        assert syn.delete_user_by_id(result['user']['id']) == True
+
+
 def test_update_user():
     """Will update the user weedijkerman to wdijkerman.
 
@@ -210,6 +351,15 @@ def test_get_users():
     assert len(user_data) == 5
 
 
+def test_iter_users():
+    """Will test to get all users, parsed while they are downloaded.
+
+    :return: Should return: 5
+    """
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password")
+    assert list(syn.iter_users(chunk_size=100)) == syn.get_users()
+
+
 # def test_create_users_to_enable():
 #     syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password")
 #     create_user = '{"attributes": [{"schema": "aLong","values": [],"readonly": false},{"schema": "activationDate","values": [1420074061],"readonly": false},{"schema": "cool","values": ["false"],"readonly": false},{"schema": "email","values": ["ikben@werner-dijkerman.nlx"],"readonly": false},{"schema": "firstname","values": ["Werner"],"readonly": false},{"schema": "fullname","values": ["Werner Dijkerman"],"readonly": false},{"schema": "gender","values": ["M"],"readonly": false},{"schema": "loginDate","values": [""],"readonly": false},{"schema": "makeItDouble","values": [],"readonly": false},{"schema": "surname","values": ["Dijkerman"],"readonly": false},{"schema": "type","values": ["account"],"readonly": false},{"schema": "uselessReadonly","values": [""],"readonly": true},{"schema": "userId","values": ["werner@dj-wasabi.nl"],"readonly": false}],"id": 0,"derivedAttributes": [{"schema": "cn","values": [],"readonly": false}],"virtualAttributes": [],"password": "password1234","status": null,"token": null,"tokenExpireTime": null,"username": "wdijkerman","lastLoginDate": null,"creationDate": null,"changePwdDate": null,"failedLogins": null}'
@@ -867,6 +1017,57 @@ def test_get_configuration_stream_false():
     assert syn.get_configuration_stream() == False
 
 
+def test_download_configuration_stream(tmpdir):
+    """Will test to download the configuration stream to an file.
+
+    :return: Should return: dataset
+    """
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password")
+    export = str(tmpdir.join("content.xml"))
+    assert syn.download_configuration_stream(export) == True
+    assert ET.parse(export).getroot().tag == "dataset"
+
+
+def test_download_configuration_stream_false(tmpdir):
+    """Will test to download the configuration stream to an file (Wrong password).
+
+    :return: Should return: False
+    """
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="passwrd")
+    assert syn.download_configuration_stream(str(tmpdir.join("content.xml"))) == False
+
+
+def test_download_configuration_stream_raise():
+    """Will test to download the configuration stream without an file.
+
+    :return: Should catch the ValueError.
+    """
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password")
+    with pytest.raises(ValueError) as excinfo:
+        syn.download_configuration_stream()
+    assert excinfo.value.message == 'This download needs an path or file object to work!'
+
+
+def test_iter_configuration_stream():
+    """Will test to get the configuration rows of the configuration stream.
+
+    :return: Should return: token.length
+    """
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="password")
+    keys = [row.get('confKey') for row in syn.iter_configuration_stream(tags=['SyncopeConf'])]
+    assert "token.length" in keys
+
+
+def test_iter_configuration_stream_raise():
+    """Will test to get the rows of the configuration stream (Wrong password).
+
+    :return: Should catch the HTTPError.
+    """
+    syn = syncope.Syncope(syncope_url="http://192.168.1.145:9080", username="admin", password="passwrd")
+    with pytest.raises(requests.exceptions.HTTPError):
+        list(syn.iter_configuration_stream())
+
+
 def test_get_entitlements():
     """Will return a list of all known entitlements.
 